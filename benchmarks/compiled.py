@@ -0,0 +1,62 @@
+"""
+Speed of the modules compiled with mypyc against their pure Python source.
+
+Parses a generated corpus into nodes and serializes them with both, after
+`SSG_MYPYC=1 python setup.py build_ext --inplace` (without it, only the pure
+Python modules are timed).
+
+    python benchmarks/compiled.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import markdown
+from compiled import is_compiled, pure_modules
+from corpus import generate_markdown
+
+REPEAT = 5
+NUMBER = 5
+
+
+def best(statement: str, namespace: dict[str, object]) -> float:
+    times = timeit.repeat(statement, number=NUMBER, repeat=REPEAT, globals=namespace)
+    return min(times) / NUMBER
+
+
+def bench(module: object, text: str) -> tuple[float, float]:
+    """The time to parse `text` with `module`, and to serialize the nodes."""
+    namespace: dict[str, object] = {"module": module, "text": text}
+    parse = best("module.markdown_to_html_node(text)", namespace)
+    namespace["node"] = module.markdown_to_html_node(text)  # pyright: ignore[reportAttributeAccessIssue]
+    serialize = best("node.to_html()", namespace)
+    return parse, serialize
+
+
+def main():
+    text = generate_markdown(5000)
+    modules = {"pure Python": pure_modules()["markdown"]}
+    if is_compiled(markdown):
+        modules["mypyc"] = markdown
+    else:
+        print(
+            "not compiled: run `SSG_MYPYC=1 python setup.py build_ext --inplace` first\n"
+        )
+
+    print(f"{'modules':<14}{'parse (ms)':>12}{'to_html (ms)':>14}")
+    results = {name: bench(module, text) for name, module in modules.items()}
+    for name, (parse, serialize) in results.items():
+        print(f"{name:<14}{parse * 1000:>12.1f}{serialize * 1000:>14.1f}")
+    if len(results) == 2:
+        (pure_parse, pure_serialize), (parse, serialize) = results.values()
+        print(
+            f"{'speedup':<14}{pure_parse / parse:>11.2f}x"
+            + f"{pure_serialize / serialize:>13.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
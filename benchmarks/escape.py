@@ -0,0 +1,87 @@
+"""
+Cost of HTML escaping in the serializer.
+
+Renders a generated corpus with the real escaping functions and with
+identity functions, and compares `escape_text` with the alternatives.
+Escaping costs about 10-20% of `to_html` on this corpus, most of it in
+checking the strings with nothing to escape, which are returned as is.
+
+    python benchmarks/escape.py
+"""
+
+import html
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import htmlnode
+import leafnode
+from corpus import WORDS, generate_markdown
+from htmlnode import escape_text
+from markdown import markdown_to_html_node
+
+REPEAT = 5
+# times the serializer is timed with and without escaping, in turn
+ROUNDS = 10
+
+
+def best(statement: str, number: int, namespace: dict[str, object]) -> float:
+    return min(
+        timeit.repeat(statement, number=number, repeat=REPEAT, globals=namespace)
+    )
+
+
+def bench_serializer():
+    node = markdown_to_html_node(generate_markdown(5000))
+    namespace: dict[str, object] = {"node": node}
+    saved = leafnode.escape_text, leafnode.escape_attribute, htmlnode.escape_attribute
+
+    def identity(text: str) -> str:
+        return text
+
+    # alternate the two, so that a slower machine slows both down alike
+    raw: list[float] = []
+    escaped: list[float] = []
+    for _ in range(ROUNDS):
+        leafnode.escape_text = leafnode.escape_attribute = identity
+        htmlnode.escape_attribute = identity
+        raw.append(best("node.to_html()", 3, namespace))
+        leafnode.escape_text, leafnode.escape_attribute, htmlnode.escape_attribute = (
+            saved
+        )
+        escaped.append(best("node.to_html()", 3, namespace))
+
+    raw_time, escaped_time = min(raw) / 3, min(escaped) / 3
+    print(f"to_html without escaping: {raw_time * 1000:8.2f} ms")
+    print(f"to_html with escaping:    {escaped_time * 1000:8.2f} ms")
+    print(f"overhead:                 {(escaped_time - raw_time) / raw_time:8.1%}")
+
+
+def bench_escape_functions():
+    plain = " ".join(WORDS)
+    special = plain + " <b> & </b>"
+    table = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+    candidates = {
+        "escape_text": lambda text: escape_text(text),
+        "html.escape": lambda text: html.escape(text, quote=False),
+        "str.translate": lambda text: text.translate(table),
+    }
+    print()
+    print(f"{'function':<16}{'plain (ns)':>12}{'special (ns)':>14}")
+    for name, function in candidates.items():
+        namespace: dict[str, object] = {
+            "f": function,
+            "plain": plain,
+            "special": special,
+        }
+        number = 100_000
+        plain_time = best("f(plain)", number, namespace) / number * 1e9
+        special_time = best("f(special)", number, namespace) / number * 1e9
+        print(f"{name:<16}{plain_time:>12.0f}{special_time:>14.0f}")
+
+
+if __name__ == "__main__":
+    bench_serializer()
+    bench_escape_functions()
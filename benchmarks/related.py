@@ -0,0 +1,67 @@
+"""
+Cost of the related pages stage.
+
+Computes the related pages of synthetic pages whose words follow a Zipf
+distribution over a large vocabulary, like real text, with NumPy (when it is
+installed) and with the pure-Python fallback, for growing numbers of pages.
+
+    python benchmarks/related.py [--pages 1000 10000 50000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from itertools import accumulate
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import related
+from related import similar_python, tfidf_rows
+
+VOCABULARY = 50_000
+WORDS_PER_PAGE = 400
+# the pure-Python fallback is only timed up to this many pages
+PYTHON_PAGES = 10_000
+
+
+def generate_terms(pages: int) -> list[Counter[str]]:
+    rng = random.Random(0)
+    weights = list(accumulate(1 / rank for rank in range(1, VOCABULARY + 1)))
+    words = [f"w{rank}" for rank in range(VOCABULARY)]
+    return [
+        Counter(rng.choices(words, cum_weights=weights, k=WORDS_PER_PAGE))
+        for _ in range(pages)
+    ]
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    _ = function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("--pages", type=int, nargs="+", default=[1000, 10_000])
+    args = parser.parse_args()
+
+    print(f"{'pages':>8}{'tf-idf (s)':>12}{'numpy (s)':>12}{'python (s)':>12}")
+    for pages in args.pages:  # pyright: ignore[reportAny]
+        terms = generate_terms(pages)
+        start = time.perf_counter()
+        rows = tfidf_rows(terms)
+        tfidf = time.perf_counter() - start
+        numpy = "-"
+        if related.np is not None:
+            numpy = f"{timed(related.similar_numpy, rows, 5):.2f}"
+        python = "-"
+        if pages <= PYTHON_PAGES:
+            python = f"{timed(similar_python, rows, 5):.2f}"
+        print(f"{pages:>8}{tfidf:>12.2f}{numpy:>12}{python:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Requests per second of the preview server.
+
+Writes a generated site to a temporary directory, with `.gz` siblings, and
+has concurrent keep-alive clients request its pages for a few seconds: in
+full, revalidated (304) and gzipped, and from `python -m http.server` for
+reference. The "stalled" runs have one more client stall in the middle of
+its request, which blocks a single-threaded server. Clients and servers share the process, so the numbers compare
+the servers rather than measure them.
+
+    python benchmarks/serve.py [--clients 8] [--seconds 3]
+"""
+
+import argparse
+import functools
+import gzip
+import http.client
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+from socketserver import TCPServer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from corpus import generate_markdown
+from markdown import markdown_to_html_node
+from server import PreviewServer
+
+PAGES = 50
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: object):
+        pass
+
+
+def write_site(root: Path) -> list[str]:
+    paths: list[str] = []
+    for page in range(PAGES):
+        html = markdown_to_html_node(generate_markdown(20, seed=page)).to_html()
+        path = root / f"page{page}" / "index.html"
+        path.parent.mkdir()
+        _ = path.write_text(html)
+        _ = path.with_name("index.html.gz").write_bytes(gzip.compress(html.encode()))
+        paths.append(f"/page{page}/")
+    return paths
+
+
+def load(
+    server: TCPServer,
+    paths: list[str],
+    headers: dict[str, str],
+    clients: int,
+    seconds: float,
+    stalled: bool = False,
+) -> float:
+    """
+    Requests per second of `clients` requesting `paths` in turn, while
+    another client is `stalled` sending its request, if asked.
+    """
+    port = server.server_address[1]
+    counts = [0] * clients
+    deadline = time.perf_counter() + seconds
+    stall = socket.create_connection(("127.0.0.1", port)) if stalled else None
+    if stall is not None:
+        stall.sendall(f"GET {paths[0]} HTTP/1.1\r\n".encode())
+
+    def client(index: int):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        while time.perf_counter() < deadline:
+            connection.request(
+                "GET", paths[counts[index] % len(paths)], headers=headers
+            )
+            response = connection.getresponse()
+            _ = response.read()
+            counts[index] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    if stall is not None:
+        time.sleep(seconds)
+        stall.shutdown(socket.SHUT_WR)  # end the request, and read the response
+        while stall.recv(65536):
+            pass
+        stall.close()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def etag(server: PreviewServer, path: str) -> str:
+    """The ETag of a page, from the server not serving yet."""
+    return (
+        server.files.etag(
+            server.root / path.strip("/") / "index.html",
+            (server.root / path.strip("/") / "index.html").stat(),
+        )
+        or ""
+    )
+
+
+def run(
+    server: TCPServer,
+    name: str,
+    cases: dict[str, tuple[list[str], dict[str, str], bool]],
+    clients: int,
+    seconds: float,
+):
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+    thread.start()
+    try:
+        for case, (paths, headers, stalled) in cases.items():
+            rate = load(server, paths, headers, clients, seconds, stalled)
+            print(f"{name:<12}{case:<15}{rate:>10.0f}")
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("--clients", type=int, default=8)
+    _ = parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    clients: int = args.clients
+    seconds: float = args.seconds
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        paths = write_site(root)
+        print(f"{'server':<12}{'requests':<15}{'per second':>10}")
+
+        preview = PreviewServer(("127.0.0.1", 0), root, quiet=True)
+        first = paths[0]
+        cases = {
+            "full": (paths, {}, False),
+            "gzip": (paths, {"Accept-Encoding": "gzip"}, False),
+            # every client revalidates the same page
+            "304": ([first], {"If-None-Match": etag(preview, first)}, False),
+            "full, stalled": (paths, {}, True),
+        }
+        run(preview, "preview", cases, clients, seconds)
+
+        handler = functools.partial(QuietHandler, directory=str(root))
+        server = HTTPServer(("127.0.0.1", 0), handler)
+        cases = {"full": (paths, {}, False), "full, stalled": (paths, {}, True)}
+        run(server, "http.server", cases, clients, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Worst-case timing and fuzzing of the markdown parser.
+
+Renders every family of adversarial inputs of `src/corpus.py` (long runs of
+unmatched brackets, delimiters, unterminated strings in code blocks...) at
+growing sizes, and fails when doubling the input more than `--max-growth`
+times the time to render it: linear parsing doubles it, quadratic parsing
+quadruples it. With `--fuzz N`, also renders N random strings of markdown
+syntax, and fails on any error but a markdown syntax error, or on a render
+slower than `--max-fuzz-seconds`.
+
+    python benchmarks/worst_case.py [--size 2000] [--fuzz 10000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import highlight
+from corpus import ADVERSARIAL
+from markdown import MarkdownSyntaxError, markdown_to_html_node, text_to_textnodes
+
+REPEAT = 3
+# renders faster than this are too noisy to compare
+MIN_SECONDS = 0.005
+# the errors of a bug in the parser, reported without stopping the fuzzing
+BUGS = (
+    ArithmeticError,
+    AssertionError,
+    AttributeError,
+    LookupError,
+    RuntimeError,
+    TypeError,
+)
+FUZZ_TOKENS = [
+    "[", "]", "(", ")", "!", "_", "*", "**", "`", "```", "```py\n", "```js\n",
+    "```sh\n", '"', "'", "\\", "/*", "${", "#", "# ", "> ", "- ", "1. ", "\n",
+    "\n\n", " ", "a", "1", "é", "<", "&",
+]  # fmt: skip
+
+
+def render(text: str):
+    """Parse and serialize `text` as a block, then as inline text."""
+    for parse in (markdown_to_html_node, text_to_textnodes):
+        try:
+            result = parse(text)
+            if parse is markdown_to_html_node:
+                _ = result.to_html()  # pyright: ignore[reportAttributeAccessIssue]
+        except (ValueError, MarkdownSyntaxError):  # empty, or unmatched delimiters
+            pass
+        except Exception as e:
+            if type(e) is not Exception:  # not a link without a url
+                raise
+
+
+def timed(text: str) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        highlight._tokenize.cache_clear()  # pyright: ignore[reportPrivateUsage]
+        start = time.perf_counter()
+        render(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_growth(size: int, max_growth: float) -> bool:
+    print(f"{'input':<24}{'n (ms)':>10}{'2n (ms)':>10}{'4n (ms)':>10}{'growth':>8}")
+    ok = True
+    for name, generate in ADVERSARIAL.items():
+        times = [timed(generate(size * factor)) for factor in (1, 2, 4)]
+        growth = times[2] / max(times[1], 1e-9)
+        slow = times[2] >= MIN_SECONDS and growth > max_growth
+        ok = ok and not slow
+        print(
+            f"{name:<24}"
+            + "".join(f"{seconds * 1000:>10.1f}" for seconds in times)
+            + f"{growth:>8.1f}"
+            + ("  superlinear" if slow else "")
+        )
+    return ok
+
+
+def fuzz(count: int, max_seconds: float, seed: int) -> bool:
+    rng = random.Random(seed)
+    ok = True
+    slowest = 0.0
+    for _ in range(count):
+        text = "".join(rng.choices(FUZZ_TOKENS, k=rng.randint(1, 200)))
+        start = time.perf_counter()
+        try:
+            render(text)
+        except BUGS as e:
+            print(f"{type(e).__name__}: {e}\n  on {text!r}")
+            ok = False
+            continue
+        seconds = time.perf_counter() - start
+        slowest = max(slowest, seconds)
+        if seconds > max_seconds:
+            print(f"{seconds * 1000:.1f} ms to render {text!r}")
+            ok = False
+    print(f"\nfuzzed {count} inputs, slowest in {slowest * 1000:.2f} ms")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("--size", type=int, default=2000)
+    _ = parser.add_argument("--max-growth", type=float, default=3.0)
+    _ = parser.add_argument("--fuzz", type=int, default=0, metavar="N")
+    _ = parser.add_argument("--max-fuzz-seconds", type=float, default=0.05)
+    _ = parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ok = check_growth(args.size, args.max_growth)  # pyright: ignore[reportAny]
+    if args.fuzz:  # pyright: ignore[reportAny]
+        print()
+        ok = fuzz(args.fuzz, args.max_fuzz_seconds, args.seed) and ok  # pyright: ignore[reportAny]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,6 @@ REPO_NAME='/static-site-generator/'
 
 rm --verbose --force --preserve-root --recursive "${DEPLOY_DIR}"
 mkdir --verbose "${DEPLOY_DIR}"
-cp --verbose --recursive "${STATIC_DIR}"/* "${DEPLOY_DIR}/"
 
-python src/main.py "${DEPLOY_DIR}" "${REPO_NAME}"
-cd "${DEPLOY_DIR}" && python -m http.server 8888
+python src/main.py --static "${STATIC_DIR}" "${DEPLOY_DIR}" "${REPO_NAME}"
+python src/main.py serve "${DEPLOY_DIR}" --port 8888
@@ -9,7 +9,6 @@ PUBLIC_DIR='public'
 
 rm --verbose --preserve-root --recursive "${PUBLIC_DIR}"
 mkdir --verbose "${PUBLIC_DIR}"
-cp --verbose --recursive "${STATIC_DIR}"/* "${PUBLIC_DIR}/"
 
-python src/main.py
-cd public && python -m http.server 8888
+python src/main.py --static "${STATIC_DIR}" "${PUBLIC_DIR}"
+python src/main.py serve "${PUBLIC_DIR}" --port 8888
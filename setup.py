@@ -0,0 +1,41 @@
+"""
+Optional build compiling the parser and node modules with mypyc, when the
+`SSG_MYPYC` environment variable is 1:
+
+    pip install mypy setuptools
+    SSG_MYPYC=1 python setup.py build_ext --inplace
+
+puts a C extension next to each module of `src/`, which Python imports
+instead of the module. Without them (or for another Python version), the
+modules run as plain Python. Without `SSG_MYPYC`, nothing is compiled and
+mypy is not needed, so that `pip install .` works without it.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from setuptools import setup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from compiled import COMPILED_MODULES
+
+# set to 1 to compile `COMPILED_MODULES` with mypyc
+MYPYC_ENV = "SSG_MYPYC"
+
+
+def ext_modules() -> list[object]:
+    if os.environ.get(MYPYC_ENV) != "1":
+        return []
+    from mypyc.build import mypycify  # only installed for the compiled build
+
+    return mypycify([f"src/{module}.py" for module in COMPILED_MODULES])
+
+
+setup(
+    name="ssg",
+    package_dir={"": "src"},
+    py_modules=[],
+    ext_modules=ext_modules(),
+)
@@ -0,0 +1,152 @@
+import json
+import os
+import re
+from pathlib import Path
+
+from cache import BuildCache
+from htmlnode import HTMLNode
+from journal import hash_file
+from output import DirectoryOutput, Output
+from static import copy_asset
+
+ASSET_MANIFEST = "asset-manifest.json"
+HEADERS_FILE = "_headers"
+FINGERPRINT_LENGTH = 8
+FINGERPRINT_SUFFIXES = {
+    ".css",
+    ".js",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".avif",
+    ".svg",
+    ".woff",
+    ".woff2",
+}
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+URL_ATTRIBUTE = re.compile(r'\b(href|src)="([^"]*)"')
+
+
+def fingerprint_name(name: str, digest: str) -> str:
+    """`images/tom.png` -> `images/tom.<digest prefix>.png`"""
+    path = Path(name)
+    return path.with_name(
+        f"{path.stem}.{digest[:FINGERPRINT_LENGTH]}{path.suffix}"
+    ).as_posix()
+
+
+class AssetManifest:
+    """
+    Fingerprinted names of the static assets, by path relative to the static
+    directory. The size and mtime of every asset are recorded with its name,
+    so that only the assets that changed since are hashed again.
+    """
+
+    entries: dict[str, tuple[str, int, int]]
+
+    def __init__(self, entries: dict[str, tuple[str, int, int]] | None = None):
+        self.entries = entries or {}
+
+    @staticmethod
+    def load(path: Path) -> "AssetManifest":
+        try:
+            with open(path) as file:
+                data: dict[str, dict[str, str | int]] = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return AssetManifest()
+        return AssetManifest(
+            {
+                name: (str(entry["file"]), int(entry["size"]), int(entry["mtime_ns"]))
+                for name, entry in data.items()
+            }
+        )
+
+    def to_json(self) -> bytes:
+        data = {
+            name: {"file": file, "size": size, "mtime_ns": mtime_ns}
+            for name, (file, size, mtime_ns) in sorted(self.entries.items())
+        }
+        return (json.dumps(data, indent=2) + "\n").encode()
+
+    def urls(self) -> dict[str, str]:
+        """Map the root-relative URLs of the assets to their fingerprinted ones."""
+        return {f"/{name}": f"/{file}" for name, (file, _, _) in self.entries.items()}
+
+
+def headers(manifest: AssetManifest) -> bytes:
+    """The `_headers` file serving the fingerprinted assets as immutable."""
+    lines: list[str] = []
+    for file, _, _ in sorted(manifest.entries.values()):
+        lines.append(f"/{file}\n  Cache-Control: {IMMUTABLE}\n")
+    return "".join(lines).encode()
+
+
+def fingerprint_static(
+    static_dir: Path,
+    dest_dir: Path,
+    previous: AssetManifest,
+    precompress: bool = False,
+    cache: BuildCache | None = None,
+    output: Output | None = None,
+) -> tuple[AssetManifest, int]:
+    """
+    Copy the static assets to content-hashed names (`index.3f9a1c8e.css`),
+    next to their plain copies. The assets unchanged since the `previous`
+    manifest are not hashed again, and the fingerprinted copies no longer
+    listed are removed. Return the new manifest and the bytes written.
+    """
+    output = output or DirectoryOutput(dest_dir)
+    manifest = AssetManifest()
+    written = 0
+    for dirpath, dirnames, filenames in os.walk(static_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            src = Path(dirpath) / filename
+            if src.suffix not in FINGERPRINT_SUFFIXES:
+                continue
+            name = src.relative_to(static_dir).as_posix()
+            stat = src.stat()
+            entry = previous.entries.get(name)
+            if (
+                entry is not None
+                and entry[1:] == (stat.st_size, stat.st_mtime_ns)
+                and (dest_dir / entry[0]).is_file()
+            ):
+                manifest.entries[name] = entry
+                continue
+            digest = hash_file(src) or ""
+            file = fingerprint_name(name, digest)
+            written += copy_asset(src, dest_dir / file, precompress, cache, output)
+            manifest.entries[name] = (file, stat.st_size, stat.st_mtime_ns)
+
+    current = {file for file, _, _ in manifest.entries.values()}
+    for file, _, _ in previous.entries.values():
+        if file not in current:
+            dest = dest_dir / file
+            output.remove(dest)
+            output.remove(dest.with_name(dest.name + ".gz"))
+    output.write(dest_dir / ASSET_MANIFEST, manifest.to_json())
+    output.write(dest_dir / HEADERS_FILE, headers(manifest))
+    return manifest, written
+
+
+def rewrite_urls(node: HTMLNode, urls: dict[str, str]):
+    """Point the `href` and `src` of `node` and its descendants at `urls`."""
+    if node.props:
+        for name in ("href", "src"):
+            url = node.props.get(name)
+            if url is not None and url in urls:
+                node.props[name] = urls[url]
+    for child in node.children or ():
+        rewrite_urls(child, urls)
+
+
+def rewrite_template(template: str, urls: dict[str, str]) -> str:
+    """Point the double-quoted `href` and `src` of a template at `urls`."""
+    return URL_ATTRIBUTE.sub(
+        lambda match: f'{match.group(1)}="{urls.get(match.group(2), match.group(2))}"',
+        template,
+    )
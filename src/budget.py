@@ -0,0 +1,46 @@
+import signal
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class BudgetExceeded(Exception):
+    """A page took longer to render than the time budget of a page."""
+
+    seconds: float
+
+    def __init__(self, seconds: float):
+        super().__init__(f"rendering took longer than the {seconds:g}s time budget")
+        self.seconds = seconds
+
+
+def can_interrupt() -> bool:
+    """Whether a time budget can interrupt the current thread."""
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+@contextmanager
+def time_budget(seconds: float | None) -> Iterator[None]:
+    """
+    Raise `BudgetExceeded` in the block once it has run for `seconds`, with a
+    timer signal (the regular expression engine checks for signals while it
+    matches). Only the main thread of a process can be interrupted: elsewhere,
+    or without `seconds`, the block runs unbounded.
+    """
+    if not seconds or not can_interrupt():
+        yield
+        return
+
+    def expire(signum: int, frame: object):
+        raise BudgetExceeded(seconds)
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    _ = signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        _ = signal.setitimer(signal.ITIMER_REAL, 0)
+        _ = signal.signal(signal.SIGALRM, previous)
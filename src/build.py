@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from config import BuildConfig
+from main import main
+from output import MemoryOutput, RecordingOutput
+from report import BuildReport, PageReport
+
+
+class BuildResult:
+    """What a build did, for the pages and for the whole site."""
+
+    report: BuildReport
+    # the files of a site kept in memory, by name (`blog/tom.html`)
+    files: dict[str, bytes]
+    # the names of the files written and removed by the build
+    written: list[str]
+    removed: list[str]
+
+    def __init__(
+        self,
+        report: BuildReport,
+        files: dict[str, bytes],
+        written: list[str],
+        removed: list[str],
+    ):
+        self.report = report
+        self.files = files
+        self.written = written
+        self.removed = removed
+
+    @property
+    def pages(self) -> list[PageReport]:
+        """Every page generated, with its timings."""
+        return self.report.pages
+
+    @property
+    def errors(self) -> dict[str, str]:
+        """The error of every page which failed, by source path."""
+        return {
+            page.source: page.error
+            for page in self.report.pages
+            if page.error is not None
+        }
+
+    @property
+    def messages(self) -> list[str]:
+        return self.report.messages
+
+
+def build(config: BuildConfig) -> BuildResult:
+    """
+    Build a site in this process. What the build decided is kept in the
+    result rather than printed, and the pages that fail are reported there
+    rather than raised. Only a page budget changes the state of the process,
+    for the time a page renders (see `time_budget`).
+    """
+    target = config.open_output()
+    output = RecordingOutput(target)
+    report = BuildReport(quiet=True)
+    try:
+        main(config, output, report)
+    except BaseException:
+        output.abort()
+        raise
+    output.close()
+
+    # workers writing to a shared output do not record the pages they write
+    written = output.written | {
+        output.name(Path(page.dest))
+        for page in report.pages
+        if page.error is None and not page.resumed
+    }
+    files = target.files if isinstance(target, MemoryOutput) else {}
+    return BuildResult(report, files, sorted(written), sorted(output.removed))
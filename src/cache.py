@@ -0,0 +1,134 @@
+import fcntl
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# part of every cache key: bump it whenever the HTML rendered changes
+GENERATOR_VERSION = "0.2.1"
+CACHE_DIR_ENV = "SSG_CACHE_DIR"
+
+RE_SIZE_PATTERN = r"^(?P<number>\d+)(?P<unit>[KMG]?)B?$"
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+LOCK_FILENAME = ".lock"
+TMP_PREFIX = ".tmp-"
+
+
+def parse_size(size: str) -> int:
+    """Parse a size such as `4096`, `500K`, `200M` or `2G` into bytes."""
+    match = re.match(RE_SIZE_PATTERN, size.strip().upper())
+    if not match:
+        raise ValueError(f"Invalid size: {size}")
+    return int(match.group("number")) * SIZE_UNITS[match.group("unit")]
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write to a temporary file renamed into place: `path` is never partial."""
+    fd, tmp_path = tempfile.mkstemp(prefix=TMP_PREFIX, dir=path.parent)
+    try:
+        os.fchmod(fd, 0o644)  # mkstemp creates files readable by their owner only
+        with os.fdopen(fd, "wb") as file:
+            _ = file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class BuildCache:
+    """
+    Content-addressed cache shared between builds (and CI runners).
+
+    Every entry lives under `<root>/<kind>/<key[:2]>/<key>`, where the key is
+    a hash of the generator version and of the inputs. Entries are written to
+    a temporary file and renamed into place, so readers never see a partial
+    entry. Writers hold a shared lock and `gc` an exclusive one.
+    """
+
+    root: Path
+    hits: Counter[str]
+    misses: Counter[str]
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.hits = Counter()
+        self.misses = Counter()
+        self.root.mkdir(mode=0o755, parents=True, exist_ok=True)
+
+    def key(self, kind: str, *parts: str | bytes) -> str:
+        digest = hashlib.sha256()
+        for part in (GENERATOR_VERSION, kind, *parts):
+            data = part.encode() if isinstance(part, str) else part
+            # length prefix so that ("ab", "c") and ("a", "bc") differ
+            digest.update(len(data).to_bytes(8, "big"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def path(self, kind: str, key: str) -> Path:
+        return self.root / kind / key[:2] / key
+
+    def get(self, kind: str, key: str) -> bytes | None:
+        path = self.path(kind, key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)  # gc evicts the least recently used entries first
+        except FileNotFoundError:
+            self.misses[kind] += 1
+            return None
+        self.hits[kind] += 1
+        return data
+
+    def put(self, kind: str, key: str, data: bytes):
+        path = self.path(kind, key)
+        path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with self._lock(fcntl.LOCK_SH):
+            atomic_write(path, data)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def gc(self, max_size: int) -> tuple[int, int]:
+        """
+        Evict the least recently used entries until the cache holds at most
+        `max_size` bytes. Return the number of entries and bytes removed.
+        """
+        removed_entries = 0
+        removed_bytes = 0
+        with self._lock(fcntl.LOCK_EX):
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= max_size and not path.name.startswith(TMP_PREFIX):
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
+                removed_entries += 1
+                removed_bytes += size
+        return removed_entries, removed_bytes
+
+    def _entries(self) -> Iterator[tuple[Path, int, float]]:
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename == LOCK_FILENAME:
+                    continue
+                path = Path(dirpath) / filename
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    @contextmanager
+    def _lock(self, operation: int) -> Iterator[None]:
+        with open(self.root / LOCK_FILENAME, "a") as lock:
+            fcntl.flock(lock, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,107 @@
+import os
+import subprocess
+from pathlib import Path
+
+
+class ChangeSet:
+    """Paths changed between a git revision and the working tree."""
+
+    changed: set[Path]
+    deleted: set[Path]
+
+    def __init__(
+        self, changed: set[Path] | None = None, deleted: set[Path] | None = None
+    ):
+        self.changed = changed or set()
+        self.deleted = deleted or set()
+
+    def under(self, directory: Path) -> "ChangeSet":
+        return ChangeSet(
+            {path for path in self.changed if path.is_relative_to(directory)},
+            {path for path in self.deleted if path.is_relative_to(directory)},
+        )
+
+    def touches(self, path: Path) -> bool:
+        return path in self.changed or path in self.deleted
+
+
+def parse_name_status(output: str) -> ChangeSet:
+    """Parse the output of `git diff --name-status -z`."""
+    changes = ChangeSet()
+    fields = output.split("\0")
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i][0]
+        if status in "RC":  # renamed or copied: "R100\0old\0new"
+            old, new = Path(fields[i + 1]), Path(fields[i + 2])
+            if status == "R":
+                changes.deleted.add(old)
+            changes.changed.add(new)
+            i += 3
+            continue
+
+        path = Path(fields[i + 1])
+        if status == "D":
+            changes.deleted.add(path)
+        else:  # added, modified, type changed...
+            changes.changed.add(path)
+        i += 2
+
+    # a path deleted then re-added under the same name is a change
+    changes.deleted -= changes.changed
+    return changes
+
+
+def changes_since(rev: str, paths: list[Path]) -> ChangeSet:
+    """
+    Ask the local git repository which of `paths` changed since `rev`,
+    including uncommitted and untracked files. Paths are relative to the
+    current directory.
+    """
+    pathspecs = [str(path) for path in paths]
+    diff = subprocess.run(
+        ["git", "diff", "--name-status", "-z", "--find-renames", "--relative", rev]
+        + ["--"]
+        + pathspecs,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    changes = parse_name_status(diff.stdout)
+
+    untracked = subprocess.run(
+        ["git", "ls-files", "-z", "--others", "--exclude-standard", "--"] + pathspecs,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    changes.changed.update(Path(path) for path in untracked.stdout.split("\0") if path)
+    return changes
+
+
+def added_dates(directory: Path) -> dict[str, str]:
+    """
+    The date, in UTC, of the commit which first added every file of
+    `directory` to its git repository, by name relative to `directory`.
+    Empty outside of a repository.
+    """
+    try:
+        log = subprocess.run(
+            ["git", "-C", str(directory), "-c", "core.quotePath=false", "log"]
+            + ["--diff-filter=A", "--no-renames", "--relative", "--name-only"]
+            + ["--date=format-local:%Y-%m-%dT%H:%M:%SZ", "--format=%x00%ad"]
+            + ["--", "."],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "TZ": "UTC"},
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    dates: dict[str, str] = {}
+    for commit in log.stdout.split("\0")[1:]:
+        date, _, names = commit.partition("\n")
+        for name in names.splitlines():
+            if name:  # newest first: the oldest commit is kept
+                dates[name] = date
+    return dates
@@ -0,0 +1,109 @@
+import os
+import posixpath
+import re
+from bisect import bisect_right
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from markdown import (
+    BlockType,
+    MarkdownSyntaxError,
+    block_to_block_type,
+    text_to_spans,
+)
+from textnode import TextType
+
+# (line, LINK or IMAGE, url)
+type Reference = tuple[int, TextType, str]
+
+# what makes a URL more than a plain path: query, fragment, escapes, dot segments
+TO_RESOLVE = re.compile(r"[?#%]|/\.\.?(?:/|$)|//")
+
+
+def find_references(markdown: str) -> tuple[list[Reference], list[int]]:
+    """
+    Collect the URL of every link and image of a page, with its line, by
+    parsing its blocks the way they are rendered, and the first line of every
+    block which is not valid markdown.
+    """
+    line_starts = [0] + [match.end() for match in re.finditer("\n", markdown)]
+    references: list[Reference] = []
+    invalid: list[int] = []
+    offset = 0
+    for part in markdown.split("\n\n"):
+        block = part.strip()
+        start = offset + len(part) - len(part.lstrip())
+        offset += len(part) + 2
+        if "](" not in block:  # no link or image to parse
+            continue
+        if block.startswith("```") and block_to_block_type(block) == BlockType.CODE:
+            continue
+        try:
+            spans = text_to_spans(block)
+        except MarkdownSyntaxError:
+            invalid.append(bisect_right(line_starts, start))
+            continue
+        for span in spans:
+            if span.text_type in (TextType.LINK, TextType.IMAGE):
+                line = bisect_right(line_starts, start + span.url_start)
+                references.append((line, span.text_type, span.url or ""))
+    return references, invalid
+
+
+def site_index(
+    pages: dict[Path, Path], dest_dir: Path, static_dir: Path | None
+) -> set[str]:
+    """The root-relative URL of every page and static asset of the site."""
+    index = {"/" + dest.relative_to(dest_dir).as_posix() for dest in pages.values()}
+    if static_dir is not None:
+        for dirpath, _, filenames in os.walk(static_dir):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                index.add("/" + path.relative_to(static_dir).as_posix())
+    return index
+
+
+def resolve(url: str, page_url: str) -> str | None:
+    """
+    Resolve a link of the page at `page_url` to a root-relative path, with
+    `.md` sources resolved to their `.html` output. None for external links
+    and links to a fragment of the page itself.
+    """
+    if url.startswith("/") and not url.startswith("//") and not TO_RESOLVE.search(url):
+        path = url  # a plain absolute path, the common case
+    else:
+        parts = urlsplit(url)
+        if parts.scheme or parts.netloc or not parts.path:
+            return None
+        path = posixpath.normpath(
+            posixpath.join(posixpath.dirname(page_url), unquote(parts.path))
+        )
+        if parts.path.endswith("/") and path != "/":
+            path += "/"
+    if path.endswith(".md"):
+        path = path.removesuffix(".md") + ".html"
+    return path
+
+
+def is_in_index(path: str, index: set[str]) -> bool:
+    """Whether `path` is a file of the site, or a directory with an index page."""
+    if path in index:
+        return True
+    return posixpath.join(path, "index.html") in index
+
+
+def check_page(
+    source: Path, markdown: str, page_url: str, index: set[str]
+) -> list[str]:
+    """
+    Report the broken links and images of a page, and its invalid blocks, as
+    `file:line: message`.
+    """
+    references, invalid = find_references(markdown)
+    errors = [(line, "invalid markdown") for line in invalid]
+    for line, text_type, url in references:
+        path = resolve(url, page_url)
+        if path is not None and not is_in_index(path, index):
+            kind = "image" if text_type == TextType.IMAGE else "link"
+            errors.append((line, f"broken {kind} {url}"))
+    return [f"{source}:{line}: {message}" for line, message in sorted(errors)]
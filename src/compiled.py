@@ -0,0 +1,62 @@
+import importlib.util
+import sys
+from functools import cache
+from importlib.machinery import EXTENSION_SUFFIXES
+from pathlib import Path
+from types import ModuleType
+
+# the modules `setup.py` compiles with mypyc, each after those it imports
+COMPILED_MODULES = ("textnode", "htmlnode", "leafnode", "parentnode", "markdown")
+SOURCE_DIR = Path(__file__).resolve().parent
+
+
+def is_compiled(module: ModuleType) -> bool:
+    """Whether `module` was imported from a C extension rather than its source."""
+    return (module.__file__ or "").endswith(tuple(EXTENSION_SUFFIXES))
+
+
+def stale_extensions() -> list[Path]:
+    """The compiled modules older than their source, to be built again."""
+    stale: list[Path] = []
+    for name in COMPILED_MODULES:
+        source = SOURCE_DIR / f"{name}.py"
+        for suffix in EXTENSION_SUFFIXES:
+            extension = SOURCE_DIR / f"{name}{suffix}"
+            if (
+                extension.exists()
+                and extension.stat().st_mtime < source.stat().st_mtime
+            ):
+                stale.append(extension)
+    return stale
+
+
+def load_pure_modules() -> dict[str, ModuleType]:
+    """
+    New copies of the compiled modules run from their source, importing each
+    other, whether the modules imported elsewhere are compiled or not.
+    """
+    saved = {name: sys.modules.get(name) for name in COMPILED_MODULES}
+    modules: dict[str, ModuleType] = {}
+    try:
+        for name in COMPILED_MODULES:
+            spec = importlib.util.spec_from_file_location(
+                name, SOURCE_DIR / f"{name}.py"
+            )
+            assert spec is not None and spec.loader is not None
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            spec.loader.exec_module(module)
+            modules[name] = module
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                _ = sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+    return modules
+
+
+@cache
+def pure_modules() -> dict[str, ModuleType]:
+    """The copies of `load_pure_modules` shared by the whole process."""
+    return load_pure_modules()
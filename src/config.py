@@ -0,0 +1,123 @@
+from pathlib import Path
+
+from cache import BuildCache
+from journal import Journal
+from output import MemoryOutput, Output, open_output
+from sources import ContentSource, MemorySource, open_source
+
+TEMPLATE_PATH = Path("template.html")
+SPLIT_THRESHOLD = 1024 * 1024
+# the root of the pages of an in-memory site, and of the files built from it
+MEMORY_CONTENT = Path("content")
+MEMORY_OUTPUT = Path("public")
+
+
+class BuildConfig:
+    """
+    What to build, and how: the options of the command line, with every
+    input given explicitly rather than found in the current directory.
+
+    `content` is a content directory, archive or database, a `ContentSource`
+    or the markdown of the pages by name (`{"blog/tom.md": "# Tom"}`).
+    `template` is the path of the template, or the template itself. `output`
+    is a deploy directory or archive, an `Output`, or None to keep the files
+    in memory.
+    """
+
+    content: ContentSource | Path | dict[str, str]
+    template: Path | str
+    output: Output | Path | None
+    basepath: str
+    static: Path | None
+    cache: BuildCache | None
+    jobs: int
+    minify: bool
+    precompress: bool
+    fingerprint: bool
+    related: int
+    search: bool
+    site_url: str | None
+    listings: int
+    page_budget: float | None
+    # the versions recorded by the previous build, to only rebuild what changed
+    versions: Path | None
+    # the static images of at most this many bytes are inlined as data URIs
+    inline_images: int
+    # the git revision since which only what changed is rebuilt
+    since: str | None
+    # the pages written, to resume an interrupted build
+    journal: Journal | None
+    # the seconds of every page in a previous build, to start the slowest first
+    history: dict[str, float] | None
+    # with several jobs, the blocks of pages this large are rendered in parallel
+    split_threshold: int
+
+    def __init__(
+        self,
+        content: ContentSource | Path | dict[str, str],
+        template: Path | str,
+        output: Output | Path | None = None,
+        basepath: str = "/",
+        static: Path | None = None,
+        cache: BuildCache | None = None,
+        jobs: int = 1,
+        minify: bool = False,
+        precompress: bool = False,
+        fingerprint: bool = False,
+        related: int = 0,
+        search: bool = False,
+        site_url: str | None = None,
+        listings: int = 0,
+        page_budget: float | None = None,
+        versions: Path | None = None,
+        inline_images: int = 0,
+        since: str | None = None,
+        journal: Journal | None = None,
+        history: dict[str, float] | None = None,
+        split_threshold: int = SPLIT_THRESHOLD,
+    ):
+        self.content = content
+        self.template = template
+        self.output = output
+        self.basepath = basepath
+        self.static = static
+        self.cache = cache
+        self.jobs = jobs
+        self.minify = minify
+        self.precompress = precompress
+        self.fingerprint = fingerprint
+        self.related = related
+        self.search = search
+        self.site_url = site_url
+        self.listings = listings
+        self.page_budget = page_budget
+        self.versions = versions
+        self.inline_images = inline_images
+        self.since = since
+        self.journal = journal
+        self.history = history
+        self.split_threshold = split_threshold
+
+    @property
+    def template_path(self) -> Path:
+        """The path of the template, or `TEMPLATE_PATH` for a template given as is."""
+        return self.template if isinstance(self.template, Path) else TEMPLATE_PATH
+
+    @property
+    def template_text(self) -> str | None:
+        """The template given as is, or None to read it from `template_path`."""
+        return self.template if isinstance(self.template, str) else None
+
+    def source(self) -> ContentSource:
+        if isinstance(self.content, ContentSource):
+            return self.content
+        if isinstance(self.content, dict):
+            return MemorySource(MEMORY_CONTENT, self.content)
+        return open_source(str(self.content))
+
+    def open_output(self) -> Output:
+        if self.output is None:
+            return MemoryOutput(MEMORY_OUTPUT)
+        if isinstance(self.output, Output):
+            return self.output
+        return open_output(str(self.output))
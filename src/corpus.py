@@ -0,0 +1,89 @@
+import random
+from collections.abc import Callable
+
+WORDS = [
+    "the", "ring", "of", "power", "was", "forged", "in", "the", "fires", "of", "mount",
+    "doom", "by", "sauron", "lord", "of", "mordor", "elves", "dwarves", "and", "men",
+    "of", "middle", "earth", "fought", "against", "him", "in", "the", "last",
+    "alliance", "while", "hobbits", "lived", "quietly", "in", "the", "shire",
+]  # fmt: skip
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 16))]
+    i = rng.randrange(len(words))
+    match rng.randrange(8):
+        case 0:
+            words[i] = f"**{words[i]}**"
+        case 1:
+            words[i] = f"_{words[i]}_"
+        case 2:
+            words[i] = f"`{words[i]} < {rng.choice(WORDS)}`"
+        case 3:
+            words[i] = f"[{words[i]}](https://example.com/{rng.choice(WORDS)})"
+        case 4:
+            words[i] = f"![{words[i]}](/images/{rng.choice(WORDS)}.png)"
+        case 5:
+            words[i] = f"{words[i]} & {rng.choice(WORDS)}"
+        case _:
+            pass
+    return " ".join(words).capitalize() + "."
+
+
+def generate_block(rng: random.Random) -> str:
+    match rng.randrange(10):
+        case 0:
+            return f"{'#' * rng.randint(1, 6)} {_sentence(rng)}"
+        case 1:
+            lines = [f"    {_sentence(rng)}" for _ in range(rng.randint(1, 6))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        case 2:
+            return "\n".join(f"> {_sentence(rng)}" for _ in range(rng.randint(1, 3)))
+        case 3:
+            return "\n".join(f"- {_sentence(rng)}" for _ in range(rng.randint(1, 5)))
+        case 4:
+            count = rng.randint(1, 5)
+            return "\n".join(f"{i}. {_sentence(rng)}" for i in range(1, count + 1))
+        case _:
+            return "\n".join(_sentence(rng) for _ in range(rng.randint(1, 4)))
+
+
+def generate_markdown(blocks: int, seed: int = 0) -> str:
+    """A deterministic markdown document using every syntax the parser knows."""
+    rng = random.Random(seed)
+    title = f"# {_sentence(rng)}"
+    return "\n\n".join([title] + [generate_block(rng) for _ in range(blocks)]) + "\n"
+
+
+def fenced(language: str, code: str) -> str:
+    return f"```{language}\n{code}\n```"
+
+
+# markdown made to be slow to render: `n` repetitions of unmatched, escaped or
+# nested syntax, which a backtracking pattern may scan again from every start
+ADVERSARIAL: dict[str, Callable[[int], str]] = {
+    "unmatched [": lambda n: "[" * n,
+    "unmatched ]": lambda n: "]" * n,
+    "unclosed links": lambda n: "[a](" * n,
+    "unclosed images": lambda n: "![a](" * n,
+    "unclosed urls": lambda n: "[a](b" * n,
+    "nested brackets": lambda n: "[" * n + "a" + "]" * n + "(" * n,
+    "links": lambda n: "[a](b) " * n,
+    "underscores": lambda n: "_" * 2 * n,
+    "bold": lambda n: "**a " * 2 * n,
+    "code spans": lambda n: "`a " * 2 * n,
+    "mixed delimiters": lambda n: "**_`[" * 2 * n,
+    "quotes": lambda n: "> a\n" * n,
+    "list items": lambda n: "- a\n" * n,
+    "ordered list items": lambda n: "".join(f"{i}. a\n" for i in range(1, n + 1)),
+    "headings": lambda n: "# a\n\n" * n,
+    "empty fences": lambda n: "```\n\n" * n,
+    "python strings": lambda n: fenced("python", '"' + '\\"' * n),
+    "python triple quotes": lambda n: fenced("python", '"""' + "'''" * n),
+    "javascript comments": lambda n: fenced("js", "/* " * n),
+    "javascript templates": lambda n: fenced("js", "`\\" * n),
+    "javascript strings": lambda n: fenced("js", "'" + "\\'" * n),
+    "shell variables": lambda n: fenced("sh", "${" * n),
+    "shell strings": lambda n: fenced("sh", '"' + '\\"' * n),
+    "json strings": lambda n: fenced("json", '"' + '\\"' * n),
+}
@@ -0,0 +1,286 @@
+import ast
+import html
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from functools import cache, partial
+from pathlib import Path
+from types import ModuleType
+
+import highlight
+import markdown
+from cache import BuildCache
+from compiled import is_compiled, load_pure_modules, pure_modules
+from corpus import ADVERSARIAL, generate_markdown
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from main import render_markdown
+from markdown import markdown_to_html_node
+from options import RenderOptions
+from textnode import TextNode
+
+Render = Callable[[str], str]
+
+# the blocks rendered in parallel are split in this many groups
+CHUNKS = 4
+# bytes of output shown around a divergence
+CONTEXT = 40
+
+
+def reference_textnodes(text: str) -> list[TextNode]:
+    """The inline tokenizer splitting copies of the text, which spans replaced."""
+    pure = reference_modules()["markdown"]
+    text_type = reference_modules()["textnode"].TextType
+    nodes = [pure.TextNode(text, text_type.TEXT)]
+    nodes = pure.split_nodes_delimiter(nodes, "`", text_type.CODE)
+    nodes = pure.split_nodes_delimiter(nodes, "**", text_type.BOLD)
+    nodes = pure.split_nodes_delimiter(nodes, "_", text_type.ITALIC)
+    nodes = pure.split_nodes_image(nodes)
+    return pure.split_nodes_link(nodes)
+
+
+def reference_children(text: str) -> list[LeafNode]:
+    pure = reference_modules()["markdown"]
+    return [pure.textnode_to_htmlnode(node) for node in reference_textnodes(text)]
+
+
+@cache
+def reference_modules() -> dict[str, ModuleType]:
+    """
+    Copies of the pure Python modules (see `load_pure_modules`) whose parser
+    tokenizes the inline text of the blocks with `reference_textnodes`. They
+    are not shared, so the other renderings keep their tokenizer, even in
+    other threads.
+    """
+    modules = load_pure_modules()
+    vars(modules["markdown"])["text_to_children"] = reference_children
+    return modules
+
+
+def _escape_attribute(value: str) -> str:
+    return html.escape(value, quote=False).replace('"', "&quot;")
+
+
+def reference_to_html(node: HTMLNode) -> str:
+    """
+    Serialize a node the plain way, without the shortcuts of `to_html` (and
+    without minifying it).
+    """
+    props = "".join(
+        f' {name}="{_escape_attribute(value)}"'
+        for name, value in (node.props or {}).items()
+    )
+    if node.children is not None:  # a parent node
+        if not node.tag:
+            raise ValueError("tag is required!")
+        if not node.children:
+            raise ValueError("children is required!")
+        children = "".join(reference_to_html(child) for child in node.children)
+        return f"<{node.tag}{props}>{children}</{node.tag}>"
+
+    if not node.value:
+        raise ValueError("all leaf must have a value!")
+    if not node.tag:
+        return html.escape(node.value, quote=False)
+    if node.tag == "img":
+        if not node.props or "src" not in node.props:
+            raise ValueError("'src' attribute is required!")
+        return f'<img alt="{_escape_attribute(node.value)}"{props} />'
+    return f"<{node.tag}{props}>{html.escape(node.value, quote=False)}</{node.tag}>"
+
+
+def render_reference(text: str) -> str:
+    """Render markdown in pure Python, without any of the optimizations."""
+    highlight._tokenize.cache_clear()  # pyright: ignore[reportPrivateUsage]
+    return reference_to_html(
+        reference_modules()["markdown"].markdown_to_html_node(text)
+    )
+
+
+def render_tokenizer(text: str) -> str:
+    return reference_to_html(markdown_to_html_node(text))
+
+
+def render_serializer(text: str) -> str:
+    return markdown_to_html_node(text).to_html()
+
+
+def render_pure(text: str) -> str:
+    return pure_modules()["markdown"].markdown_to_html_node(text).to_html()
+
+
+def render_twice(render: Render, text: str) -> str:
+    """Render twice, to check the second rendering, from what the first cached."""
+    _ = render(text)
+    return render(text)
+
+
+def render_paths(
+    cache: BuildCache, executor: Executor | None = None
+) -> dict[str, tuple[Render, Render]]:
+    """
+    Every optimized path, by name: the function rendering markdown through
+    it, and the reference function it must render exactly the same as.
+    """
+    minified = RenderOptions(minify=True)
+    render_minified = partial(render_markdown, options=minified)
+    paths: dict[str, tuple[Render, Render]] = {
+        "tokenizer": (render_tokenizer, render_reference),
+        # the tree of the optimized parser, serialized the plain way
+        "serializer": (render_serializer, render_tokenizer),
+        "render": (render_markdown, render_reference),
+        "block cache": (partial(render_markdown, cache=cache), render_reference),
+        "block cache (hits)": (
+            partial(render_twice, partial(render_markdown, cache=cache)),
+            render_reference,
+        ),
+        "minified block cache": (
+            partial(render_twice, partial(render_minified, cache=cache)),
+            render_minified,
+        ),
+    }
+    if is_compiled(markdown):
+        paths["compiled"] = (render_serializer, render_pure)
+    if executor is not None:
+        paths["parallel"] = (
+            partial(render_markdown, executor=executor, chunks=CHUNKS),
+            render_reference,
+        )
+        paths["minified parallel"] = (
+            partial(render_minified, executor=executor, chunks=CHUNKS),
+            render_minified,
+        )
+    return paths
+
+
+def outcome(render: Render, text: str) -> bytes:
+    """The HTML rendered, or the type of the markdown error raised instead."""
+    syntax_errors = (
+        markdown.MarkdownSyntaxError,
+        pure_modules()["markdown"].MarkdownSyntaxError,
+        reference_modules()["markdown"].MarkdownSyntaxError,
+    )
+    try:
+        return render(text).encode()
+    except (ValueError, *syntax_errors) as e:
+        return f"<raised {type(e).__name__}>".encode()
+    except Exception as e:
+        if type(e) is not Exception:  # not a link without a url
+            raise
+        return b"<raised Exception>"
+
+
+def first_difference(expected: bytes, actual: bytes) -> int | None:
+    """The offset of the first byte differing, or None when they are equal."""
+    if expected == actual:
+        return None
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            return i
+    return min(len(expected), len(actual))
+
+
+def _reduce(parts: list[str], separator: str, diverges: Callable[[str], bool]):
+    """Remove the runs of parts, halving their length, while still diverging."""
+    size = max(1, len(parts) // 2)
+    while True:
+        i = 0
+        while i < len(parts):
+            candidate = parts[:i] + parts[i + size :]
+            if diverges(separator.join(candidate)):
+                parts = candidate
+            else:
+                i += size
+        if size == 1:
+            return parts
+        size //= 2
+
+
+def minimize(text: str, diverges: Callable[[str], bool]) -> str:
+    """A smaller input still diverging: with fewer blocks, lines, then characters."""
+    text = "\n\n".join(_reduce(text.split("\n\n"), "\n\n", diverges))
+    text = "\n".join(_reduce(text.split("\n"), "\n", diverges))
+    return "".join(_reduce(list(text), "", diverges))
+
+
+class Divergence:
+    """An input rendered differently by an optimized path and its reference."""
+
+    path: str
+    markdown: str
+    offset: int
+    expected: bytes
+    actual: bytes
+
+    def __init__(
+        self, path: str, markdown: str, offset: int, expected: bytes, actual: bytes
+    ):
+        self.path = path
+        self.markdown = markdown
+        self.offset = offset
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self):
+        start = max(0, self.offset - CONTEXT)
+        end = self.offset + CONTEXT
+        return (
+            f"{self.path}: first difference at byte {self.offset}, "
+            f"rendering {self.markdown!r}\n"
+            f"  reference: {self.expected[start:end]!r}\n"
+            f"  {self.path}: {self.actual[start:end]!r}"
+        )
+
+
+def diverge(
+    name: str, render: Render, reference: Render, text: str
+) -> Divergence | None:
+    """How `render` diverges from `reference` on `text`, on a minimized input."""
+
+    def diverges(text: str) -> bool:
+        return outcome(render, text) != outcome(reference, text)
+
+    if not diverges(text):
+        return None
+    text = minimize(text, diverges)
+    expected, actual = outcome(reference, text), outcome(render, text)
+    offset = first_difference(expected, actual)
+    assert offset is not None
+    return Divergence(name, text, offset, expected, actual)
+
+
+def check(
+    paths: dict[str, tuple[Render, Render]], inputs: Iterable[str]
+) -> list[Divergence]:
+    """The first divergence of every path diverging on one of `inputs`."""
+    divergences: dict[str, Divergence] = {}
+    for text in inputs:
+        for name, (render, reference) in paths.items():
+            if name in divergences:
+                continue
+            divergence = diverge(name, render, reference, text)
+            if divergence is not None:
+                divergences[name] = divergence
+    return list(divergences.values())
+
+
+def markdown_test_strings() -> list[str]:
+    """The strings of `test_markdown.py`, inputs and expected HTML alike."""
+    tree = ast.parse(Path(__file__).with_name("test_markdown.py").read_text())
+    strings = (
+        node.value
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Constant) and isinstance(node.value, str)
+    )
+    return list(dict.fromkeys(strings))
+
+
+def inputs(pages: int, seed: int = 0, size: int = 50) -> Iterator[str]:
+    """
+    The test cases, the adversarial inputs of `size` and `pages` generated
+    documents of growing length.
+    """
+    yield from markdown_test_strings()
+    for generate in ADVERSARIAL.values():
+        yield generate(size)
+    for i in range(pages):
+        yield generate_markdown(1 + i % 40, seed + i)
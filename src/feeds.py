@@ -0,0 +1,282 @@
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from htmlnode import escape_attribute, escape_text
+from output import Output, page_url
+
+# the metadata of the pages, persisted with the site for the next build
+METADATA_FILE = "pages.json"
+SITEMAP = "sitemap.xml"
+# the most URLs a sitemap may list: more are split under a sitemap index
+SITEMAP_URLS = 50_000
+FEED = "feed.xml"
+# the most recently updated pages of a section listed in its feed
+FEED_ENTRIES = 20
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+
+class XmlWriter:
+    """Write an XML document as it goes, element by element, without a tree."""
+
+    parts: list[str]
+    open_tags: list[str]
+
+    def __init__(self):
+        self.parts = ['<?xml version="1.0" encoding="utf-8"?>\n']
+        self.open_tags = []
+
+    def start(self, tag: str, attributes: dict[str, str] | None = None):
+        self.parts.append(f"<{tag}{xml_attributes(attributes)}>")
+        self.open_tags.append(tag)
+
+    def element(
+        self, tag: str, text: str = "", attributes: dict[str, str] | None = None
+    ):
+        if text:
+            self.parts.append(
+                f"<{tag}{xml_attributes(attributes)}>{escape_text(text)}</{tag}>"
+            )
+        else:
+            self.parts.append(f"<{tag}{xml_attributes(attributes)}/>")
+
+    def end(self):
+        self.parts.append(f"</{self.open_tags.pop()}>")
+
+    def getvalue(self) -> bytes:
+        assert not self.open_tags, f"<{self.open_tags[-1]}> is not closed"
+        return ("".join(self.parts) + "\n").encode()
+
+
+def xml_attributes(attributes: dict[str, str] | None) -> str:
+    if not attributes:
+        return ""
+    return "".join(
+        f' {name}="{escape_attribute(value)}"' for name, value in attributes.items()
+    )
+
+
+class PageMetadata:
+    """What the sitemap and the feeds have of a page, recorded as it is generated."""
+
+    section: str
+    title: str
+    hash: str
+    # when the content of the page last changed, in UTC
+    updated: str
+    # when the page was first seen, in UTC, kept as it changes
+    published: str
+
+    def __init__(
+        self, section: str, title: str, hash: str, updated: str, published: str = ""
+    ):
+        self.section = section
+        self.title = title
+        self.hash = hash
+        self.updated = updated
+        self.published = published or updated
+
+
+class SiteMetadata:
+    """
+    The metadata of every page of the site, by output name. Pages are only
+    read to be generated: the metadata of the others is that of the previous
+    build, so that the sitemap and the feeds never read the pages again.
+    """
+
+    site_url: str
+    sitemaps: int
+    pages: dict[str, PageMetadata]
+    # the hash of every listing page written, by output name
+    listings: dict[str, str]
+
+    def __init__(
+        self,
+        site_url: str = "",
+        sitemaps: int = 0,
+        pages: dict[str, PageMetadata] | None = None,
+        listings: dict[str, str] | None = None,
+    ):
+        self.site_url = site_url
+        self.sitemaps = sitemaps
+        self.pages = pages or {}
+        self.listings = listings or {}
+
+    @staticmethod
+    def load(path: Path) -> "SiteMetadata":
+        try:
+            with open(path) as file:
+                data: dict[str, object] = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return SiteMetadata()
+        pages: dict[str, list[str]] = data["pages"]  # pyright: ignore[reportAssignmentType]
+        return SiteMetadata(
+            str(data["site_url"]),
+            int(data["sitemaps"]),  # pyright: ignore[reportArgumentType]
+            {name: PageMetadata(*entry) for name, entry in pages.items()},
+            data.get("listings"),  # pyright: ignore[reportArgumentType]
+        )
+
+    @property
+    def author(self) -> str:
+        """The author of the feeds, which Atom requires: the host of the site."""
+        return urlsplit(self.site_url).netloc or self.site_url
+
+    def to_json(self) -> bytes:
+        pages = {
+            name: [page.section, page.title, page.hash, page.updated, page.published]
+            for name, page in sorted(self.pages.items())
+        }
+        data = {
+            "site_url": self.site_url,
+            "sitemaps": self.sitemaps,
+            "pages": pages,
+            "listings": dict(sorted(self.listings.items())),
+        }
+        return (json.dumps(data, indent=2) + "\n").encode()
+
+    def update(
+        self, generated: dict[str, PageMetadata], names: set[str], now: str
+    ) -> set[str]:
+        """
+        Record the pages `generated` by a build, as of `now` for those whose
+        content changed, and forget the pages no longer in `names`. A page
+        keeps the date it was first published, `now` unless it has one.
+        Return the sections of the pages added, changed or removed.
+        """
+        changed: set[str] = set()
+        for name in [name for name in self.pages if name not in names]:
+            changed.add(self.pages.pop(name).section)
+        for name, page in generated.items():
+            previous = self.pages.get(name)
+            if previous is not None:
+                page.published = previous.published
+            elif not page.published:
+                page.published = now
+            if previous is not None and previous.hash == page.hash:
+                if previous.title == page.title and previous.section == page.section:
+                    continue
+                page.updated = previous.updated
+            else:
+                page.updated = now
+            if previous is not None:
+                changed.add(previous.section)
+            changed.add(page.section)
+            self.pages[name] = page
+        return changed
+
+
+def absolute_url(site_url: str, basepath: str, name: str) -> str:
+    return site_url.rstrip("/") + basepath.rstrip("/") + page_url(name)
+
+
+def sitemap_files(metadata: SiteMetadata, basepath: str) -> Iterator[tuple[str, bytes]]:
+    """
+    The sitemap of the pages, by name: a single `sitemap.xml`, or one
+    `sitemap-<n>.xml` per `SITEMAP_URLS` pages listed in `sitemap.xml`. The
+    files are generated one at a time.
+    """
+    names = sorted(metadata.pages)
+    parts = (len(names) + SITEMAP_URLS - 1) // SITEMAP_URLS
+    for part in range(max(parts, 1)):
+        writer = XmlWriter()
+        writer.start("urlset", {"xmlns": SITEMAP_NS})
+        for name in names[part * SITEMAP_URLS : (part + 1) * SITEMAP_URLS]:
+            writer.start("url")
+            writer.element("loc", absolute_url(metadata.site_url, basepath, name))
+            writer.element("lastmod", metadata.pages[name].updated)
+            writer.end()
+        writer.end()
+        yield (SITEMAP if parts <= 1 else f"sitemap-{part + 1}.xml"), writer.getvalue()
+    if parts <= 1:
+        return
+
+    writer = XmlWriter()
+    writer.start("sitemapindex", {"xmlns": SITEMAP_NS})
+    for part in range(parts):
+        pages = names[part * SITEMAP_URLS : (part + 1) * SITEMAP_URLS]
+        writer.start("sitemap")
+        url = metadata.site_url.rstrip("/") + basepath.rstrip("/")
+        writer.element("loc", f"{url}/sitemap-{part + 1}.xml")
+        writer.element("lastmod", max(metadata.pages[name].updated for name in pages))
+        writer.end()
+    writer.end()
+    yield SITEMAP, writer.getvalue()
+
+
+def feed_name(section: str) -> str:
+    return f"{section}/{FEED}" if section else FEED
+
+
+def section_feed(metadata: SiteMetadata, basepath: str, section: str) -> bytes:
+    """The Atom feed of the most recently updated pages of a section."""
+    names = sorted(
+        name for name, page in metadata.pages.items() if page.section == section
+    )
+    # most recent first, then by name
+    names.sort(key=lambda name: metadata.pages[name].updated, reverse=True)
+    pages = [(metadata.pages[name].updated, name) for name in names[:FEED_ENTRIES]]
+    index = f"{section}/index.html" if section else "index.html"
+    section_url = absolute_url(metadata.site_url, basepath, index)
+    writer = XmlWriter()
+    writer.start("feed", {"xmlns": ATOM_NS})
+    writer.element("id", section_url)
+    writer.element("title", section or metadata.site_url)
+    writer.element("updated", pages[0][0] if pages else "")
+    writer.start("author")
+    writer.element("name", metadata.author)
+    writer.end()
+    writer.element("link", attributes={"href": section_url})
+    writer.element(
+        "link",
+        attributes={
+            "rel": "self",
+            "href": absolute_url(metadata.site_url, basepath, feed_name(section)),
+        },
+    )
+    for updated, name in pages:
+        url = absolute_url(metadata.site_url, basepath, name)
+        writer.start("entry")
+        writer.element("id", url)
+        writer.element("title", metadata.pages[name].title or name)
+        writer.element("updated", updated)
+        writer.element("link", attributes={"href": url})
+        writer.end()
+    writer.end()
+    return writer.getvalue()
+
+
+def write_sitemap_and_feeds(
+    metadata: SiteMetadata,
+    changed: set[str],
+    basepath: str,
+    output: Output,
+) -> int:
+    """
+    Write the sitemap, unless no page was added, changed or removed, and the
+    feeds of the `changed` sections, removing those of the sections gone.
+    Return the number of bytes written.
+    """
+    if not changed:
+        return 0
+    written = 0
+    previous_sitemaps, metadata.sitemaps = metadata.sitemaps, 0
+    for name, data in sitemap_files(metadata, basepath):
+        output.write(output.path(name), data)
+        written += len(data)
+        metadata.sitemaps += name != SITEMAP
+    for part in range(metadata.sitemaps, previous_sitemaps):
+        output.remove(output.path(f"sitemap-{part + 1}.xml"))
+
+    sections = {page.section for page in metadata.pages.values()}
+    for section in sorted(changed):
+        path = output.path(feed_name(section))
+        if section in sections:
+            data = section_feed(metadata, basepath, section)
+            output.write(path, data)
+            written += len(data)
+        else:
+            output.remove(path)
+    return written
@@ -0,0 +1,203 @@
+import re
+from functools import lru_cache
+
+# a (token type, text) pair; the type is None for text left unhighlighted
+type Token = tuple[str | None, str]
+
+TOKEN_CACHE_SIZE = 4096
+
+
+class Lexer:
+    """
+    Split source code into tokens. Subclasses must bump `version` whenever
+    their output changes, since it is part of every cache key.
+    """
+
+    name: str
+    aliases: tuple[str, ...]
+    version: str
+
+    def __init__(self, name: str, aliases: tuple[str, ...] = (), version: str = "1"):
+        self.name = name
+        self.aliases = aliases
+        self.version = version
+
+    def tokenize(self, code: str) -> list[Token]:
+        raise NotImplementedError
+
+
+class RegexLexer(Lexer):
+    """
+    A lexer made of `(token type, pattern)` rules, tried in order at every
+    position of the code. Text matched by no rule is left unhighlighted.
+    """
+
+    regex: re.Pattern[str]
+    token_types: list[str]
+
+    def __init__(
+        self,
+        name: str,
+        rules: list[tuple[str, str]],
+        aliases: tuple[str, ...] = (),
+        version: str = "1",
+        flags: int = re.MULTILINE,
+    ):
+        super().__init__(name, aliases, version)
+        self.token_types = [token_type for token_type, _ in rules]
+        self.regex = re.compile(
+            "|".join(f"(?P<t{i}>{pattern})" for i, (_, pattern) in enumerate(rules)),
+            flags,
+        )
+
+    def tokenize(self, code: str) -> list[Token]:
+        tokens: list[Token] = []
+        position = 0
+        for match in self.regex.finditer(code):
+            start, end = match.span()
+            if start == end:
+                continue
+            if position < start:
+                tokens.append((None, code[position:start]))
+            group = match.lastgroup or "t0"
+            tokens.append((self.token_types[int(group[1:])], match.group()))
+            position = end
+        if position < len(code):
+            tokens.append((None, code[position:]))
+        return tokens
+
+
+def _keywords(words: str) -> str:
+    return r"\b(?:" + "|".join(words.split()) + r")\b"
+
+
+PYTHON = RegexLexer(
+    "python",
+    [
+        ("comment", r"#[^\n]*"),
+        (
+            "string",
+            r"(?:(?<!\w)[rbfu]{1,2})?"
+            + r'(?:"""[\s\S]*?(?:"""|\Z)|\'\'\'[\s\S]*?(?:\'\'\'|\Z))',
+        ),
+        (
+            "string",
+            r"(?:(?<!\w)[rbfu]{1,2})?"
+            + r'(?:"(?:\\.|[^"\\\n])*(?:"|\\?$)|\'(?:\\.|[^\'\\\n])*(?:\'|\\?$))',
+        ),
+        (
+            "keyword",
+            _keywords(
+                "False None True and as assert async await break class continue "
+                "def del elif else except finally for from global if import in is "
+                "lambda match case nonlocal not or pass raise return try while with "
+                "yield"
+            ),
+        ),
+        (
+            "builtin",
+            _keywords(
+                "print len range str int float list dict set tuple bool open super "
+                "isinstance enumerate zip map filter sorted self"
+            ),
+        ),
+        ("number", r"\b(?:0[xob][0-9a-fA-F_]+|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?)\b"),
+        ("decorator", r"@\w+"),
+    ],
+    aliases=("py", "python3"),
+    version="2",
+)
+
+JAVASCRIPT = RegexLexer(
+    "javascript",
+    [
+        ("comment", r"//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)"),
+        (
+            "string",
+            r'"(?:\\.|[^"\\\n])*(?:"|\\?$)|\'(?:\\.|[^\'\\\n])*(?:\'|\\?$)'
+            + r"|`(?:\\[\s\S]|[^`\\])*(?:`|\Z)",
+        ),
+        (
+            "keyword",
+            _keywords(
+                "async await break case catch class const continue default delete do "
+                "else export extends false finally for function if import in "
+                "instanceof let new null return super switch this throw true try "
+                "typeof undefined var void while yield"
+            ),
+        ),
+        ("number", r"\b(?:0[xob][0-9a-fA-F_]+|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?)\b"),
+    ],
+    aliases=("js", "ts", "typescript"),
+    version="2",
+)
+
+SHELL = RegexLexer(
+    "shell",
+    [
+        ("comment", r"(?:^|(?<=\s))#[^\n]*"),
+        ("string", r'"(?:\\[\s\S]|[^"\\])*(?:"|\Z)|\'[^\']*\''),
+        ("variable", r"\$\{[^{}\n]*\}|\$\w+"),
+        (
+            "keyword",
+            _keywords(
+                "if then else elif fi for while until do done case esac in function "
+                "return export local set"
+            ),
+        ),
+    ],
+    aliases=("sh", "bash", "console", "zsh"),
+    version="2",
+)
+
+JSON = RegexLexer(
+    "json",
+    [
+        ("string", r'"(?:\\.|[^"\\\n])*(?:"|\\?$)'),
+        ("keyword", _keywords("true false null")),
+        ("number", r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"),
+    ],
+    version="2",
+)
+
+LEXERS: dict[str, Lexer] = {}
+
+
+def register_lexer(lexer: Lexer):
+    """Make `lexer` available for its name and every alias (case-insensitive)."""
+    for name in (lexer.name, *lexer.aliases):
+        LEXERS[name.lower()] = lexer
+
+
+for _lexer in (PYTHON, JAVASCRIPT, SHELL, JSON):
+    register_lexer(_lexer)
+
+
+def get_lexer(language: str) -> Lexer | None:
+    return LEXERS.get(language.lower())
+
+
+def lexers_version() -> str:
+    """Identify the registered lexers, to be part of the rendered blocks' keys."""
+    return ",".join(
+        sorted(
+            f"{alias}={lexer.name}:{lexer.version}" for alias, lexer in LEXERS.items()
+        )
+    )
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _tokenize(lexer: Lexer, version: str, code: str) -> tuple[Token, ...]:
+    return tuple(lexer.tokenize(code))
+
+
+def highlight(code: str, language: str) -> list[Token]:
+    """
+    Tokenize `code` with the lexer registered for `language`: the whole code
+    is a single unhighlighted token when no lexer is. Tokens are cached by
+    (language, code, lexer version), so a code block is only tokenized once.
+    """
+    lexer = get_lexer(language)
+    if lexer is None:
+        return [(None, code)]
+    return list(_tokenize(lexer, lexer.version, code))
@@ -2,6 +2,25 @@ from collections.abc import Sequence
 from functools import reduce
 from typing import override
 
+from minify import quote_attribute
+
+
+def escape_text(text: str) -> str:
+    """
+    Escape text content. Most strings have nothing to escape, so they are
+    checked first and returned as is.
+    """
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attribute(value: str) -> str:
+    """Escape a double-quoted attribute value."""
+    if '"' not in value and "&" not in value and "<" not in value and ">" not in value:
+        return value
+    return escape_text(value).replace('"', "&quot;")
+
 
 class HTMLNode:
     tag: str | None
@@ -29,11 +48,19 @@ value="{self.value}", \
 children={self.children}, \
 props={self.props})"""
 
-    def to_html(self) -> str:
+    def to_html(self, minify: bool = False) -> str:
+        """Serialize the node, as small as possible if `minify`."""
         raise NotImplementedError
 
-    def props_to_html(self) -> str:
+    def props_to_html(self, minify: bool = False) -> str:
         props = self.props or {}
+        if minify:
+            return " ".join(
+                f"{name}={quote_attribute(escape_attribute(value))}"
+                for name, value in props.items()
+            )
         return reduce(
-            lambda acc, p: acc + f' {p[0]}="{p[1]}"', props.items(), ""
+            lambda acc, p: acc + f' {p[0]}="{escape_attribute(p[1])}"',
+            props.items(),
+            "",
         ).strip()
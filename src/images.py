@@ -0,0 +1,197 @@
+import base64
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import BinaryIO
+
+from cache import BuildCache
+from htmlnode import HTMLNode
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+# the images which can be inlined in the pages as data URIs
+INLINE_SUFFIXES = IMAGE_SUFFIXES | {".svg"}
+RE_DATA_URI = re.compile(r"data:[^\s\"'>]+")
+
+# JPEG start of frame markers, holding the image dimensions
+JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# JPEG markers without a length and payload
+JPEG_STANDALONE = {0x01, *range(0xD0, 0xDA)}
+JPEG_MAX_SEGMENTS = 256
+
+
+def png_size(header: bytes) -> tuple[int, int] | None:
+    if header[12:16] != b"IHDR" or len(header) < 24:
+        return None
+    return int.from_bytes(header[16:20], "big"), int.from_bytes(header[20:24], "big")
+
+
+def gif_size(header: bytes) -> tuple[int, int] | None:
+    if len(header) < 10:
+        return None
+    return int.from_bytes(header[6:8], "little"), int.from_bytes(header[8:10], "little")
+
+
+def webp_size(header: bytes) -> tuple[int, int] | None:
+    chunk = header[12:16]
+    if chunk == b"VP8X" and len(header) >= 30:  # extended
+        width = int.from_bytes(header[24:27], "little") + 1
+        return width, int.from_bytes(header[27:30], "little") + 1
+    if chunk == b"VP8L" and len(header) >= 25 and header[20] == 0x2F:  # lossless
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":  # lossy
+        width = int.from_bytes(header[26:28], "little") & 0x3FFF
+        return width, int.from_bytes(header[28:30], "little") & 0x3FFF
+    return None
+
+
+def jpeg_size(file: BinaryIO) -> tuple[int, int] | None:
+    """Walk the segments after the SOI marker up to a frame header, seeking over the others."""
+    _ = file.seek(2)
+    for _ in range(JPEG_MAX_SEGMENTS):
+        byte = file.read(1)
+        if byte != b"\xff":
+            return None
+        marker = file.read(1)
+        while marker == b"\xff":  # fill bytes
+            marker = file.read(1)
+        if not marker:
+            return None
+        if marker[0] in JPEG_STANDALONE:
+            continue
+        length = int.from_bytes(file.read(2), "big")
+        if length < 2:
+            return None
+        if marker[0] in JPEG_SOF:
+            frame = file.read(5)
+            if len(frame) < 5:
+                return None
+            return int.from_bytes(frame[3:5], "big"), int.from_bytes(frame[1:3], "big")
+        _ = file.seek(length - 2, 1)
+    return None
+
+
+def image_size(file: BinaryIO) -> tuple[int, int] | None:
+    """
+    Read the `(width, height)` of a PNG, GIF, WebP or JPEG image from its
+    header, without reading the rest of the file. None for other formats.
+    """
+    header = file.read(30)
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return png_size(header)
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return gif_size(header)
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return webp_size(header)
+    if header.startswith(b"\xff\xd8"):
+        return jpeg_size(file)
+    return None
+
+
+def static_image_sizes(
+    static_dir: Path, cache: BuildCache | None = None
+) -> dict[str, tuple[int, int]]:
+    """
+    Sniff the dimensions of the static images from their headers, by their
+    root-relative URL. They are cached by path, size and mtime: hashing the
+    images would read them whole.
+    """
+    sizes: dict[str, tuple[int, int]] = {}
+    for dirpath, _, filenames in os.walk(static_dir):
+        for filename in sorted(filenames):
+            src = Path(dirpath) / filename
+            if src.suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+            name = src.relative_to(static_dir).as_posix()
+            key = ""
+            if cache is not None:
+                stat = src.stat()
+                key = cache.key("image", name, str(stat.st_size), str(stat.st_mtime_ns))
+                cached = cache.get("image", key)
+                if cached is not None:
+                    if cached:
+                        width, height = cached.split(b"x")
+                        sizes[f"/{name}"] = (int(width), int(height))
+                    continue
+
+            with open(src, "rb") as file:
+                size = image_size(file)
+            if size is not None:
+                sizes[f"/{name}"] = size
+            if cache is not None:
+                cache.put(
+                    "image", key, f"{size[0]}x{size[1]}".encode() if size else b""
+                )
+    return sizes
+
+
+def data_uri(data: bytes, name: str) -> str:
+    """A base64 `data:` URI of the content of the file `name`."""
+    content_type, _ = mimetypes.guess_type(name)
+    content_type = content_type or "application/octet-stream"
+    return f"data:{content_type};base64,{base64.b64encode(data).decode()}"
+
+
+def static_data_uris(
+    static_dir: Path, max_bytes: int, cache: BuildCache | None = None
+) -> dict[str, str]:
+    """
+    The data URIs of the static images of at most `max_bytes`, by their
+    root-relative URL. They are encoded once per build, and cached by hash.
+    """
+    uris: dict[str, str] = {}
+    for dirpath, _, filenames in os.walk(static_dir):
+        for filename in sorted(filenames):
+            src = Path(dirpath) / filename
+            if src.suffix.lower() not in INLINE_SUFFIXES:
+                continue
+            if src.stat().st_size > max_bytes:
+                continue
+            url = f"/{src.relative_to(static_dir).as_posix()}"
+            data = src.read_bytes()
+            if cache is None:
+                uris[url] = data_uri(data, filename)
+                continue
+            key = cache.key("inline", data, src.suffix.lower())
+            cached = cache.get("inline", key)
+            if cached is None:
+                uris[url] = data_uri(data, filename)
+                cache.put("inline", key, uris[url].encode())
+            else:
+                uris[url] = cached.decode()
+    return uris
+
+
+def inline_images(node: HTMLNode, uris: dict[str, str]):
+    """Replace the `src` of the images of `node` and its descendants found in `uris`."""
+    if node.tag == "img" and node.props is not None:
+        uri = uris.get(node.props.get("src", ""))
+        if uri is not None:
+            node.props["src"] = uri
+    for child in node.children or ():
+        inline_images(child, uris)
+
+
+def inlined_bytes(html: str, uris: dict[str, str]) -> int:
+    """The size of the data URIs of `uris` in a page."""
+    if not uris:
+        return 0
+    inlined = set(uris.values())
+    return sum(len(uri) for uri in RE_DATA_URI.findall(html) if uri in inlined)
+
+
+def annotate_images(node: HTMLNode, sizes: dict[str, tuple[int, int]]):
+    """
+    Lazy load the images of `node` and its descendants, with the dimensions
+    found in `sizes` for their `src` so that they take their place in the
+    layout before being loaded.
+    """
+    if node.tag == "img" and node.props is not None:
+        size = sizes.get(node.props.get("src", ""))
+        if size is not None:
+            node.props["width"], node.props["height"] = str(size[0]), str(size[1])
+        node.props["loading"] = "lazy"
+        node.props["decoding"] = "async"
+    for child in node.children or ():
+        annotate_images(child, sizes)
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Self, TextIO
+
+from cache import GENERATOR_VERSION
+from highlight import lexers_version
+
+CHECKPOINT_PAGES = 100
+CHECKPOINT_SECONDS = 5.0
+
+
+def hash_file(path: Path) -> str | None:
+    try:
+        with open(path, "rb") as file:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class Journal:
+    """
+    Append-only log of the pages written by a build, one JSON line per page
+    with the hash of its inputs and of its output. It is checkpointed (flushed
+    to disk) every `CHECKPOINT_PAGES` pages or `CHECKPOINT_SECONDS` seconds, so
+    that a killed build can be resumed from it. Pages are recorded within a
+    `with` block, which opens the file.
+    """
+
+    path: Path
+    resume: bool
+    entries: dict[str, tuple[str, str]]
+    file: TextIO | None
+    pending: int
+    last_checkpoint: float
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = path
+        self.resume = resume
+        self.entries = self.load(path) if resume else {}
+        self.file = None
+        self.pending = 0
+        self.last_checkpoint = time.monotonic()
+
+    def __enter__(self) -> Self:
+        self.path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        if self.resume:
+            truncate_torn_line(self.path)
+        self.file = open(self.path, "a" if self.resume else "w")
+        return self
+
+    def __exit__(self, *_: object):
+        self.close()
+
+    @staticmethod
+    def load(path: Path) -> dict[str, tuple[str, str]]:
+        entries: dict[str, tuple[str, str]] = {}
+        try:
+            with open(path, "r") as file:
+                for line in file:
+                    if not line.endswith("\n"):  # torn write of a killed build
+                        continue
+                    try:
+                        entry: dict[str, str] = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    entries[entry["dest"]] = (entry["input"], entry["output"])
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def record(self, dest: str, input_hash: str, output_hash: str):
+        self.entries[dest] = (input_hash, output_hash)
+        entry = {"dest": dest, "input": input_hash, "output": output_hash}
+        assert self.file is not None, "the journal is not open"
+        _ = self.file.write(json.dumps(entry) + "\n")
+        self.pending += 1
+        if (
+            self.pending >= CHECKPOINT_PAGES
+            or time.monotonic() - self.last_checkpoint >= CHECKPOINT_SECONDS
+        ):
+            self.checkpoint()
+
+    def checkpoint(self):
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_checkpoint = time.monotonic()
+
+    def close(self):
+        self.checkpoint()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def truncate_torn_line(path: Path):
+    """
+    Cut the journal of a killed build after its last complete line, for the
+    next record not to be appended to a torn one.
+    """
+    try:
+        with open(path, "rb+") as file:
+            _ = file.truncate(file.read().rfind(b"\n") + 1)
+    except FileNotFoundError:
+        pass
+
+
+def is_complete(dest: Path, input_hash: str, journaled: tuple[str, str] | None) -> bool:
+    """Whether the journal says `dest` was written from these very inputs."""
+    if journaled is None or journaled[0] != input_hash:
+        return False
+    return hash_file(dest) == journaled[1]
+
+
+def input_hash(markdown: str, template: str, basepath: str, *options: str) -> str:
+    """
+    The hash of everything a page is generated from, the generator and its
+    lexers included, for a resumed build to tell whether it would differ.
+    """
+    digest = hashlib.sha256()
+    parts = (GENERATOR_VERSION, lexers_version(), markdown, template, basepath)
+    for part in (*parts, *options):
+        data = part.encode()
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
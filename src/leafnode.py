@@ -1,5 +1,6 @@
 from typing import override
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_attribute, escape_text
+from minify import PRESERVE_WHITESPACE, collapse_whitespace, quote_attribute
 
 
 class LeafNode(HTMLNode):
@@ -22,19 +23,27 @@ class LeafNode(HTMLNode):
         )
 
     @override
-    def to_html(self) -> str:
+    def to_html(self, minify: bool = False) -> str:
         if not self.value:
             raise ValueError("all leaf must have a value!")
         if not self.tag:
-            return self.value
+            if minify:
+                return collapse_whitespace(escape_text(self.value))
+            return escape_text(self.value)
 
-        props = super().props_to_html()
+        props = super().props_to_html(minify)
         if self.tag == "img":
             if not self.props or "src" not in self.props:
                 raise ValueError("'src' attribute is required!")
 
-            return f'<{self.tag} alt="{self.value}" {props} />'
+            alt = escape_attribute(self.value)
+            if minify:
+                return f"<{self.tag} alt={quote_attribute(alt)} {props}>"
+            return f'<{self.tag} alt="{alt}" {props} />'
 
+        value = escape_text(self.value)
+        if minify and self.tag not in PRESERVE_WHITESPACE:
+            value = collapse_whitespace(value)
         if props:
-            return f"<{self.tag} {props}>{self.value}</{self.tag}>"
-        return f"<{self.tag}>{self.value}</{self.tag}>"
+            return f"<{self.tag} {props}>{value}</{self.tag}>"
+        return f"<{self.tag}>{value}</{self.tag}>"
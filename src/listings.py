@@ -0,0 +1,107 @@
+import hashlib
+from collections.abc import Callable, Iterator
+
+from feeds import SiteMetadata
+from htmlnode import escape_attribute, escape_text
+from output import Output, page_url
+
+# `<section>/page/<n>/` lists the pages of a section, `archive/<year>/page/<n>/`
+# those of a year
+LISTING_DIR = "page"
+ARCHIVE_DIR = "archive"
+# the pages listed on a listing page by default
+PAGES_PER_LISTING = 20
+
+
+def listing_name(directory: str, number: int) -> str:
+    return f"{directory}/{LISTING_DIR}/{number}/index.html"
+
+
+def listings(metadata: SiteMetadata) -> dict[str, list[str]]:
+    """
+    The pages of every listing, by its directory: every section, and
+    `archive/<year>` for the year every page was published. Pages are listed
+    by publication, oldest first (then by name), so that a page added only
+    changes the last listing pages, and a page edited stays in its place.
+    """
+    names = sorted(metadata.pages)
+    names.sort(key=lambda name: metadata.pages[name].published)
+    groups: dict[str, list[str]] = {}
+    for name in names:
+        page = metadata.pages[name]
+        if page.section:
+            groups.setdefault(page.section, []).append(name)
+        groups.setdefault(f"{ARCHIVE_DIR}/{page.published[:4]}", []).append(name)
+    return dict(sorted(groups.items()))
+
+
+def listing_html(
+    title: str, links: list[tuple[str, str]], previous: str | None, next: str | None
+) -> str:
+    """The content of a listing page, linking to the pages before and after it."""
+    items = "".join(
+        f'<li><a href="{escape_attribute(url)}">{escape_text(text)}</a></li>'
+        for url, text in links
+    )
+    html = f"<h1>{escape_text(title)}</h1><ul>{items}</ul>"
+    if previous is None and next is None:
+        return html
+    pages: list[str] = []
+    if previous is not None:
+        pages.append(f'<a rel="prev" href="{escape_attribute(previous)}">Previous</a>')
+    if next is not None:
+        pages.append(f'<a rel="next" href="{escape_attribute(next)}">Next</a>')
+    return f'{html}<nav class="pagination">{" ".join(pages)}</nav>'
+
+
+def listing_pages(
+    metadata: SiteMetadata, per_page: int
+) -> Iterator[tuple[str, str, str]]:
+    """The name, title and content of every listing page, one at a time."""
+    for directory, names in listings(metadata).items():
+        count = (len(names) + per_page - 1) // per_page
+        for number in range(1, count + 1):
+            title = directory if number == 1 else f"{directory} ({number})"
+            links = [
+                (page_url(name), metadata.pages[name].title or name)
+                for name in names[(number - 1) * per_page : number * per_page]
+            ]
+            previous = page_url(listing_name(directory, number - 1))
+            next = page_url(listing_name(directory, number + 1))
+            yield (
+                listing_name(directory, number),
+                title,
+                listing_html(
+                    title,
+                    links,
+                    previous if number > 1 else None,
+                    next if number < count else None,
+                ),
+            )
+
+
+def write_listings(
+    metadata: SiteMetadata,
+    per_page: int,
+    render: Callable[[str, str], str],
+    output: Output,
+) -> int:
+    """
+    Write the listing pages rendered by `render(title, content)` that changed
+    since the previous build, and remove those no longer needed. Return the
+    number of bytes written.
+    """
+    written = 0
+    previous = metadata.listings
+    metadata.listings = {}
+    for name, title, content in listing_pages(metadata, per_page):
+        data = render(title, content).encode()
+        digest = hashlib.sha256(data).hexdigest()
+        metadata.listings[name] = digest
+        if previous.get(name) != digest:
+            output.write(output.path(name), data)
+            written += len(data)
+    for name in sorted(previous):
+        if name not in metadata.listings:
+            output.remove(output.path(name))
+    return written
@@ -1,67 +1,1156 @@
+import argparse
+import copy
+import hashlib
+import json
 import os
+import subprocess
+from collections import Counter
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
 import sys
+import time
 
-from markdown import extract_title, markdown_to_html_node
+from assets import (
+    ASSET_MANIFEST,
+    HEADERS_FILE,
+    AssetManifest,
+    fingerprint_static,
+    rewrite_template,
+    rewrite_urls,
+)
+from budget import time_budget
+from cache import CACHE_DIR_ENV, BuildCache, atomic_write, parse_size
+from check import check_page, site_index
+from changes import ChangeSet, added_dates, changes_since
+from config import SPLIT_THRESHOLD, TEMPLATE_PATH, BuildConfig
+from listings import ARCHIVE_DIR, LISTING_DIR, PAGES_PER_LISTING, write_listings
+from markdown import (
+    block_to_html_node,
+    extract_title,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    page_title,
+    split_blocks,
+)
+from feeds import (
+    METADATA_FILE,
+    PageMetadata,
+    SiteMetadata,
+    write_sitemap_and_feeds,
+)
+from highlight import lexers_version
+from htmlnode import HTMLNode, escape_text
+from images import (
+    IMAGE_SUFFIXES,
+    INLINE_SUFFIXES,
+    annotate_images,
+    inline_images,
+    inlined_bytes,
+    static_data_uris,
+    static_image_sizes,
+)
+from journal import Journal, hash_file, input_hash, is_complete
+from minify import join_children, minify_template, start_tag
+from options import SEARCH_SCRIPT, RenderOptions
+from output import DirectoryOutput, MemoryOutput, Output, OrderedWriter, open_output
+from related import (
+    RELATED_FILE,
+    load_related,
+    related_html,
+    related_json,
+    related_links,
+)
+from report import BuildReport, PageReport, compare_reports, load_report
+from scheduler import longest_first
+from search import SEARCH_DIR, SEARCH_MANIFEST, SearchIndex
+from server import serve
+from sources import (
+    ContentSource,
+    DirectorySource,
+    SQLITE_TABLE,
+    MemorySource,
+    changes_between,
+    file_versions,
+    open_source,
+    page_section,
+)
+from static import copy_changed_static, copy_static
 
+CHUNKS_PER_JOB = 4
 
-def generate_page(basepath: str, from_path: Path, template_path: Path, dest_path: Path):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+
+# the options of a worker process, given once as it starts (see `init_worker`)
+# rather than with every page, for they hold the data URIs of the site
+worker_options = RenderOptions()
+
+
+def init_worker(options: RenderOptions):
+    global worker_options
+    worker_options = options
+
+
+def transform_node(node: HTMLNode, options: RenderOptions):
+    """Apply the build stages working on the nodes of a page."""
+    if options.images is not None:  # before the URLs are fingerprinted
+        annotate_images(node, options.images)
+    if options.inline:
+        inline_images(node, options.inline)
+    if options.assets:
+        rewrite_urls(node, options.assets)
+
+
+def render_blocks(blocks: list[str], options: RenderOptions | None = None) -> list[str]:
+    options = options or RenderOptions()
+    html: list[str] = []
+    for block in blocks:
+        node = block_to_html_node(block)
+        transform_node(node, options)
+        html.append(node.to_html(options.minify))
+    return html
+
+
+def render_markdown(
+    markdown: str,
+    cache: BuildCache | None = None,
+    executor: Executor | None = None,
+    chunks: int = 1,
+    options: RenderOptions | None = None,
+) -> str:
+    """
+    Render markdown to HTML, reusing the blocks found in the cache. With an
+    executor, the blocks left to render are split in `chunks` groups rendered
+    in parallel and stitched back in order.
+    """
+    options = options or RenderOptions()
+    blocks = markdown_to_blocks(markdown)
+    if (cache is None and executor is None) or not blocks:
+        node = markdown_to_html_node(markdown)
+        transform_node(node, options)
+        return node.to_html(options.minify)
+
+    lexers = lexers_version()
+    keys: dict[str, str] = {}
+    html_blocks: list[str | None] = [None] * len(blocks)
+    if cache is not None:
+        for i, block in enumerate(blocks):
+            # keyed on the options of the URLs the block references only
+            option_key = options.referencing(block).key()
+            keys[block] = cache.key("block", block, lexers, option_key)
+            cached = cache.get("block", keys[block])
+            if cached is not None:
+                html_blocks[i] = cached.decode()
+
+    missing = [i for i, html in enumerate(html_blocks) if html is None]
+    # a block repeated in the page is rendered once
+    missing_blocks = list(dict.fromkeys(blocks[i] for i in missing))
+    if executor is None or chunks <= 1:
+        rendered = render_blocks(missing_blocks, options)
+    else:
+        groups = split_blocks(missing_blocks, chunks)
+        render = partial(render_blocks, options=options)
+        rendered = [html for group in executor.map(render, groups) for html in group]
+
+    rendered_blocks = dict(zip(missing_blocks, rendered))
+    for i in missing:
+        html_blocks[i] = rendered_blocks[blocks[i]]
+    if cache is not None:
+        for block, html in rendered_blocks.items():
+            cache.put("block", keys[block], html.encode())
+    done = [html for html in html_blocks if html is not None]
+    if options.minify:
+        # blocks are serialized on their own, but the end tags they can omit
+        # depend on the next one
+        content = join_children("div", [(start_tag(html), html) for html in done])
+    else:
+        content = "".join(done)
+    return f"<div>{content}</div>"
+
+
+def render_page(
+    markdown: str,
+    template: str,
+    basepath: str,
+    cache: BuildCache | None = None,
+    executor: Executor | None = None,
+    chunks: int = 1,
+    options: RenderOptions | None = None,
+    related: str = "",
+) -> str:
+    options = options or RenderOptions()
+    content = render_markdown(markdown, cache, executor, chunks, options)
+    title = extract_title(markdown)
+    return fill_template(template, title, content, basepath, options, related)
+
+
+def search_template(template: str, options: RenderOptions) -> str:
+    """The template loading the search script in place of `{{ Search }}`, if enabled."""
+    return template.replace("{{ Search }}", SEARCH_SCRIPT if options.search else "")
+
+
+def fill_template(
+    template: str,
+    title: str,
+    content: str,
+    basepath: str,
+    options: RenderOptions,
+    related: str = "",
+) -> str:
+    """The page of `template` with a title (as text) and its content (as HTML)."""
+    template = search_template(template, options)
+    if options.assets:
+        template = rewrite_template(template, options.assets)
+    if options.minify:
+        template = minify_template(template)
+    html_page = template.replace("{{ Basepath }}", basepath)
+    html_page = html_page.replace("{{ Title }}", escape_text(title))
+    html_page = html_page.replace("{{ Content }}", content)
+    html_page = html_page.replace("{{ Related }}", related)
+    html_page = html_page.replace('href="/', f'href="{basepath}')
+    html_page = html_page.replace('src="/', f'src="{basepath}')
+    if options.minify:  # and so unquoted
+        html_page = html_page.replace("href=/", f"href={basepath}")
+        html_page = html_page.replace("src=/", f"src={basepath}")
+    return html_page
+
+
+def generate_page(
+    basepath: str,
+    from_path: Path,
+    template_path: Path,
+    dest_path: Path,
+    cache: BuildCache | None = None,
+    executor: Executor | None = None,
+    chunks: int = 1,
+    journaled: tuple[str, str] | None = None,
+    options: RenderOptions | None = None,
+    output: Output | None = None,
+    source: ContentSource | None = None,
+    related: str = "",
+    budget: float | None = None,
+    template: str | None = None,
+) -> PageReport:
+    """
+    Generate a page, unless `journaled` (the input and output hashes recorded
+    for it by an interrupted build) shows it is already complete. `related` is
+    the list of related pages it links to. The page fails when rendering it
+    takes more than `budget` seconds. The page is rendered with `template`,
+    or the template read from `template_path`. Without `options`, the page
+    is rendered with those of the worker process.
+    """
+    options = options or worker_options
+    output = output or DirectoryOutput(dest_path.parent)
+    source = source or DirectorySource(from_path.parent)
+    page = PageReport(str(from_path), str(dest_path))
+    hits = cache.hits.copy() if cache is not None else Counter[str]()
+    misses = cache.misses.copy() if cache is not None else Counter[str]()
+    start = time.perf_counter()
     try:
-        with open(from_path, "r") as file:
-            markdown = file.read()
-        with open(template_path, "r") as file:
-            template = file.read()
-
-        content = markdown_to_html_node(markdown)
-        title = extract_title(markdown)
-        html_page = template.replace("{{ Title }}", title)
-        html_page = html_page.replace("{{ Content }}", content.to_html())
-        html_page = html_page.replace('href="/', f'href="{basepath}')
-        html_page = html_page.replace('src="/', f'src="{basepath}')
-
-        dest_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
-        with open(dest_path, "w") as file:
-            _ = file.write(html_page)
+        markdown = source.read(from_path)
+        if template is None:
+            with open(template_path, "r") as file:
+                template = file.read()
+        page.bytes_read = len(markdown.encode()) + len(template.encode())
+        template = search_template(template, options)
+        page.title = page_title(markdown)
+        page.content_hash = hashlib.sha256(markdown.encode()).hexdigest()
+        options = options.referencing(markdown, template)
+        option_key = options.key()
+        page.input_hash = input_hash(markdown, template, basepath, option_key, related)
+        page.add_time("read", time.perf_counter() - start)
+
+        if output.incremental and is_complete(dest_path, page.input_hash, journaled):
+            page.resumed = True
+            page.seconds = time.perf_counter() - start
+            return page
+
+        render_start = time.perf_counter()
+        with time_budget(budget):
+            if cache is None:
+                html_page = render_page(
+                    markdown,
+                    template,
+                    basepath,
+                    None,
+                    executor,
+                    chunks,
+                    options,
+                    related,
+                )
+            else:
+                key = cache.key(
+                    "page",
+                    markdown,
+                    template,
+                    basepath,
+                    lexers_version(),
+                    option_key,
+                    related,
+                )
+                cached = cache.get("page", key)
+                if cached is None:
+                    html_page = render_page(
+                        markdown,
+                        template,
+                        basepath,
+                        cache,
+                        executor,
+                        chunks,
+                        options,
+                        related,
+                    )
+                    cache.put("page", key, html_page.encode())
+                else:
+                    html_page = cached.decode()
+        page.add_time("render", time.perf_counter() - render_start)
+
+        page.inlined_bytes = inlined_bytes(html_page, options.inline)
+        write_start = time.perf_counter()
+        data = html_page.encode()
+        output.write(dest_path, data)
+        page.bytes_written = len(data)
+        page.output_hash = hashlib.sha256(data).hexdigest()
+        page.add_time("write", time.perf_counter() - write_start)
 
     except FileNotFoundError as e:
-        print(f"'{e.filename}' not found")  # pyright: ignore[reportAny]
+        page.error = f"'{e.filename}' not found"  # pyright: ignore[reportAny]
     except Exception as e:
-        print(e)
+        page.error = str(e)
+
+    page.seconds = time.perf_counter() - start
+    if cache is not None:
+        page.cache_hits = cache.hits - hits
+        page.cache_misses = cache.misses - misses
+    return page
+
+
+def generate_page_files(
+    basepath: str,
+    from_path: Path,
+    template_path: Path,
+    dest_path: Path,
+    root: Path,
+    cache: BuildCache | None = None,
+    options: RenderOptions | None = None,
+    source: ContentSource | None = None,
+    related: str = "",
+    budget: float | None = None,
+    template: str | None = None,
+) -> tuple[PageReport, dict[str, bytes]]:
+    """Generate a page in memory, for a worker to send it to the parent."""
+    output = MemoryOutput(root)
+    page = generate_page(
+        basepath=basepath,
+        from_path=from_path,
+        template_path=template_path,
+        dest_path=dest_path,
+        cache=cache,
+        options=options,
+        output=output,
+        source=source,
+        related=related,
+        budget=budget,
+        template=template,
+    )
+    return page, output.files
+
+
+def generate_pages(
+    config: BuildConfig,
+    pages: dict[Path, Path],
+    output: Output | None = None,
+    source: ContentSource | None = None,
+    options: RenderOptions | None = None,
+    report: BuildReport | None = None,
+    related: dict[Path, str] | None = None,
+):
+    """
+    Generate every `source -> dest` page. With several jobs, the pages are
+    dispatched to worker processes, the most expensive ones first. Pages of
+    at least `split_threshold` bytes are generated first, one at a time, with
+    their blocks rendered by all the workers. An output the workers cannot
+    write to gets the pages from the parent, in the order of their paths.
+
+    Every page written is recorded in the journal, and the pages it lists as
+    complete are skipped. `related` has the list of related pages of every
+    page, by dest path. Worker processes get the options of `config` a page
+    needs as arguments, rather than `config`, which holds the open journal.
+    """
+    output = output or DirectoryOutput(Path())
+    source = source or DirectorySource(Path())
+    journal = config.journal
+    journaled = journal.entries if journal is not None else {}
+    related = related or {}
+    cache, template_path = config.cache, config.template_path
+
+    def worker_source(from_path: Path) -> ContentSource:
+        """The source a worker reads a page from."""
+        if source.shared:
+            return source
+        try:
+            markdown = {source.name(from_path): source.read(from_path)}
+        except (OSError, UnicodeError):  # for the worker to report
+            markdown = {}
+        return MemorySource(source.root, markdown)
+
+    def done(page: PageReport):
+        if report is None or not report.quiet:
+            if page.error is not None:
+                print(f"{page.source}: {page.error}", file=sys.stderr)
+            elif not page.resumed:
+                print(
+                    f"Generating page from {page.source} to {page.dest} "
+                    f"using {template_path}"
+                )
+        if report is not None:
+            report.add_page(page)
+        if journal is not None and page.error is None and not page.resumed:
+            journal.record(page.dest, page.input_hash, page.output_hash)
+
+    if config.jobs <= 1:
+        for from_path, dest_path in sorted(pages.items(), key=lambda page: page[1]):
+            done(
+                generate_page(
+                    basepath=config.basepath,
+                    from_path=from_path,
+                    template_path=template_path,
+                    dest_path=dest_path,
+                    cache=cache,
+                    journaled=journaled.get(str(dest_path)),
+                    options=options,
+                    output=output,
+                    source=source,
+                    related=related.get(dest_path, ""),
+                    budget=config.page_budget,
+                    template=config.template_text,
+                )
+            )
+        return
+
+    writer = None if output.shared else OrderedWriter(output, list(pages.values()))
+    ordered = longest_first(pages, config.history, source.size)
+    huge = [path for path in ordered if source.size(path) >= config.split_threshold]
+    with ProcessPoolExecutor(
+        max_workers=config.jobs,
+        initializer=init_worker,
+        initargs=(options or RenderOptions(),),
+    ) as executor:
+        for from_path in huge:
+            memory = MemoryOutput(output.root)
+            page = generate_page(
+                basepath=config.basepath,
+                from_path=from_path,
+                template_path=template_path,
+                dest_path=pages[from_path],
+                cache=cache,
+                executor=executor,
+                chunks=config.jobs * CHUNKS_PER_JOB,
+                journaled=journaled.get(str(pages[from_path])),
+                options=options,
+                output=output if writer is None else memory,
+                source=source,
+                related=related.get(pages[from_path], ""),
+                budget=config.page_budget,
+                template=config.template_text,
+            )
+            if writer is not None:
+                writer.add(pages[from_path], memory.files)
+            done(page)
+
+        futures: list[Future[PageReport | tuple[PageReport, dict[str, bytes]]]]
+        if writer is None:
+            futures = [
+                executor.submit(
+                    generate_page,
+                    basepath=config.basepath,
+                    from_path=from_path,
+                    template_path=template_path,
+                    dest_path=pages[from_path],
+                    cache=cache,
+                    journaled=journaled.get(str(pages[from_path])),
+                    output=output,
+                    source=worker_source(from_path),
+                    related=related.get(pages[from_path], ""),
+                    budget=config.page_budget,
+                    template=config.template_text,
+                )
+                for from_path in ordered
+                if from_path not in huge
+            ]
+        else:
+            futures = [
+                executor.submit(
+                    generate_page_files,
+                    basepath=config.basepath,
+                    from_path=from_path,
+                    template_path=template_path,
+                    dest_path=pages[from_path],
+                    root=output.root,
+                    cache=cache,
+                    source=worker_source(from_path),
+                    related=related.get(pages[from_path], ""),
+                    budget=config.page_budget,
+                    template=config.template_text,
+                )
+                for from_path in ordered
+                if from_path not in huge
+            ]
+        for future in as_completed(futures):
+            result = future.result()
+            if isinstance(result, tuple):
+                page, files = result
+                if writer is not None:
+                    writer.add(Path(page.dest), files)
+            else:
+                page = result
+            if cache is not None:  # the workers counted on their own copy
+                cache.hits.update(page.cache_hits)
+                cache.misses.update(page.cache_misses)
+            done(page)
 
 
 def generate_pages_recursive(
-    basepath: str, dir_path_content: Path, template_path: Path, dest_dir_path: Path
+    config: BuildConfig,
+    output: Output,
+    source: ContentSource,
+    options: RenderOptions | None = None,
+    report: BuildReport | None = None,
+    related: dict[Path, str] | None = None,
+):
+    """Generate every page of `source`."""
+    generate_pages(
+        config,
+        source.pages(output.root),
+        output=output,
+        source=source,
+        options=options,
+        report=report,
+        related=related,
+    )
+
+
+def content_dest_path(content_path: Path, from_path: Path, dest_path: Path) -> Path:
+    return (dest_path / content_path.relative_to(from_path)).with_suffix(".html")
+
+
+def generate_changed_pages(
+    config: BuildConfig,
+    changes: ChangeSet,
+    output: Output,
+    source: ContentSource,
+    options: RenderOptions | None = None,
+    report: BuildReport | None = None,
+    related: dict[Path, str] | None = None,
 ):
-    entries: list[str] = os.listdir(dir_path_content)
-    for entry in entries:
-        entry_path = Path(os.path.join(dir_path_content, entry))
-        new_dest_dir_path = Path(os.path.join(dest_dir_path, entry))
-
-        if os.path.isfile(entry_path) and entry_path.suffix == ".md":
-            generate_page(
-                basepath,
-                entry_path,
-                template_path,
-                new_dest_dir_path.with_suffix(".html"),
+    """Render the changed pages and remove the outputs of deleted ones."""
+    for path in sorted(changes.deleted):
+        if path.suffix == ".md":
+            dest = content_dest_path(path, source.root, output.root)
+            if report is None or not report.quiet:
+                print(f"Removing {dest}")
+            output.remove(dest)
+    pages = {
+        path: content_dest_path(path, source.root, output.root)
+        for path in sorted(changes.changed)
+        if path.suffix == ".md" and source.exists(path)
+    }
+    generate_pages(
+        config,
+        pages,
+        output=output,
+        source=source,
+        options=options,
+        report=report,
+        related=related,
+    )
+
+
+def site_versions(
+    content: ContentSource,
+    template_path: Path,
+    static_path: Path | None,
+    template: str | None = None,
+) -> dict[str, dict[str, str]]:
+    """
+    The versions of the pages, template (`template`, or the file at
+    `template_path`) and static assets of the site.
+    """
+    if template is None:
+        template_version = hash_file(template_path) or ""
+    else:
+        template_version = hashlib.sha256(template.encode()).hexdigest()
+    versions = {
+        "content": content.versions(),
+        "template": {template_path.as_posix(): template_version},
+    }
+    if static_path is not None:
+        versions["static"] = file_versions(static_path)
+    return versions
+
+
+def load_versions(path: Path) -> dict[str, dict[str, str]] | None:
+    try:
+        with open(path) as file:
+            return json.load(file)  # pyright: ignore[reportAny]
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def changes_between_versions(
+    previous: dict[str, dict[str, str]],
+    versions: dict[str, dict[str, str]],
+    content: ContentSource,
+    static_path: Path | None,
+) -> ChangeSet:
+    """What changed between the `site_versions()` of two builds."""
+    roots = {"content": content.root, "template": Path(), "static": static_path}
+    changes = ChangeSet(set(), set())
+    for kind, root in roots.items():
+        if root is not None:
+            between = changes_between(
+                root, previous.get(kind, {}), versions.get(kind, {})
             )
-        elif os.path.isdir(entry_path):
-            generate_pages_recursive(
-                basepath, entry_path, template_path, new_dest_dir_path
+            changes = ChangeSet(
+                changes.changed | between.changed, changes.deleted | between.deleted
             )
+    return changes
+
+
+def update_metadata(
+    metadata: SiteMetadata,
+    report: BuildReport,
+    output: Output,
+    content: ContentSource,
+) -> set[str]:
+    """
+    Update the metadata of the site with the pages generated. Return the
+    sections of the pages added, changed or removed. A page of a directory
+    in git is first published when it was committed, otherwise when it is
+    first generated.
+    """
+    ok = [page for page in report.pages if page.error is None]
+    added: dict[str, str] = {}
+    if isinstance(content, DirectorySource) and any(
+        output.name(Path(page.dest)) not in metadata.pages for page in ok
+    ):
+        added = added_dates(content.root)
+    generated: dict[str, PageMetadata] = {}
+    for page in ok:
+        name = content.name(Path(page.source))
+        generated[output.name(Path(page.dest))] = PageMetadata(
+            page_section(name), page.title, page.content_hash, "", added.get(name, "")
+        )
+    names = {output.name(dest) for dest in content.pages(output.root).values()}
+    now = datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return metadata.update(generated, names, now)
+
+
+def main(config: BuildConfig, output: Output, report: BuildReport | None = None):
+    """
+    Build the site of `config` to `output`. With `config.versions`, only what
+    changed since the versions recorded there by the previous build is
+    rebuilt. With `related`, every page links to that many related pages of
+    its section. With `search`, the search index is updated for the pages
+    changed. With `site_url`, the sitemap and the feeds of the sections
+    changed are written. With `listings`, every section and year is listed
+    that many pages at a time, and the listing pages that changed are
+    written. The static images of at most `inline_images` bytes are inlined
+    in the pages.
+    """
+    content = config.source()
+    from_path = content.root
+    dest_path = output.root
+    cache, static_path = config.cache, config.static
+    template_path, template = config.template_path, config.template_text
+    versions_path, since = config.versions, config.since
+
+    report = report or BuildReport()
+    changes: ChangeSet | None = None
+    versions: dict[str, dict[str, str]] | None = None
+    if versions_path is not None:
+        with report.phase("changes"):
+            versions = site_versions(content, template_path, static_path, template)
+    if (since is not None or versions_path is not None) and not output.incremental:
+        report.log(f"{dest_path} is written from scratch: full build")
+    elif since is not None and not isinstance(content, DirectorySource):
+        report.log(f"{from_path} is not a directory in git: full build")
+    elif versions_path is not None and versions is not None:
+        previous_versions = load_versions(versions_path)
+        if previous_versions is None:
+            report.log(f"No versions in {versions_path}: full build")
         else:
-            print(f"{entry}: unknown type of file")
+            changes = changes_between_versions(
+                previous_versions, versions, content, static_path
+            )
+        if changes is not None and changes.touches(template_path):
+            report.log(f"{template_path} changed: full build")
+            changes = None
+    elif since is not None:
+        watched = [from_path, template_path]
+        if static_path is not None:
+            watched.append(static_path)
+        try:
+            with report.phase("changes"):
+                changes = changes_since(since, watched)
+        except (OSError, subprocess.CalledProcessError) as e:
+            report.log(f"Cannot get changes since {since} ({e}): full build")
+        if changes is not None and changes.touches(template_path):
+            report.log(f"{template_path} changed since {since}: full build")
+            changes = None
+
+    metadata: SiteMetadata | None = None
+    if config.site_url is not None or config.listings > 0:
+        metadata = SiteMetadata()
+        if output.incremental:
+            metadata = SiteMetadata.load(dest_path / METADATA_FILE)
+        if changes is not None and not metadata.pages:
+            report.log(f"No page metadata in {dest_path / METADATA_FILE}: full build")
+            changes = None
+
+    if static_path is not None:
+        with report.phase("static"):
+            if changes is None:
+                report.bytes_written += copy_static(
+                    static_path, dest_path, config.precompress, cache, output
+                )
+            else:
+                report.bytes_written += copy_changed_static(
+                    changes.under(static_path),
+                    static_path,
+                    dest_path,
+                    config.precompress,
+                    cache,
+                    output,
+                )
+
+    options = RenderOptions(config.minify, search=config.search)
+    if static_path is not None:
+        with report.phase("images"):
+            images = static_image_sizes(static_path, cache)
+        options = copy.copy(options)
+        options.images = images
+        suffixes = IMAGE_SUFFIXES
+        if config.inline_images > 0:
+            with report.phase("inline"):
+                options.inline = static_data_uris(
+                    static_path, config.inline_images, cache
+                )
+            suffixes = INLINE_SUFFIXES
+        static_changes = changes.under(static_path) if changes is not None else None
+        if static_changes is not None and any(
+            path.suffix.lower() in suffixes
+            for path in static_changes.changed | static_changes.deleted
+        ):
+            report.log("Images changed: full build")
+            changes = None
+
+    if config.fingerprint and static_path is not None:
+        with report.phase("fingerprint"):
+            previous_manifest = AssetManifest()
+            if output.incremental:
+                previous_manifest = AssetManifest.load(dest_path / ASSET_MANIFEST)
+            manifest, written = fingerprint_static(
+                static_path,
+                dest_path,
+                previous_manifest,
+                config.precompress,
+                cache,
+                output,
+            )
+            report.bytes_written += written
+        options = copy.copy(options)
+        options.assets = manifest.urls()
+        if changes is not None and options.assets != previous_manifest.urls():
+            report.log("Fingerprinted assets changed: full build")
+            changes = None
+
+    related_pages: dict[Path, str] | None = None
+    if config.related > 0:
+        pages = content.pages(dest_path)
+        with report.phase("related"):
+            links = related_links(content, pages, dest_path, config.related, cache)
+        previous_links = (
+            load_related(dest_path / RELATED_FILE) if output.incremental else {}
+        )
+        if changes is not None:
+            shifted = {
+                from_path
+                for from_path, dest in pages.items()
+                if links.get(output.name(dest), [])
+                != previous_links.get(output.name(dest), [])
+            }
+            if shifted:
+                report.log(f"Related pages changed for {len(shifted)} page(s)")
+            changes = ChangeSet(changes.changed | shifted, changes.deleted)
+        output.write(dest_path / RELATED_FILE, related_json(links))
+        related_pages = {
+            dest: related_html(links.get(output.name(dest), []))
+            for dest in pages.values()
+        }
+
+    if config.search:
+        with report.phase("search"):
+            index = SearchIndex()
+            if output.incremental:
+                index = SearchIndex.load(dest_path / SEARCH_DIR / SEARCH_MANIFEST)
+            changed_pages = (
+                changes.under(from_path).changed if changes is not None else None
+            )
+            report.bytes_written += index.update(
+                content, content.pages(dest_path), output, cache, changed_pages
+            )
+
+    if changes is None:
+        generate_pages_recursive(
+            config,
+            output,
+            content,
+            options=options,
+            report=report,
+            related=related_pages,
+        )
+    else:
+        generate_changed_pages(
+            config,
+            changes.under(from_path),
+            output,
+            content,
+            options=options,
+            report=report,
+            related=related_pages,
+        )
+    for name in sorted(content.unknown):
+        report.log(f"{name}: unknown type of file")
+
+    if metadata is not None:
+        with report.phase("metadata"):
+            changed_sections = update_metadata(metadata, report, output, content)
+            previous_listings = metadata.listings
+        if config.site_url is not None:
+            if metadata.site_url != config.site_url:  # every URL changed
+                metadata.site_url = config.site_url
+                changed_sections = {page.section for page in metadata.pages.values()}
+            with report.phase("feeds"):
+                report.bytes_written += write_sitemap_and_feeds(
+                    metadata, changed_sections, config.basepath, output
+                )
+        if config.listings > 0:
+            if template is None:
+                with open(template_path) as file:
+                    template = file.read()
+            listing_template = template
+
+            def render_listing(title: str, content: str) -> str:
+                return fill_template(
+                    listing_template, title, content, config.basepath, options
+                )
+
+            with report.phase("listings"):
+                report.bytes_written += write_listings(
+                    metadata, config.listings, render_listing, output
+                )
+        if changed_sections or metadata.listings != previous_listings:
+            data = metadata.to_json()
+            output.write(dest_path / METADATA_FILE, data)
+            report.bytes_written += len(data)
+
+    if versions_path is not None and versions is not None:
+        for page in report.errors:  # to be rebuilt next time
+            _ = versions["content"].pop(content.name(Path(page.source)), None)
+        atomic_write(versions_path, (json.dumps(versions, indent=2) + "\n").encode())
+
+
+def cache_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="main.py cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+    gc = commands.add_parser("gc", help="evict least recently used entries")
+    _ = gc.add_argument("--max-size", required=True, type=parse_size)
+    _ = gc.add_argument("--cache-dir", type=Path, default=os.environ.get(CACHE_DIR_ENV))
+    args = parser.parse_args(argv)
+
+    cache_dir: Path | None = args.cache_dir  # pyright: ignore[reportAny]
+    if cache_dir is None:
+        parser.error(f"--cache-dir or ${CACHE_DIR_ENV} is required")
+    entries, size = BuildCache(cache_dir).gc(args.max_size)  # pyright: ignore[reportAny]
+    print(f"Removed {entries} entries ({size} bytes) from {cache_dir}")
+    return 0
+
+
+def compare_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="main.py compare")
+    _ = parser.add_argument("old", type=Path, help="report of the reference build")
+    _ = parser.add_argument("new", type=Path, help="report of the build to check")
+    _ = parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown flagged as a regression (default: 0.1)",
+    )
+    _ = parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.01,
+        help="ignore slowdowns smaller than this (default: 0.01)",
+    )
+    args = parser.parse_args(argv)
 
+    regressions = compare_reports(
+        load_report(args.old),  # pyright: ignore[reportAny]
+        load_report(args.new),  # pyright: ignore[reportAny]
+        args.threshold,  # pyright: ignore[reportAny]
+        args.min_seconds,  # pyright: ignore[reportAny]
+    )
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
 
-def main(deploypath: str, basepath: str):
-    from_path = Path("content")
-    template_path = Path("template.html")
-    dest_path = Path(deploypath)
 
-    generate_pages_recursive(basepath, from_path, template_path, dest_path)
+def check_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="main.py check")
+    _ = parser.add_argument(
+        "--static", type=Path, help="static assets the pages can link to"
+    )
+    _ = parser.add_argument(
+        "--content",
+        default="content",
+        help="content directory, archive or database (default: content)",
+    )
+    args = parser.parse_args(argv)
+
+    source = open_source(args.content)  # pyright: ignore[reportAny]
+    pages = source.pages(Path("/"))
+    index = site_index(pages, Path("/"), args.static)  # pyright: ignore[reportAny]
+    errors: list[str] = []
+    for from_path, dest_path in sorted(pages.items()):
+        markdown = source.read(from_path)
+        errors += check_page(from_path, markdown, dest_path.as_posix(), index)
+    for error in errors:
+        print(error)
+    print(f"{len(pages)} page(s) checked, {len(errors)} error(s)")
+    return 1 if errors else 0
+
+
+def serve_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="main.py serve")
+    _ = parser.add_argument(
+        "directory",
+        nargs="?",
+        type=Path,
+        default=Path("public"),
+        help="site directory to preview (default: public)",
+    )
+    _ = parser.add_argument(
+        "--bind", default="", help="address to listen on (default: all interfaces)"
+    )
+    _ = parser.add_argument(
+        "--port", "-p", type=int, default=8888, help="port (default: 8888)"
+    )
+    args = parser.parse_args(argv)
+
+    serve(args.directory, args.bind, args.port)  # pyright: ignore[reportAny]
+    return 0
+
+
+def cli(argv: list[str]) -> int:
+    if argv and argv[0] == "cache":
+        return cache_command(argv[1:])
+    if argv and argv[0] == "compare":
+        return compare_command(argv[1:])
+    if argv and argv[0] == "check":
+        return check_command(argv[1:])
+    if argv and argv[0] == "serve":
+        return serve_command(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="main.py")
+    _ = parser.add_argument(
+        "deploypath",
+        nargs="?",
+        default="public",
+        help="directory to write the site to, or a .tar, .tar.gz, .tgz, .tar.bz2, "
+        ".tar.xz or .zip archive (default: public)",
+    )
+    _ = parser.add_argument("basepath", nargs="?", default="/")
+    _ = parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=os.environ.get(CACHE_DIR_ENV),
+        help=f"shared build cache directory (default: ${CACHE_DIR_ENV})",
+    )
+    _ = parser.add_argument("--static", type=Path, help="copy static assets from here")
+    _ = parser.add_argument(
+        "--precompress", action="store_true", help="write .gz siblings of text assets"
+    )
+    _ = parser.add_argument(
+        "--since",
+        metavar="REV",
+        help="only rebuild what changed in git since this revision",
+    )
+    _ = parser.add_argument(
+        "--changed",
+        action="store_true",
+        help="only rebuild what changed since the last --changed build, "
+        "from the versions it recorded in DEPLOYPATH.versions.json",
+    )
+    _ = parser.add_argument(
+        "--content",
+        default="content",
+        help="read the pages from this directory, .tar, .tar.gz, .tgz, .tar.bz2, "
+        ".tar.xz or .zip archive, or .sqlite, .sqlite3 or .db database with a "
+        f"{SQLITE_TABLE} (path, markdown) table (default: content)",
+    )
+    _ = parser.add_argument(
+        "--report", type=Path, help="write a JSON build report to this file"
+    )
+    _ = parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="number of worker processes rendering pages (default: 1)",
+    )
+    _ = parser.add_argument(
+        "--history",
+        type=Path,
+        help="report of a previous build, to start the slowest pages first "
+        "(default: the --report file if it exists)",
+    )
+    _ = parser.add_argument(
+        "--split-threshold",
+        type=parse_size,
+        default=SPLIT_THRESHOLD,
+        help="with --jobs, render the blocks of pages this large in parallel "
+        "(default: 1M)",
+    )
+    _ = parser.add_argument(
+        "--journal",
+        type=Path,
+        help="journal of the pages written, to resume an interrupted build "
+        "(default: DEPLOYPATH.journal)",
+    )
+    _ = parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip the pages the journal lists as complete",
+    )
+    _ = parser.add_argument(
+        "--minify", action="store_true", help="write minified HTML pages"
+    )
+    _ = parser.add_argument(
+        "--page-budget",
+        type=float,
+        metavar="SECONDS",
+        help="fail the pages taking longer than this to render, rather than "
+        "stalling the build on a pathological page",
+    )
+    _ = parser.add_argument(
+        "--inline-images",
+        type=parse_size,
+        default=0,
+        metavar="SIZE",
+        help="with --static, inline the images of at most this size (e.g. 2K) "
+        "in the pages as data URIs (default: 0, none)",
+    )
+    _ = parser.add_argument(
+        "--related",
+        type=int,
+        default=0,
+        metavar="N",
+        help="link every page to the N most related pages of its section, "
+        "in place of {{ Related }} in the template (default: 0)",
+    )
+    _ = parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="write sitemap.xml and an Atom feed.xml per section, with the "
+        "URLs of the pages under this one (e.g. https://example.com)",
+    )
+    _ = parser.add_argument(
+        "--listings",
+        type=int,
+        nargs="?",
+        const=PAGES_PER_LISTING,
+        default=0,
+        metavar="N",
+        help=f"list the pages of every section under SECTION/{LISTING_DIR}/ and "
+        f"of every year under {ARCHIVE_DIR}/YEAR/{LISTING_DIR}/, N per page "
+        f"(default: {PAGES_PER_LISTING})",
+    )
+    _ = parser.add_argument(
+        "--search",
+        action="store_true",
+        help=f"write a search index of the pages under {SEARCH_DIR}/, updated "
+        "for the pages changed only",
+    )
+    _ = parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="with --static, link content-hashed copies of the assets "
+        f"(listed in {ASSET_MANIFEST}, with the {HEADERS_FILE} to cache them)",
+    )
+    args = parser.parse_args(argv)
+
+    cache_dir: Path | None = args.cache_dir  # pyright: ignore[reportAny]
+    cache = BuildCache(Path(cache_dir)) if cache_dir else None
+    history_path: Path | None = args.history or args.report  # pyright: ignore[reportAny]
+    history: dict[str, float] | None = None
+    if history_path is not None and history_path.is_file():
+        history = load_report(history_path)["page_seconds"]  # pyright: ignore[reportAny]
+
+    output = open_output(args.deploypath)  # pyright: ignore[reportAny]
+    journal: Journal | None = None
+    if output.incremental:  # archives are written whole
+        journal_path: Path = args.journal or Path(f"{args.deploypath}.journal")  # pyright: ignore[reportAny]
+        journal = Journal(journal_path, args.resume)  # pyright: ignore[reportAny]
+    versions_path: Path | None = None
+    if args.changed:  # pyright: ignore[reportAny]
+        versions_path = Path(f"{args.deploypath}.versions.json")
+    config = BuildConfig(
+        Path(args.content),  # pyright: ignore[reportAny]
+        TEMPLATE_PATH,
+        output,
+        basepath=args.basepath,  # pyright: ignore[reportAny]
+        static=args.static,  # pyright: ignore[reportAny]
+        cache=cache,
+        jobs=args.jobs,  # pyright: ignore[reportAny]
+        minify=args.minify,  # pyright: ignore[reportAny]
+        precompress=args.precompress,  # pyright: ignore[reportAny]
+        fingerprint=args.fingerprint,  # pyright: ignore[reportAny]
+        related=args.related,  # pyright: ignore[reportAny]
+        search=args.search,  # pyright: ignore[reportAny]
+        site_url=args.site_url,  # pyright: ignore[reportAny]
+        listings=args.listings,  # pyright: ignore[reportAny]
+        page_budget=args.page_budget,  # pyright: ignore[reportAny]
+        versions=versions_path,
+        inline_images=args.inline_images,  # pyright: ignore[reportAny]
+        since=args.since,  # pyright: ignore[reportAny]
+        journal=journal,
+        history=history,
+        split_threshold=args.split_threshold,  # pyright: ignore[reportAny]
+    )
+    report = BuildReport()
+    with journal or nullcontext():
+        try:
+            main(config, output, report)
+        except BaseException:
+            output.abort()
+            raise
+        else:
+            output.close()
+    if cache is not None:
+        hits, misses = cache.hits.total(), cache.misses.total()
+        print(f"Cache: {hits} hits, {misses} misses")
+    if args.inline_images:  # pyright: ignore[reportAny]
+        inlined = [page.inlined_bytes for page in report.pages if page.inlined_bytes]
+        print(f"Inlined {sum(inlined)} bytes of images in {len(inlined)} page(s)")
+    if args.report is not None:
+        report.write(args.report, cache)  # pyright: ignore[reportAny]
+    if report.errors:
+        print(f"{len(report.errors)} page(s) failed", file=sys.stderr)
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    deploypath = sys.argv[1] if len(sys.argv) >= 2 else "public"
-    basepath = sys.argv[2] if len(sys.argv) >= 3 else "/"
-    main(deploypath, basepath)
+    sys.exit(cli(sys.argv[1:]))
@@ -1,15 +1,24 @@
 from typing import Callable
 from parentnode import ParentNode
-from textnode import TextNode, TextType
+from textnode import TextNode, TextSpan, TextType
 from leafnode import LeafNode
 from enum import Enum
 import re
 
+from highlight import highlight
+
 RE_IMAGE_PATTERN = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
 RE_LINKS_PATTERN = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
 RE_HEADING_PATTERN = r"^(#{1,6}) (.+)$"
 RE_TITLE_PATTERN = r"^# (?P<title>.+)$"
 
+RE_IMAGE = re.compile(RE_IMAGE_PATTERN)
+RE_LINKS = re.compile(RE_LINKS_PATTERN)
+
+
+class MarkdownSyntaxError(Exception):
+    """Text the inline parser cannot split, like an unmatched delimiter."""
+
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -20,7 +29,7 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered list"
 
 
-def textnode_to_htmlnode(text_node: TextNode) -> LeafNode:
+def textnode_to_htmlnode(text_node: TextNode | TextSpan) -> LeafNode:
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(tag=None, value=text_node.text)
@@ -63,7 +72,7 @@ def split_nodes_delimiter(
 
         subtexts = node.text.split(delimiter)
         if len(subtexts) % 2 == 0:
-            raise Exception(f"Invalid Markdown syntax: {node.text}")
+            raise MarkdownSyntaxError(f"Invalid Markdown syntax: {node.text}")
 
         for i, subtext in enumerate(subtexts):
             # the first subtext is either an empty string (delimiter at the start)
@@ -95,6 +104,12 @@ def extract_title(markdown: str) -> str:
     return title
 
 
+def page_title(markdown: str) -> str:
+    """The title of a page, or "" when it has none."""
+    match = re.search(RE_TITLE_PATTERN, markdown, re.MULTILINE)
+    return match.group("title") if match else ""
+
+
 def _split_nodes_func(
     old_nodes: list[TextNode],
     pattern: str,
@@ -138,24 +153,91 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     )
 
 
-def text_to_textnodes(text: str) -> list[TextNode]:
-    nodes: list[TextNode] = [TextNode(text, TextType.TEXT)]
+def split_spans_delimiter(
+    old_spans: list[TextSpan], delimiter: str, text_type: TextType
+) -> list[TextSpan]:
+    """Same as `split_nodes_delimiter`, without copying any text."""
+    new_spans: list[TextSpan] = []
+    for span in old_spans:
+        if span.text_type != TextType.TEXT:
+            new_spans.append(span)
+            continue
+
+        source, end = span.source, span.end
+        bounds = [span.start]
+        found = source.find(delimiter, span.start, end)
+        while found != -1:
+            bounds.append(found)
+            found = source.find(delimiter, found + len(delimiter), end)
+        if len(bounds) % 2 == 0:
+            raise MarkdownSyntaxError(f"Invalid Markdown syntax: {span.text}")
+
+        for i, start in enumerate(bounds):
+            if i > 0:
+                start += len(delimiter)
+            stop = bounds[i + 1] if i + 1 < len(bounds) else end
+            if start == stop:
+                continue
+            new_type = span.text_type if i % 2 == 0 else text_type
+            new_spans.append(TextSpan(source, start, stop, new_type))
+
+    return new_spans
+
+
+def _split_spans_func(
+    old_spans: list[TextSpan], regex: re.Pattern[str], text_type: TextType
+) -> list[TextSpan]:
+    """Same as `_split_nodes_func`, without copying any text."""
+    new_spans: list[TextSpan] = []
+    for span in old_spans:
+        if span.text_type != TextType.TEXT:
+            new_spans.append(span)
+            continue
+
+        # TEXT spans are never preceded by a "!" in `source` (but by a
+        # delimiter or a ")"), so the lookbehind sees the same thing as on
+        # the sliced text
+        source = span.source
+        start_string = span.start
+        for match in regex.finditer(source, span.start, span.end):
+            start_match, end_match = match.span()
+            if start_string < start_match:  # don't add empty string
+                new_spans.append(
+                    TextSpan(source, start_string, start_match, span.text_type)
+                )
+            new_spans.append(
+                TextSpan(source, *match.span(1), text_type, url_span=match.span(2))
+            )
+            start_string = end_match
+
+        if start_string < span.end:  # text remaining at the end
+            new_spans.append(TextSpan(source, start_string, span.end, span.text_type))
+
+    return new_spans
+
+
+def text_to_spans(text: str) -> list[TextSpan]:
+    spans: list[TextSpan] = [TextSpan(text, 0, len(text), TextType.TEXT)]
     # CODE
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    spans = split_spans_delimiter(spans, "`", TextType.CODE)
     # BOLD
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    spans = split_spans_delimiter(spans, "**", TextType.BOLD)
     # ITALIC
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    spans = split_spans_delimiter(spans, "_", TextType.ITALIC)
     # IMAGE
-    nodes = split_nodes_image(nodes)
+    spans = _split_spans_func(spans, RE_IMAGE, TextType.IMAGE)
     # LINK
-    nodes = split_nodes_link(nodes)
-    return nodes
+    spans = _split_spans_func(spans, RE_LINKS, TextType.LINK)
+    return spans
+
+
+def text_to_textnodes(text: str) -> list[TextNode]:
+    return [span.to_textnode() for span in text_to_spans(text)]
 
 
 def text_to_children(text: str) -> list[LeafNode]:
-    textnodes: list[TextNode] = text_to_textnodes(text)
-    children = [textnode_to_htmlnode(textnode) for textnode in textnodes]
+    spans: list[TextSpan] = text_to_spans(text)
+    children = [textnode_to_htmlnode(span) for span in spans]
     return children
 
 
@@ -163,6 +245,33 @@ def markdown_to_blocks(markdown: str) -> list[str]:
     return [line.strip() for line in markdown.split("\n\n") if line.strip()]
 
 
+def split_blocks(blocks: list[str], chunks: int) -> list[list[str]]:
+    """
+    Split consecutive blocks into about `chunks` groups of similar size, to be
+    rendered independently. A group never ends inside a ``` fence, even when
+    the fence spans several blocks.
+    """
+    target = max(1, sum(len(block) for block in blocks) // max(1, chunks))
+    groups: list[list[str]] = []
+    group: list[str] = []
+    size = 0
+    in_fence = False
+    for block in blocks:
+        group.append(block)
+        size += len(block)
+        for line in block.splitlines():
+            if line.startswith("```"):
+                in_fence = not in_fence
+        if size >= target and not in_fence:
+            groups.append(group)
+            group = []
+            size = 0
+
+    if group:
+        groups.append(group)
+    return groups
+
+
 def block_to_block_type(text: str) -> BlockType:
     if not text:  # empty line
         return BlockType.PARAGRAPH
@@ -172,7 +281,7 @@ def block_to_block_type(text: str) -> BlockType:
 
     lines = text.splitlines()
 
-    if len(lines) >= 2 and lines[0] == "```" and lines[-1] == "```":
+    if len(lines) >= 2 and lines[0].startswith("```") and lines[-1] == "```":
         return BlockType.CODE
 
     starts_with_quote = [line for line in lines if line.startswith(">")]
@@ -197,7 +306,21 @@ def block_to_block_type(text: str) -> BlockType:
 def block_to_html_code_node(block: str) -> ParentNode:
     lines = block.splitlines()
     value = "\n".join(lines[1:-1]) + "\n"
-    return ParentNode("pre", [ParentNode("code", [LeafNode(None, value)])])
+    info = lines[0][3:].split()
+    if not info:
+        return ParentNode("pre", [ParentNode("code", [LeafNode(None, value)])])
+
+    # the first word of the info string is the language
+    language = info[0]
+    children = [
+        LeafNode(None, text)
+        if token_type is None
+        else LeafNode("span", text, {"class": f"tok-{token_type}"})
+        for token_type, text in highlight(value, language)
+    ]
+    return ParentNode(
+        "pre", [ParentNode("code", children, {"class": f"language-{language}"})]
+    )
 
 
 def block_to_html_heading_node(block: str) -> ParentNode:
@@ -0,0 +1,120 @@
+import re
+from functools import lru_cache
+
+# elements whose content is rendered as is
+PRESERVE_WHITESPACE = {"pre", "code", "textarea", "script", "style"}
+
+# the parents a `<p>` must not end with for its end tag to be omitted
+P_END_REQUIRED_PARENTS = {"a", "audio", "del", "ins", "map", "noscript", "video"}
+
+# the next siblings that make a `<p>` end tag optional
+P_END_OPTIONAL_BEFORE = {
+    "address",
+    "article",
+    "aside",
+    "blockquote",
+    "details",
+    "div",
+    "dl",
+    "fieldset",
+    "figcaption",
+    "figure",
+    "footer",
+    "form",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "header",
+    "hgroup",
+    "hr",
+    "main",
+    "menu",
+    "nav",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "ul",
+}
+
+WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+UNQUOTED_VALUE = re.compile(r"[^ \t\n\r\f\"'=<>`]+")
+START_TAG = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)")
+PRESERVED_ELEMENT = re.compile(
+    r"(<(" + "|".join(PRESERVE_WHITESPACE) + r")\b.*?</\2\s*>)",
+    re.DOTALL | re.IGNORECASE,
+)
+BETWEEN_TAGS = re.compile(r">[ \t\r\f]*\n[ \t\n\r\f]*<")
+
+
+def collapse_whitespace(text: str) -> str:
+    """Collapse runs of whitespace to a single space."""
+    if "\n" not in text and "  " not in text and "\t" not in text and "\r" not in text:
+        return text
+    return WHITESPACE.sub(" ", text)
+
+
+def quote_attribute(value: str) -> str:
+    """Quote an escaped attribute value, unless it is safe unquoted."""
+    if UNQUOTED_VALUE.fullmatch(value):
+        return value
+    return f'"{value}"'
+
+
+def start_tag(html: str) -> str | None:
+    match = START_TAG.match(html)
+    return match.group(1).lower() if match else None
+
+
+def end_tag_optional(tag: str | None, next_tag: str | None, parent: str | None) -> bool:
+    """Whether the end tag of `tag` can be omitted before its `next_tag` sibling."""
+    if tag == "li":
+        return next_tag is None or next_tag == "li"
+    if tag == "p":
+        if next_tag is None:
+            return parent not in P_END_REQUIRED_PARENTS
+        return next_tag in P_END_OPTIONAL_BEFORE
+    return False
+
+
+def join_children(parent: str | None, children: list[tuple[str | None, str]]) -> str:
+    """
+    Join the `(tag, html)` of serialized children, without the end tags made
+    optional by their next sibling. A text child has no tag, and is only
+    followed by a sibling.
+    """
+    html: list[str] = []
+    for i, (tag, child_html) in enumerate(children):
+        if i + 1 < len(children):
+            next_tag = children[i + 1][0]
+            if next_tag is None:  # text, the end tag is needed
+                html.append(child_html)
+                continue
+        else:
+            next_tag = None
+        if end_tag_optional(tag, next_tag, parent):
+            child_html = child_html.removesuffix(f"</{tag}>")
+        html.append(child_html)
+    return "".join(html)
+
+
+@lru_cache(maxsize=16)
+def minify_template(template: str) -> str:
+    """
+    Strip the indentation between tags of a template, and collapse the rest
+    of its whitespace. The content of preserved elements is left untouched.
+    """
+    parts = PRESERVED_ELEMENT.split(template)
+    # split yields (text, element, tag name) triples, ended by a last text
+    for i in range(0, len(parts), 3):
+        # the text around a preserved element ends and starts with its tags
+        before = ">" if i > 0 else ""
+        after = "<" if i + 1 < len(parts) else ""
+        text = BETWEEN_TAGS.sub("><", before + parts[i] + after)
+        parts[i] = collapse_whitespace(text[len(before) : len(text) - len(after)])
+    del parts[2::3]
+    return "".join(parts).strip()
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import re
+
+# the URLs of the links and images of markdown, and of the `href` and `src`
+# attributes of a template
+RE_URL = re.compile(r'\]\(([^()]*)\)|\b(?:href|src)="([^"]*)"')
+# replaces `{{ Search }}` in the template of a site built with a search index
+SEARCH_SCRIPT = '<script src="/search.js" data-root="{{ Basepath }}" defer></script>'
+
+
+def referenced_urls(*texts: str) -> set[str]:
+    """The URLs that markdown or a template reference."""
+    return {
+        link or attribute for text in texts for link, attribute in RE_URL.findall(text)
+    }
+
+
+class RenderOptions:
+    """
+    Build options changing the HTML of the pages. Their `key()` is part of
+    the cache keys and journaled input hashes of the pages rendered with them.
+    """
+
+    minify: bool
+    # root-relative asset URLs -> fingerprinted URLs
+    assets: dict[str, str]
+    # root-relative image URLs -> (width, height)
+    images: dict[str, tuple[int, int]] | None
+    # root-relative image URLs -> data URIs inlining them
+    inline: dict[str, str]
+    # whether `{{ Search }}` loads the search script (see `SEARCH_SCRIPT`), which
+    # is part of the template and so of the keys of the pages
+    search: bool
+
+    def __init__(
+        self,
+        minify: bool = False,
+        assets: dict[str, str] | None = None,
+        images: dict[str, tuple[int, int]] | None = None,
+        inline: dict[str, str] | None = None,
+        search: bool = False,
+    ):
+        self.minify = minify
+        self.assets = assets or {}
+        self.images = images
+        self.inline = inline or {}
+        self.search = search
+
+    def referencing(self, *texts: str) -> "RenderOptions":
+        """
+        The options for rendering `texts` (a block, or a page and its
+        template), with only the assets, images and data URIs they reference:
+        their `key()` does not change with the others.
+        """
+        if not self.assets and not self.images and not self.inline:
+            return self
+        urls = referenced_urls(*texts)
+        images = self.images
+        if images is not None:
+            images = {url: images[url] for url in urls if url in images}
+        return RenderOptions(
+            self.minify,
+            {url: self.assets[url] for url in urls if url in self.assets},
+            images,
+            {url: self.inline[url] for url in urls if url in self.inline},
+            self.search,
+        )
+
+    def key(self) -> str:
+        key = f"minify={self.minify:d}"
+        if self.assets:
+            assets = json.dumps(self.assets, sort_keys=True).encode()
+            key += f";assets={hashlib.sha256(assets).hexdigest()}"
+        if self.images is not None:
+            images = json.dumps(self.images, sort_keys=True).encode()
+            key += f";images={hashlib.sha256(images).hexdigest()}"
+        if self.inline:
+            inline = json.dumps(self.inline, sort_keys=True).encode()
+            key += f";inline={hashlib.sha256(inline).hexdigest()}"
+        return key
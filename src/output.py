@@ -0,0 +1,318 @@
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Literal, override
+
+from cache import atomic_write
+
+TAR_COMPRESSIONS = {
+    ".tar": "",
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.bz2": "bz2",
+    ".tar.xz": "xz",
+}
+# archived files all get this date, for builds to be reproducible
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+FILE_MODE = 0o644
+
+
+def remove_empty_parents(path: Path, root: Path):
+    parent = path.parent
+    while parent != root and parent.is_relative_to(root):
+        try:
+            parent.rmdir()
+        except OSError:  # not empty
+            return
+        parent = parent.parent
+
+
+def page_url(name: str) -> str:
+    """The root-relative URL of an output file: `blog/tom/index.html` -> `/blog/tom/`"""
+    if name == "index.html" or name.endswith("/index.html"):
+        return "/" + name.removesuffix("index.html")
+    return "/" + name
+
+
+class Output:
+    """
+    Where the files of the site are written, by their path under `root` (the
+    deploy path). The default backend writes them to the filesystem.
+    """
+
+    root: Path
+    # whether the files of the previous build are there to be updated, rather
+    # than the site being written from scratch
+    incremental: bool = False
+    # whether worker processes can write files themselves
+    shared: bool = False
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def name(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def path(self, name: str) -> Path:
+        return self.root / name
+
+    def write(self, path: Path, data: bytes):
+        raise NotImplementedError
+
+    def copy(self, src: Path, path: Path):
+        with open(src, "rb") as file:
+            self.write(path, file.read())
+
+    def remove(self, path: Path):
+        """Remove a file of the previous build, if there is one."""
+
+    def close(self):
+        pass
+
+    def abort(self):
+        """Give up on a failed build."""
+        self.close()
+
+
+class DirectoryOutput(Output):
+    """Write every file to the deploy directory, replacing them atomically."""
+
+    incremental: bool = True
+    shared: bool = True
+
+    @override
+    def write(self, path: Path, data: bytes):
+        path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        atomic_write(path, data)
+
+    @override
+    def copy(self, src: Path, path: Path):
+        path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        _ = shutil.copy2(src, path)
+
+    @override
+    def remove(self, path: Path):
+        path.unlink(missing_ok=True)
+        remove_empty_parents(path, self.root)
+
+
+class MemoryOutput(Output):
+    """Keep the files in memory, by their name (e.g. to be served)."""
+
+    files: dict[str, bytes]
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.files = {}
+
+    @override
+    def write(self, path: Path, data: bytes):
+        self.files[self.name(path)] = data
+
+    @override
+    def remove(self, path: Path):
+        _ = self.files.pop(self.name(path), None)
+
+
+class ArchiveOutput(Output):
+    """
+    Stream the files into an archive at `root`, in the order they are
+    written. The archive is written next to it and only moved in place once
+    complete.
+    """
+
+    file: BinaryIO
+    temp_path: str
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        fd, self.temp_path = tempfile.mkstemp(
+            dir=root.parent, prefix=f".tmp-{root.name}."
+        )
+        os.fchmod(fd, FILE_MODE)
+        self.file = os.fdopen(fd, "wb")
+
+    def finish(self):
+        """Write the end of the archive."""
+
+    @override
+    def close(self):
+        self.finish()
+        self.file.close()
+        os.replace(self.temp_path, self.root)
+
+    @override
+    def abort(self):
+        try:  # rather than when the archive is collected, after the file
+            self.finish()
+        except (OSError, ValueError, tarfile.TarError, zipfile.BadZipFile):
+            pass
+        self.file.close()
+        os.unlink(self.temp_path)
+
+
+class TarOutput(ArchiveOutput):
+    compressed: gzip.GzipFile | None
+    tar: tarfile.TarFile
+
+    def __init__(self, root: Path, compression: str = ""):
+        super().__init__(root)
+        self.compressed = None
+        fileobj: BinaryIO | gzip.GzipFile = self.file
+        mode: Literal["w|", "w|bz2", "w|xz"]
+        if compression == "gz":  # tarfile would store the current time
+            self.compressed = gzip.GzipFile(fileobj=self.file, mode="wb", mtime=0)
+            fileobj = self.compressed
+            mode = "w|"
+        elif compression == "bz2":
+            mode = "w|bz2"
+        elif compression == "xz":
+            mode = "w|xz"
+        else:
+            mode = "w|"
+        # closed by `finish`, when the output is closed or aborted
+        self.tar = tarfile.open(  # noqa: SIM115
+            fileobj=fileobj, mode=mode, format=tarfile.PAX_FORMAT
+        )
+
+    def info(self, path: Path, size: int) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(self.name(path))
+        info.size = size
+        info.mode = FILE_MODE
+        return info  # owned by 0:0 at time 0
+
+    @override
+    def write(self, path: Path, data: bytes):
+        self.tar.addfile(self.info(path, len(data)), io.BytesIO(data))
+
+    @override
+    def copy(self, src: Path, path: Path):
+        with open(src, "rb") as file:
+            self.tar.addfile(self.info(path, os.fstat(file.fileno()).st_size), file)
+
+    @override
+    def finish(self):
+        self.tar.close()
+        if self.compressed is not None:
+            self.compressed.close()
+
+
+class ZipOutput(ArchiveOutput):
+    zip: zipfile.ZipFile
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.zip = zipfile.ZipFile(self.file, "w", zipfile.ZIP_DEFLATED)
+
+    def info(self, path: Path) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(self.name(path), ZIP_DATE_TIME)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = FILE_MODE << 16
+        return info
+
+    @override
+    def write(self, path: Path, data: bytes):
+        self.zip.writestr(self.info(path), data)
+
+    @override
+    def copy(self, src: Path, path: Path):
+        with open(src, "rb") as file, self.zip.open(self.info(path), "w") as dest:
+            shutil.copyfileobj(file, dest)
+
+    @override
+    def finish(self):
+        self.zip.close()
+
+
+class RecordingOutput(Output):
+    """
+    Write to another output, recording the names of the files written and
+    removed by this process (workers writing to a shared output record theirs
+    on their own copy).
+    """
+
+    output: Output
+    written: set[str]
+    removed: set[str]
+
+    def __init__(self, output: Output):
+        super().__init__(output.root)
+        self.output = output
+        self.incremental = output.incremental
+        self.shared = output.shared
+        self.written = set()
+        self.removed = set()
+
+    @override
+    def write(self, path: Path, data: bytes):
+        self.output.write(path, data)
+        self.written.add(self.name(path))
+        self.removed.discard(self.name(path))
+
+    @override
+    def copy(self, src: Path, path: Path):
+        self.output.copy(src, path)
+        self.written.add(self.name(path))
+        self.removed.discard(self.name(path))
+
+    @override
+    def remove(self, path: Path):
+        self.output.remove(path)
+        self.removed.add(self.name(path))
+        self.written.discard(self.name(path))
+
+    @override
+    def close(self):
+        self.output.close()
+
+    @override
+    def abort(self):
+        self.output.abort()
+
+
+def open_output(deploypath: str) -> Output:
+    """
+    The backend for a deploy path: a tar archive (optionally compressed) or a
+    zip archive for the matching extensions, a directory otherwise.
+    """
+    path = Path(deploypath)
+    if deploypath.endswith(".zip"):
+        return ZipOutput(path)
+    for suffix, compression in TAR_COMPRESSIONS.items():
+        if deploypath.endswith(suffix):
+            return TarOutput(path, compression)
+    return DirectoryOutput(path)
+
+
+class OrderedWriter:
+    """
+    Write the files of pages generated in any order to an output, in the
+    order of their paths: a page is held in memory until all the pages before
+    it are written.
+    """
+
+    output: Output
+    order: list[Path]
+    position: int
+    pending: dict[Path, dict[str, bytes]]
+
+    def __init__(self, output: Output, paths: list[Path]):
+        self.output = output
+        self.order = sorted(paths)
+        self.position = 0
+        self.pending = {}
+
+    def add(self, path: Path, files: dict[str, bytes]):
+        self.pending[path] = files
+        while self.position < len(self.order):
+            ready = self.pending.pop(self.order[self.position], None)
+            if ready is None:
+                return
+            for name, data in ready.items():
+                self.output.write(self.output.path(name), data)
+            self.position += 1
@@ -1,8 +1,8 @@
 from collections.abc import Sequence
-from functools import reduce
 from typing import override
 
 from htmlnode import HTMLNode
+from minify import PRESERVE_WHITESPACE, join_children
 
 
 class ParentNode(HTMLNode):
@@ -20,15 +20,20 @@ class ParentNode(HTMLNode):
         super().__init__(tag=tag, value=None, children=children, props=props)
 
     @override
-    def to_html(self):
+    def to_html(self, minify: bool = False):
         if not self.tag:
             raise ValueError("tag is required!")
         if not self.children:
             raise ValueError("children is required!")
-        #
-        # children_to_html = "".join([child.to_html() for child in self.children])
-        children_to_html = reduce(lambda acc, c: acc + c.to_html(), self.children, "")
+
+        if minify and self.tag not in PRESERVE_WHITESPACE:
+            children_to_html = join_children(
+                self.tag,
+                [(child.tag, child.to_html(True)) for child in self.children],
+            )
+        else:
+            children_to_html = "".join(child.to_html() for child in self.children)
         if self.props:
-            props = super().props_to_html()
+            props = super().props_to_html(minify)
             return f"<{self.tag} {props}>{children_to_html}</{self.tag}>"
         return f"<{self.tag}>{children_to_html}</{self.tag}>"
@@ -0,0 +1,273 @@
+import heapq
+import json
+import math
+from collections import Counter
+from operator import itemgetter
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from cache import BuildCache
+from htmlnode import escape_attribute, escape_text
+from output import page_url
+from sources import ContentSource, page_section
+from terms import page_terms
+
+if TYPE_CHECKING:
+    from numpy import ndarray  # pyright: ignore[reportMissingImports]
+
+try:
+    import numpy as np  # pyright: ignore[reportMissingImports]
+except ImportError:  # the pure-Python fallback is used
+    np = None
+
+# the related pages of every page, by output name, persisted with the site
+RELATED_FILE = "related.json"
+# a page is compared on its terms of highest TF-IDF weight only
+TERMS_PER_PAGE = 32
+# the similarity scores (or their products) computed at once by NumPy
+BATCH_CELLS = 1 << 22
+# the size up to which the TF-IDF matrix is multiplied as a dense one
+DENSE_CELLS = 1 << 22
+# the scores are ranked rounded to this many digits: the paths add up the
+# same products in different orders, which differ in the last bits
+SCORE_DIGITS = 12
+
+# (url, title)
+type Link = tuple[str, str]
+
+
+def tfidf_rows(terms: list[Counter[str]]) -> list[dict[int, float]]:
+    """
+    The normalized TF-IDF vectors of pages, by term id, keeping the
+    `TERMS_PER_PAGE` terms of highest weight. Terms of a single page, or of
+    every page, cannot tell pages apart and are left out.
+    """
+    frequencies = Counter(term for counts in terms for term in counts)
+    idf = {
+        term: math.log(len(terms) / frequency)
+        for term, frequency in frequencies.items()
+        if 1 < frequency < len(terms)
+    }
+    ids: dict[str, int] = {}
+    rows: list[dict[int, float]] = []
+    for counts in terms:
+        weights = [
+            (term, (1 + math.log(count)) * idf[term])
+            for term, count in counts.items()
+            if term in idf
+        ]
+        weights.sort(key=itemgetter(1), reverse=True)
+        top = weights[:TERMS_PER_PAGE]
+        norm = math.sqrt(sum(weight * weight for _, weight in top))
+        rows.append(
+            {ids.setdefault(term, len(ids)): weight / norm for term, weight in top}
+        )
+    return rows
+
+
+def most_similar(scores: dict[int, float], count: int) -> list[int]:
+    """
+    The `count` pages of highest positive score, rounded to `SCORE_DIGITS`,
+    ties broken by lowest page.
+    """
+    rounded = ((page, round(score, SCORE_DIGITS)) for page, score in scores.items())
+    best = heapq.nsmallest(count, rounded, key=lambda item: (-item[1], item[0]))
+    return [page for page, score in best if score > 0]
+
+
+def candidates(
+    rows: "ndarray", columns: "ndarray", scores: "ndarray", pages: int
+) -> list[dict[int, float]]:
+    """The scores of the (row, column) pairs, by row, for `most_similar`."""
+    found: list[dict[int, float]] = [{} for _ in range(pages)]
+    for row, column, score in zip(rows.tolist(), columns.tolist(), scores.tolist()):
+        found[row][column] = score
+    return found
+
+
+def similar_python(rows: list[dict[int, float]], count: int) -> list[list[int]]:
+    """`similar_pages` through an inverted index of the rows."""
+    postings: dict[int, list[tuple[int, float]]] = {}
+    for page, row in enumerate(rows):
+        for term, weight in row.items():
+            postings.setdefault(term, []).append((page, weight))
+    similar: list[list[int]] = []
+    for page, row in enumerate(rows):
+        scores: dict[int, float] = {}
+        for term, weight in row.items():
+            for other, other_weight in postings[term]:
+                if other != page:
+                    scores[other] = scores.get(other, 0.0) + weight * other_weight
+        similar.append(most_similar(scores, count))
+    return similar
+
+
+def top_columns(scores: "ndarray", count: int) -> list[list[int]]:
+    """
+    The columns of the `count` highest positive scores of every row, ranked
+    by `most_similar`: every column scoring at least about the `count`-th
+    highest score is a candidate, as it may round to the same.
+    """
+    assert np is not None
+    count = min(count, scores.shape[1])
+    lowest = np.partition(scores, -count, axis=1)[:, -count] - 10.0**-SCORE_DIGITS
+    rows, columns = np.nonzero((scores >= lowest[:, None]) & (scores > 0))
+    found = candidates(rows, columns, scores[rows, columns], scores.shape[0])
+    return [most_similar(row, count) for row in found]
+
+
+def similar_numpy(rows: list[dict[int, float]], count: int) -> list[list[int]]:
+    """
+    `similar_pages` as matrix products, a batch of rows at a time. A matrix of
+    few terms is multiplied as a dense one; otherwise every term of a row is
+    multiplied with the column of that term.
+    """
+    assert np is not None
+    pages = len(rows)
+    lengths = np.array([len(row) for row in rows], dtype=np.int64)
+    row_ids = np.repeat(np.arange(pages), lengths)
+    columns = np.fromiter(
+        (term for row in rows for term in row), dtype=np.int64, count=len(row_ids)
+    )
+    values = np.fromiter(
+        (weight for row in rows for weight in row.values()),
+        dtype=np.float64,
+        count=len(row_ids),
+    )
+    vocabulary = int(columns.max()) + 1 if len(columns) else 0
+    similar: list[list[int]] = []
+
+    if pages * vocabulary <= DENSE_CELLS:
+        batch = max(1, BATCH_CELLS // pages)
+        matrix = np.zeros((pages, vocabulary))
+        matrix[row_ids, columns] = values
+        for start in range(0, pages, batch):
+            stop = min(pages, start + batch)
+            scores = matrix[start:stop] @ matrix.T
+            scores[np.arange(stop - start), np.arange(start, stop)] = 0.0
+            similar += top_columns(scores, count)
+        return similar
+
+    # the same matrix by column
+    order = np.argsort(columns, kind="stable")
+    column_rows, column_values = row_ids[order], values[order]
+    column_lengths = np.bincount(columns, minlength=1)
+    column_starts = np.concatenate(([0], np.cumsum(column_lengths)))
+    # batches of rows of about `BATCH_CELLS` products
+    row_starts = np.concatenate(([0], np.cumsum(lengths)))
+    products_before = np.concatenate(([0], np.cumsum(column_lengths[columns])))
+    row_products = products_before[row_starts]
+    start = 0
+    while start < pages:
+        end = np.searchsorted(row_products, row_products[start] + BATCH_CELLS, "right")
+        stop = min(pages, max(start + 1, int(end) - 1))
+        low, high = row_starts[start], row_starts[stop]
+        terms = columns[low:high]
+        repeats = column_lengths[terms]
+        # the index in the columns of every product of the batch
+        offsets = np.repeat(
+            column_starts[terms] - np.cumsum(repeats) + repeats, repeats
+        ) + np.arange(repeats.sum())
+        others = column_rows[offsets]
+        cells = np.repeat(row_ids[low:high], repeats) * pages + others
+        products = np.repeat(values[low:high], repeats) * column_values[offsets]
+        # sum the products of every (row, other) pair, in the order of the
+        # terms of the row like `similar_python`: equal pages score the same
+        order = np.argsort(cells, kind="stable")
+        cells, products = cells[order], products[order]
+        firsts = np.flatnonzero(np.diff(cells, prepend=-1))
+        scores = np.add.reduceat(products, firsts) if len(firsts) else products
+        rows_of, others = np.divmod(cells[firsts], pages)
+        keep = (others != rows_of) & (scores > 0)
+        rows_of, others, scores = rows_of[keep], others[keep], scores[keep]
+        # the `count`-th best score of every row (0 for the rows with fewer
+        # others), from a quick sort by row then score (at most 1), off by
+        # the rounding of the sort keys at most
+        rows_of -= start
+        row_firsts = np.searchsorted(rows_of, np.arange(stop - start))
+        ranked = scores[np.argsort(rows_of * 4.0 - scores)]
+        at_count = np.arange(len(ranked)) - row_firsts[rows_of] == count - 1
+        lowest = np.zeros(stop - start)
+        lowest[rows_of[at_count]] = ranked[at_count]
+        margin = 10.0**-SCORE_DIGITS + 8.0 * (stop - start) * np.finfo(float).eps
+        # the others scoring about as much or more, ranked by `most_similar`
+        keep = scores >= lowest[rows_of] - margin
+        found = candidates(rows_of[keep], others[keep], scores[keep], stop - start)
+        similar += [most_similar(row, count) for row in found]
+        start = stop
+    return similar
+
+
+def similar_pages(terms: list[Counter[str]], count: int) -> list[list[int]]:
+    """
+    The indexes of the (up to) `count` pages most similar to every page, by
+    the cosine similarity of their TF-IDF vectors, most similar first.
+    """
+    if count <= 0 or len(terms) < 2:
+        return [[] for _ in terms]
+    rows = tfidf_rows(terms)
+    if np is None:
+        return similar_python(rows, count)
+    return similar_numpy(rows, count)
+
+
+def related_links(
+    source: ContentSource,
+    pages: dict[Path, Path],
+    dest_dir: Path,
+    count: int,
+    cache: BuildCache | None = None,
+) -> dict[str, list[Link]]:
+    """
+    The links to the `count` pages most related to every page of the same
+    section, by the output name of the page.
+    """
+    sections: dict[str, list[Path]] = {}
+    titles: dict[Path, str] = {}
+    terms: dict[Path, Counter[str]] = {}
+    for from_path in sorted(pages):
+        try:
+            markdown = source.read(from_path)
+        except (OSError, UnicodeError):  # reported when the page is generated
+            continue
+        titles[from_path], terms[from_path] = page_terms(markdown, cache)
+        section = page_section(source.name(from_path))
+        sections.setdefault(section, []).append(from_path)
+
+    def name(from_path: Path) -> str:
+        return pages[from_path].relative_to(dest_dir).as_posix()
+
+    links: dict[str, list[Link]] = {}
+    for paths in sections.values():
+        similar = similar_pages([terms[path] for path in paths], count)
+        for from_path, indexes in zip(paths, similar):
+            links[name(from_path)] = [
+                (page_url(name(paths[i])), titles[paths[i]]) for i in indexes
+            ]
+    return links
+
+
+def related_html(links: list[Link]) -> str:
+    """The list of related pages replacing `{{ Related }}` in the template."""
+    if not links:
+        return ""
+    items = "".join(
+        f'<li><a href="{escape_attribute(url)}">{escape_text(title)}</a></li>'
+        for url, title in links
+    )
+    return f'<nav class="related"><h2>Related</h2><ul>{items}</ul></nav>'
+
+
+def load_related(path: Path) -> dict[str, list[Link]]:
+    try:
+        with open(path) as file:
+            data: dict[str, list[list[str]]] = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return {
+        name: [(url, title) for url, title in links] for name, links in data.items()
+    }
+
+
+def related_json(links: dict[str, list[Link]]) -> bytes:
+    return (json.dumps(dict(sorted(links.items())), indent=2) + "\n").encode()
@@ -0,0 +1,200 @@
+import json
+import resource
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from cache import GENERATOR_VERSION, BuildCache
+
+SLOWEST_PAGES = 10
+
+
+class PageReport:
+    source: str
+    dest: str
+    seconds: float
+    bytes_read: int
+    bytes_written: int
+    phases: dict[str, float]
+    cache_hits: Counter[str]
+    cache_misses: Counter[str]
+    input_hash: str
+    output_hash: str
+    # the metadata of the page, for the sitemap and the feeds
+    title: str
+    content_hash: str
+    # the size of the data URIs of the images inlined in the page
+    inlined_bytes: int
+    resumed: bool
+    error: str | None
+
+    def __init__(
+        self,
+        source: str,
+        dest: str,
+        seconds: float = 0.0,
+        bytes_read: int = 0,
+        bytes_written: int = 0,
+        error: str | None = None,
+    ):
+        self.source = source
+        self.dest = dest
+        self.seconds = seconds
+        self.bytes_read = bytes_read
+        self.bytes_written = bytes_written
+        self.phases = {}
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()
+        self.input_hash = ""
+        self.output_hash = ""
+        self.title = ""
+        self.content_hash = ""
+        self.inlined_bytes = 0
+        self.resumed = False
+        self.error = error
+
+    def add_time(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+class BuildReport:
+    """Summary of a build: phase timings, per-page timings, I/O and cache use."""
+
+    phases: dict[str, float]
+    pages: list[PageReport]
+    bytes_read: int
+    bytes_written: int
+    started: float
+    # what the build decided along the way (e.g. why it is a full build)
+    messages: list[str]
+    # whether messages are only kept, rather than printed as well
+    quiet: bool
+
+    def __init__(self, quiet: bool = False):
+        self.phases = {}
+        self.pages = []
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.started = time.perf_counter()
+        self.messages = []
+        self.quiet = quiet
+
+    def log(self, message: str):
+        self.messages.append(message)
+        if not self.quiet:
+            print(message)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_page(self, page: PageReport):
+        self.pages.append(page)
+        self.bytes_read += page.bytes_read
+        self.bytes_written += page.bytes_written
+        for phase, seconds in page.phases.items():
+            self.add_time(phase, seconds)
+
+    @property
+    def errors(self) -> list[PageReport]:
+        return [page for page in self.pages if page.error is not None]
+
+    def to_json(
+        self, cache: BuildCache | None = None, slowest: int = SLOWEST_PAGES
+    ) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+        pages = sorted(self.pages, key=lambda page: page.seconds, reverse=True)
+        return {
+            "version": GENERATOR_VERSION,
+            "total_seconds": time.perf_counter() - self.started,
+            "phases": self.phases,
+            "pages": {
+                "total": len(self.pages),
+                "failed": len(self.errors),
+                "resumed": sum(page.resumed for page in self.pages),
+            },
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "cache": cache_stats(cache) if cache is not None else {},
+            "peak_memory_bytes": peak_memory(),
+            "slowest_pages": [
+                {"source": page.source, "seconds": page.seconds}
+                for page in pages[:slowest]
+            ],
+            "page_seconds": {page.source: page.seconds for page in pages},
+            "inlined_bytes": {
+                page.source: page.inlined_bytes
+                for page in sorted(self.pages, key=lambda page: page.source)
+                if page.inlined_bytes
+            },
+            "errors": [
+                {"source": page.source, "error": page.error} for page in self.errors
+            ],
+        }
+
+    def write(self, path: Path, cache: BuildCache | None = None):
+        with open(path, "w") as file:
+            json.dump(self.to_json(cache), file, indent=2)
+            _ = file.write("\n")
+
+
+def cache_stats(cache: BuildCache) -> dict[str, dict[str, float]]:
+    stats: dict[str, dict[str, float]] = {}
+    for kind in sorted(cache.hits.keys() | cache.misses.keys()):
+        hits, misses = cache.hits[kind], cache.misses[kind]
+        stats[kind] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses),
+        }
+    return stats
+
+
+def peak_memory() -> int:
+    """Peak resident set size of this process and its children, in bytes."""
+    unit = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * unit
+
+
+def load_report(path: Path) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+    with open(path, "r") as file:
+        return json.load(file)  # pyright: ignore[reportAny]
+
+
+def compare_reports(
+    old: dict[str, Any],  # pyright: ignore[reportExplicitAny]
+    new: dict[str, Any],  # pyright: ignore[reportExplicitAny]
+    threshold: float = 0.1,
+    min_seconds: float = 0.01,
+) -> list[str]:
+    """
+    Return a line for each phase (and for the total) that got slower by more
+    than `threshold` (relative) and `min_seconds` (absolute) between two reports.
+    """
+    timings: list[tuple[str, float, float]] = [
+        ("total", old["total_seconds"], new["total_seconds"])
+    ]
+    old_phases: dict[str, float] = old["phases"]
+    new_phases: dict[str, float] = new["phases"]
+    for phase in sorted(old_phases.keys() & new_phases.keys()):
+        timings.append((phase, old_phases[phase], new_phases[phase]))
+
+    regressions: list[str] = []
+    for name, before, after in timings:
+        delta = after - before
+        if delta > min_seconds and delta > before * threshold:
+            ratio = f"+{delta / before:.0%}" if before else "new"
+            regressions.append(f"{name}: {before:.3f}s -> {after:.3f}s ({ratio})")
+    return regressions
@@ -0,0 +1,53 @@
+import os
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+
+def file_size(path: Path) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def bytes_to_seconds(history: dict[str, float], sizes: dict[Path, int]) -> float:
+    """Average render time per source byte of the pages found in the history."""
+    seconds = 0.0
+    size = 0
+    for path, path_size in sizes.items():
+        if str(path) in history:
+            seconds += history[str(path)]
+            size += path_size
+    return seconds / size if size else 1.0
+
+
+def expected_costs(
+    paths: Iterable[Path],
+    history: dict[str, float] | None = None,
+    size: Callable[[Path], int] = file_size,
+) -> dict[Path, float]:
+    """
+    Expected render time of each page: its time in the previous build when
+    known, else its source `size` scaled to the time per byte of known pages.
+    """
+    history = history or {}
+    sizes = {path: size(path) for path in paths}
+
+    rate = bytes_to_seconds(history, sizes)
+    return {
+        path: history[str(path)] if str(path) in history else size * rate
+        for path, size in sizes.items()
+    }
+
+
+def longest_first(
+    paths: Iterable[Path],
+    history: dict[str, float] | None = None,
+    size: Callable[[Path], int] = file_size,
+) -> list[Path]:
+    """
+    Order pages by decreasing expected cost (longest processing time first),
+    so that a huge page doesn't start last and dominate a parallel build.
+    """
+    costs = expected_costs(paths, history, size)
+    return sorted(costs, key=lambda path: (-costs[path], str(path)))
@@ -0,0 +1,195 @@
+import hashlib
+import heapq
+import json
+from collections import Counter
+from pathlib import Path
+
+from cache import BuildCache
+from output import Output, page_url
+from sources import ContentSource
+from terms import TERMS_VERSION, page_terms
+
+SEARCH_DIR = "search"
+# the state of the index, to update it for the pages changed since
+SEARCH_MANIFEST = "manifest.json"
+# terms are sharded by their first characters
+SHARD_PREFIX_LENGTH = 2
+# pages are listed by shards of this many ids
+PAGES_PER_SHARD = 1000
+
+
+def shard_name(term: str) -> str:
+    return term[:SHARD_PREFIX_LENGTH]
+
+
+def to_json(data: object) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class SearchEntry:
+    """What the index has of a page: its id, content hash, link and term shards."""
+
+    id: int
+    hash: str
+    url: str
+    title: str
+    shards: list[str]
+
+    def __init__(self, id: int, hash: str, url: str, title: str, shards: list[str]):
+        self.id = id
+        self.hash = hash
+        self.url = url
+        self.title = title
+        self.shards = shards
+
+
+class SearchIndex:
+    """
+    An inverted index of the pages, written under `search/` for the browser:
+    `terms/<prefix>.json` maps the terms starting with `prefix` to the ids of
+    the pages they are in, with their count, and `pages/<n>.json` lists the
+    URL and title of the pages of ids `n * PAGES_PER_SHARD` onward. A query
+    only downloads the shards of its terms, and of the pages found.
+
+    The manifest records the pages indexed, so that only the shards of the
+    pages changed since are written again.
+    """
+
+    entries: dict[str, SearchEntry]
+
+    def __init__(self, entries: dict[str, SearchEntry] | None = None):
+        self.entries = entries or {}
+
+    @staticmethod
+    def load(path: Path) -> "SearchIndex":
+        try:
+            with open(path) as file:
+                data: dict[str, object] = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return SearchIndex()
+        if data.get("version") != TERMS_VERSION:  # terms of other versions
+            return SearchIndex()
+        pages: dict[str, list[object]] = data["pages"]  # pyright: ignore[reportAssignmentType]
+        return SearchIndex(
+            {
+                name: SearchEntry(*entry)  # pyright: ignore[reportArgumentType]
+                for name, entry in pages.items()
+            }
+        )
+
+    def to_json(self) -> bytes:
+        pages = {
+            name: [entry.id, entry.hash, entry.url, entry.title, entry.shards]
+            for name, entry in sorted(self.entries.items())
+        }
+        return (json.dumps({"version": TERMS_VERSION, "pages": pages}) + "\n").encode()
+
+    def update(
+        self,
+        source: ContentSource,
+        pages: dict[Path, Path],
+        output: Output,
+        cache: BuildCache | None = None,
+        changed: set[Path] | None = None,
+    ) -> int:
+        """
+        Index the `pages` and write the shards they changed to `output`, which
+        has the shards of the previous build if it is incremental. Only the
+        `changed` pages are read, if known, and the pages not indexed yet.
+        Return the number of bytes written.
+        """
+        directory = output.root / SEARCH_DIR
+        names = {source.name(from_path): from_path for from_path in pages}
+        removed = [name for name in self.entries if name not in names]
+        postings: dict[int, Counter[str]] = {}
+        shards: set[str] = set()
+        page_shards: set[int] = set()
+        for name in removed:
+            entry = self.entries.pop(name)
+            postings[entry.id] = Counter()
+            shards.update(entry.shards)
+            page_shards.add(entry.id // PAGES_PER_SHARD)
+
+        # the ids of removed pages are reused, lowest first
+        used = {entry.id for entry in self.entries.values()}
+        next_id = max(used, default=-1) + 1
+        free = [id for id in range(next_id) if id not in used]  # sorted: a heap
+        for name, from_path in sorted(names.items()):
+            previous = self.entries.get(name)
+            if (
+                previous is not None
+                and changed is not None
+                and from_path not in changed
+            ):
+                continue
+            try:
+                markdown = source.read(from_path)
+            except (OSError, UnicodeError):  # reported when the page is generated
+                continue
+            digest = hashlib.sha256(markdown.encode()).hexdigest()
+            if previous is not None and previous.hash == digest:
+                continue
+            title, counts = page_terms(markdown, cache)
+            if previous is not None:
+                id = previous.id
+                shards.update(previous.shards)
+            elif free:
+                id = heapq.heappop(free)
+            else:
+                id = next_id
+                next_id += 1
+            url = page_url(output.name(pages[from_path]))
+            entry = SearchEntry(
+                id, digest, url, title, sorted(set(map(shard_name, counts)))
+            )
+            self.entries[name] = entry
+            postings[id] = counts
+            shards.update(entry.shards)
+            page_shards.add(id // PAGES_PER_SHARD)
+
+        written = 0
+        for shard in sorted(shards):
+            path = directory / "terms" / f"{shard}.json"
+            index = load_shard(path) if output.incremental else {}
+            for term, ids in list(index.items()):
+                index[term] = [posting for posting in ids if posting[0] not in postings]
+            for id, counts in postings.items():
+                for term, count in counts.items():
+                    if shard_name(term) == shard:
+                        index.setdefault(term, []).append([id, count])
+            index = {term: sorted(ids) for term, ids in sorted(index.items()) if ids}
+            if index:
+                data = to_json(index)
+                output.write(path, data)
+                written += len(data)
+            else:
+                output.remove(path)
+
+        by_shard: dict[int, list[SearchEntry]] = {}
+        for entry in self.entries.values():
+            by_shard.setdefault(entry.id // PAGES_PER_SHARD, []).append(entry)
+        for number in sorted(page_shards):
+            path = directory / "pages" / f"{number}.json"
+            entries = by_shard.get(number)
+            if not entries:
+                output.remove(path)
+                continue
+            rows: dict[str, list[str]] = {
+                str(entry.id): [entry.url, entry.title]
+                for entry in sorted(entries, key=lambda entry: entry.id)
+            }
+            data = to_json(rows)
+            output.write(path, data)
+            written += len(data)
+
+        data = self.to_json()
+        output.write(directory / SEARCH_MANIFEST, data)
+        return written + len(data)
+
+
+def load_shard(path: Path) -> dict[str, list[list[int]]]:
+    try:
+        with open(path) as file:
+            return json.load(file)  # pyright: ignore[reportAny]
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
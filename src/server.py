@@ -0,0 +1,292 @@
+import hashlib
+import io
+import mimetypes
+import os
+import sys
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import BinaryIO, ClassVar, override
+from urllib.parse import unquote, urlsplit
+
+from journal import hash_file
+
+# precompressed siblings, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# seconds an idle keep-alive connection is kept open
+KEEP_ALIVE_TIMEOUT = 30
+# bytes read from a file at a time when sending it
+COPY_CHUNK = 64 * 1024
+
+
+def accepted_encodings(header: str | None) -> set[str]:
+    """The content codings of an `Accept-Encoding` header, but for `q=0` ones."""
+    encodings: set[str] = set()
+    for item in (header or "").split(","):
+        name, _, params = item.partition(";")
+        if params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00"):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class FileTable:
+    """
+    The ETags of the files served, by path. An ETag is the hash of the file,
+    recorded with its size and mtime so that it is only computed again once
+    the file changes (e.g. when the site is rebuilt).
+    """
+
+    entries: dict[Path, tuple[int, int, str]]
+    lock: threading.Lock
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def etag(self, path: Path, stat: os.stat_result) -> str | None:
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+            return entry[2]
+        digest = hash_file(path)
+        if digest is None:  # removed since
+            return None
+        etag = f'"{digest[:32]}"'
+        with self.lock:
+            self.entries[path] = (stat.st_size, stat.st_mtime_ns, etag)
+        return etag
+
+
+class MemoryTable:
+    """
+    The files of a site kept in memory by name (`blog/tom.html`), as written
+    by a `MemoryOutput`, and their ETags, computed once per version of a file.
+    """
+
+    files: dict[str, bytes]
+    entries: dict[str, tuple[bytes, str]]
+    lock: threading.Lock
+
+    def __init__(self, files: dict[str, bytes]):
+        self.files = files
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def is_dir(self, name: str) -> bool:
+        prefix = f"{name}/" if name else ""
+        return name not in self.files and any(
+            other.startswith(prefix) for other in self.files
+        )
+
+    def etag(self, name: str) -> str | None:
+        data = self.files.get(name)
+        if data is None:
+            return None
+        with self.lock:
+            entry = self.entries.get(name)
+        if entry is not None and entry[0] is data:
+            return entry[1]
+        etag = f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+        with self.lock:
+            self.entries[name] = (data, etag)
+        return etag
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    """
+    Serve the files of the site, keeping connections alive. A request for a
+    file is answered with its `.br` or `.gz` sibling if the client accepts
+    it, and with a 304 if the client has it already.
+    """
+
+    protocol_version: str = "HTTP/1.1"
+    # the headers and the body are sent separately: do not wait for the client
+    # to acknowledge the headers of a kept-alive connection
+    disable_nagle_algorithm: ClassVar[bool] = True
+    timeout: ClassVar[float | None] = KEEP_ALIVE_TIMEOUT
+    server: "PreviewServer"  # pyright: ignore[reportIncompatibleVariableOverride]
+
+    def do_GET(self):
+        self.respond(True)
+
+    def do_HEAD(self):
+        self.respond(False)
+
+    def resolve(self, url_path: str) -> list[str] | None:
+        """The parts of the name at `url_path`, None if it is outside the site."""
+        parts = [part for part in url_path.split("/") if part not in ("", ".")]
+        if ".." in parts or any("\\" in part or "\0" in part for part in parts):
+            return None
+        return parts
+
+    def variant(self, parts: list[str]) -> tuple[str, str | None, str]:
+        """
+        The file to send for the name of `parts` (a path, or a name in
+        memory), its content coding and its ETag.
+        """
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+        memory = self.server.memory
+        if memory is not None:
+            name = "/".join(parts)
+            for encoding, suffix in ENCODINGS:
+                etag = memory.etag(name + suffix) if encoding in accepted else None
+                if etag is not None:
+                    return name + suffix, encoding, etag
+            etag = memory.etag(name)
+            if etag is None:
+                raise FileNotFoundError(name)
+            return name, None, etag
+
+        path = self.server.root.joinpath(*parts)
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted:
+                sibling = path.with_name(path.name + suffix)
+                try:
+                    stat = sibling.stat()
+                except OSError:
+                    continue
+                etag = self.server.files.etag(sibling, stat)
+                if etag is not None:
+                    return str(sibling), encoding, etag
+        etag = self.server.files.etag(path, path.stat())
+        if etag is None:  # removed since
+            raise FileNotFoundError(path)
+        return str(path), None, etag
+
+    def open(self, file: str) -> tuple[BinaryIO, int]:
+        """The content of a file found by `variant`, and its size."""
+        memory = self.server.memory
+        if memory is not None:
+            data = memory.files.get(file)
+            if data is None:
+                raise FileNotFoundError(file)
+            return io.BytesIO(data), len(data)
+        # closed by the caller
+        source = open(file, "rb")  # noqa: SIM115
+        return source, os.fstat(source.fileno()).st_size
+
+    def respond(self, body: bool):
+        url_path = unquote(urlsplit(self.path).path)
+        parts = self.resolve(url_path)
+        if parts is not None and self.server.is_dir(parts):
+            if not url_path.endswith("/"):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", f"{url_path}/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            parts = [*parts, "index.html"]
+        try:
+            if parts is None:
+                raise FileNotFoundError
+            file, encoding, etag = self.variant(parts)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        matches = self.if_none_match()
+        if etag in matches or "*" in matches:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(etag)
+            self.end_headers()
+            return
+        try:
+            source, size = self.open(file)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        with source:
+            content_type, _ = mimetypes.guess_type(parts[-1] if parts else "")
+            content_type = content_type or "application/octet-stream"
+            if content_type.startswith("text/"):
+                content_type += "; charset=utf-8"
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(size))
+            if encoding is not None:
+                self.send_header("Content-Encoding", encoding)
+            self.send_validators(etag)
+            self.end_headers()
+            if body:
+                self.copy(source, size)
+
+    def copy(self, source: BinaryIO, size: int):
+        """
+        Send the first `size` bytes of `source`, as announced: a file rewritten
+        meanwhile may have grown, or shrunk, in which case the response is cut
+        short and the connection closed.
+        """
+        while size:
+            chunk = source.read(min(size, COPY_CHUNK))
+            if not chunk:
+                self.close_connection = True
+                return
+            _ = self.wfile.write(chunk)
+            size -= len(chunk)
+
+    def if_none_match(self) -> set[str]:
+        header = self.headers.get("If-None-Match")
+        if header is None:
+            return set()
+        return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+    def send_validators(self, etag: str):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")  # revalidate every time
+        self.send_header("Vary", "Accept-Encoding")
+
+    def log_message(self, format: str, *args: object):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class PreviewServer(ThreadingHTTPServer):
+    """
+    A server previewing the site written to `root`, or kept in memory as
+    `files` by name (see `MemoryOutput`), a thread per connection.
+    """
+
+    daemon_threads: bool = True
+    root: Path
+    files: FileTable
+    memory: MemoryTable | None
+    quiet: bool
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        root: Path,
+        quiet: bool = False,
+        files: dict[str, bytes] | None = None,
+    ):
+        super().__init__(address, PreviewHandler)
+        self.root = root
+        self.files = FileTable()
+        self.memory = MemoryTable(files) if files is not None else None
+        self.quiet = quiet
+
+    def is_dir(self, parts: list[str]) -> bool:
+        if self.memory is not None:
+            return self.memory.is_dir("/".join(parts))
+        return self.root.joinpath(*parts).is_dir()
+
+    @override
+    def handle_error(self, request: object, client_address: object):
+        if not isinstance(sys.exception(), ConnectionError):  # the client left
+            super().handle_error(request, client_address)  # pyright: ignore[reportArgumentType]
+
+
+def serve(
+    root: Path,
+    host: str = "",
+    port: int = 8888,
+    files: dict[str, bytes] | None = None,
+):
+    """Serve the site written to `root`, or kept in memory as `files`."""
+    with PreviewServer((host, port), root, files=files) as server:
+        print(f"Serving {root} at http://{host or 'localhost'}:{port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Stopped", file=sys.stderr)
@@ -0,0 +1,414 @@
+import hashlib
+import os
+import sqlite3
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import override
+
+from changes import ChangeSet
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+# the table of an SQLite content store
+SQLITE_TABLE = "pages"
+
+
+def collect_pages(
+    dir_path_content: Path, dest_dir_path: Path, unknown: set[Path] | None = None
+) -> dict[Path, Path]:
+    """Map every markdown file to its output, adding the other files to `unknown`."""
+    pages: dict[Path, Path] = {}
+    entries: list[str] = os.listdir(dir_path_content)
+    for entry in entries:
+        entry_path = Path(os.path.join(dir_path_content, entry))
+        new_dest_dir_path = Path(os.path.join(dest_dir_path, entry))
+
+        if os.path.isfile(entry_path) and entry_path.suffix == ".md":
+            pages[entry_path] = new_dest_dir_path.with_suffix(".html")
+        elif os.path.isdir(entry_path):
+            pages.update(collect_pages(entry_path, new_dest_dir_path, unknown))
+        elif unknown is not None:
+            unknown.add(entry_path)
+    return pages
+
+
+def page_section(name: str) -> str:
+    """The section of a page: its top directory, e.g. `blog` for `blog/tom/index.md`"""
+    section, _, rest = name.partition("/")
+    return section if rest else ""
+
+
+def safe_name(name: str) -> bool:
+    """
+    Whether a page name stays under its root once joined to it: relative and
+    without `..` parts, unlike archive members such as `../evil.md`.
+    """
+    path = PurePosixPath(name.replace("\\", "/"))
+    return bool(name) and not path.is_absolute() and ".." not in path.parts
+
+
+class ContentSource:
+    """
+    Where the markdown pages come from. A page is identified by its path under
+    `root` (the content directory, archive or database), e.g.
+    `content.zip/blog/tom/index.md`.
+    """
+
+    root: Path
+    # whether worker processes can read pages themselves: other sources give
+    # them the pages read by the parent
+    shared: bool = False
+    # the names of the files which are not pages, found when listing them
+    unknown: set[str]
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.unknown = set()
+
+    def name(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def names(self) -> list[str]:
+        raise NotImplementedError
+
+    def pages(self, dest_dir: Path) -> dict[Path, Path]:
+        """Map the path of every page to its output under `dest_dir`."""
+        pages: dict[Path, Path] = {}
+        for name in self.names():
+            if not safe_name(name):
+                raise ValueError(f"{name}: page outside of {self.root}")
+            pages[self.root / name] = (dest_dir / name).with_suffix(".html")
+        return pages
+
+    def read(self, path: Path) -> str:
+        raise NotImplementedError
+
+    def size(self, path: Path) -> int:
+        raise NotImplementedError
+
+    def exists(self, path: Path) -> bool:
+        raise NotImplementedError
+
+    def versions(self) -> dict[str, str]:
+        """
+        A token per page name, that changes when the page does, to find the
+        pages changed since a previous build.
+        """
+        raise NotImplementedError
+
+
+class DirectorySource(ContentSource):
+    """The markdown files of a directory tree."""
+
+    shared: bool = True
+
+    def collect(self, dest_dir: Path) -> dict[Path, Path]:
+        unknown: set[Path] = set()
+        pages = collect_pages(self.root, dest_dir, unknown)
+        self.unknown = {self.name(path) for path in unknown}
+        return pages
+
+    @override
+    def names(self) -> list[str]:
+        return [self.name(path) for path in self.collect(self.root)]
+
+    @override
+    def pages(self, dest_dir: Path) -> dict[Path, Path]:
+        return self.collect(dest_dir)
+
+    @override
+    def read(self, path: Path) -> str:
+        with open(path, "r") as file:
+            return file.read()
+
+    @override
+    def size(self, path: Path) -> int:
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+
+    @override
+    def exists(self, path: Path) -> bool:
+        return path.suffix == ".md" and path.is_file()
+
+    @override
+    def versions(self) -> dict[str, str]:
+        versions: dict[str, str] = {}
+        for path in self.collect(self.root):
+            stat = path.stat()
+            versions[self.name(path)] = f"{stat.st_size}:{stat.st_mtime_ns}"
+        return versions
+
+
+class MemorySource(ContentSource):
+    """Pages given as markdown strings, by name."""
+
+    shared: bool = True
+    markdown: dict[str, str]
+
+    def __init__(self, root: Path, markdown: dict[str, str]):
+        super().__init__(root)
+        self.markdown = markdown
+
+    @override
+    def names(self) -> list[str]:
+        return sorted(self.markdown)
+
+    @override
+    def read(self, path: Path) -> str:
+        try:
+            return self.markdown[self.name(path)]
+        except KeyError:
+            raise FileNotFoundError(2, "No such page", str(path)) from None
+
+    @override
+    def size(self, path: Path) -> int:
+        return len(self.markdown.get(self.name(path), "").encode())
+
+    @override
+    def exists(self, path: Path) -> bool:
+        return self.name(path) in self.markdown
+
+    @override
+    def versions(self) -> dict[str, str]:
+        return {
+            name: hashlib.sha256(markdown.encode()).hexdigest()
+            for name, markdown in self.markdown.items()
+        }
+
+
+class TarSource(ContentSource):
+    """
+    The markdown members of a tar archive. An uncompressed archive is indexed
+    once and its members read in place; a compressed one cannot be read at
+    random, so its pages are decompressed in a single pass and kept in memory.
+    """
+
+    members: dict[str, tarfile.TarInfo] | None
+    data: dict[str, bytes]
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.members = None
+        self.data = {}
+
+    def index(self) -> dict[str, tarfile.TarInfo]:
+        if self.members is None:
+            self.members = {}
+            compressed = not self.root.name.endswith(".tar")
+            with tarfile.open(self.root, "r:*") as tar:
+                for member in tar:
+                    if not member.isfile() or not member.name.endswith(".md"):
+                        continue
+                    name = member.name.removeprefix("./")
+                    if not safe_name(name):
+                        continue
+                    self.members[name] = member
+                    if compressed:
+                        file = tar.extractfile(member)
+                        self.data[name] = file.read() if file is not None else b""
+        return self.members
+
+    @override
+    def names(self) -> list[str]:
+        return sorted(self.index())
+
+    @override
+    def read(self, path: Path) -> str:
+        member = self.index().get(self.name(path))
+        if member is None:
+            raise FileNotFoundError(2, "No such member", str(path))
+        data = self.data.get(self.name(path))
+        if data is None:
+            with open(self.root, "rb") as file:
+                _ = file.seek(member.offset_data)
+                data = file.read(member.size)
+        return data.decode()
+
+    @override
+    def size(self, path: Path) -> int:
+        member = self.index().get(self.name(path))
+        return member.size if member is not None else 0
+
+    @override
+    def exists(self, path: Path) -> bool:
+        return self.name(path) in self.index()
+
+    @override
+    def versions(self) -> dict[str, str]:
+        return {
+            name: f"{member.size}:{member.mtime}:{member.chksum}"
+            for name, member in self.index().items()
+        }
+
+
+class ZipSource(ContentSource):
+    """The markdown members of a zip archive."""
+
+    archive: zipfile.ZipFile | None
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.archive = None
+
+    def zip(self) -> zipfile.ZipFile:
+        if self.archive is None:
+            self.archive = zipfile.ZipFile(self.root)
+        return self.archive
+
+    def members(self) -> dict[str, zipfile.ZipInfo]:
+        return {
+            info.filename: info
+            for info in self.zip().infolist()
+            if not info.is_dir()
+            and info.filename.endswith(".md")
+            and safe_name(info.filename)
+        }
+
+    @override
+    def names(self) -> list[str]:
+        return sorted(self.members())
+
+    @override
+    def read(self, path: Path) -> str:
+        try:
+            return self.zip().read(self.name(path)).decode()
+        except KeyError:
+            raise FileNotFoundError(2, "No such member", str(path)) from None
+
+    @override
+    def size(self, path: Path) -> int:
+        try:
+            return self.zip().getinfo(self.name(path)).file_size
+        except KeyError:
+            return 0
+
+    @override
+    def exists(self, path: Path) -> bool:
+        if not safe_name(self.name(path)):
+            return False
+        try:
+            _ = self.zip().getinfo(self.name(path))
+        except KeyError:
+            return False
+        return True
+
+    @override
+    def versions(self) -> dict[str, str]:
+        return {
+            name: f"{info.file_size}:{info.CRC}"
+            for name, info in self.members().items()
+        }
+
+
+def sqlite_sha256(markdown: str) -> str:
+    return hashlib.sha256(markdown.encode()).hexdigest()
+
+
+class SqliteSource(ContentSource):
+    """
+    The rows of the `pages (path, markdown, mtime)` table of an SQLite
+    database, by path (e.g. `blog/tom/index.md`).
+    """
+
+    connection: sqlite3.Connection | None
+    sizes: dict[str, int] | None
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.connection = None
+        self.sizes = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.connection = sqlite3.connect(f"file:{self.root}?mode=ro", uri=True)
+            self.connection.create_function(
+                "sha256", 1, sqlite_sha256, deterministic=True
+            )
+        return self.connection
+
+    def index(self) -> dict[str, int]:
+        if self.sizes is None:
+            rows = self.connect().execute(
+                f"SELECT path, length(CAST(markdown AS BLOB)) FROM {SQLITE_TABLE}"
+            )
+            self.sizes = {
+                str(path): int(size) for path, size in rows if safe_name(str(path))
+            }
+        return self.sizes
+
+    @override
+    def names(self) -> list[str]:
+        return sorted(self.index())
+
+    @override
+    def read(self, path: Path) -> str:
+        row = (
+            self.connect()
+            .execute(
+                f"SELECT markdown FROM {SQLITE_TABLE} WHERE path = ?",
+                (self.name(path),),
+            )
+            .fetchone()
+        )
+        if row is None:
+            raise FileNotFoundError(2, "No such row", str(path))
+        return str(row[0])
+
+    @override
+    def size(self, path: Path) -> int:
+        return self.index().get(self.name(path), 0)
+
+    @override
+    def exists(self, path: Path) -> bool:
+        return self.name(path) in self.index()
+
+    @override
+    def versions(self) -> dict[str, str]:
+        rows = self.connect().execute(
+            f"SELECT path, sha256(markdown) FROM {SQLITE_TABLE}"
+        )
+        return {str(path): str(digest) for path, digest in rows}
+
+
+def open_source(content: str) -> ContentSource:
+    """
+    The source for a content path: a tar or zip archive or an SQLite database
+    for the matching extensions, a directory otherwise.
+    """
+    path = Path(content)
+    if content.endswith(".zip"):
+        return ZipSource(path)
+    if content.endswith(TAR_SUFFIXES):
+        return TarSource(path)
+    if content.endswith(SQLITE_SUFFIXES):
+        return SqliteSource(path)
+    return DirectorySource(path)
+
+
+def file_versions(directory: Path) -> dict[str, str]:
+    """The size and mtime of every file under `directory`, by relative name."""
+    versions: dict[str, str] = {}
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = Path(dirpath) / filename
+            stat = path.stat()
+            name = path.relative_to(directory).as_posix()
+            versions[name] = f"{stat.st_size}:{stat.st_mtime_ns}"
+    return versions
+
+
+def changes_between(
+    root: Path, previous: dict[str, str], versions: dict[str, str]
+) -> ChangeSet:
+    """The pages of `root` added, changed or deleted between two `versions()`."""
+    return ChangeSet(
+        {
+            root / name
+            for name, version in versions.items()
+            if previous.get(name) != version
+        },
+        {root / name for name in previous if name not in versions},
+    )
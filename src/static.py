@@ -0,0 +1,80 @@
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+from cache import BuildCache
+from changes import ChangeSet
+from output import DirectoryOutput, Output
+
+PRECOMPRESS_SUFFIXES = {".html", ".css", ".js", ".svg", ".xml", ".txt", ".json"}
+
+
+def gzip_bytes(data: bytes, cache: BuildCache | None = None) -> bytes:
+    if cache is None:
+        return gzip.compress(data, mtime=0)
+
+    key = cache.key("gzip", hashlib.sha256(data).digest())
+    compressed = cache.get("gzip", key)
+    if compressed is None:
+        compressed = gzip.compress(data, mtime=0)
+        cache.put("gzip", key, compressed)
+    return compressed
+
+
+def copy_asset(
+    src: Path,
+    dest: Path,
+    precompress: bool = False,
+    cache: BuildCache | None = None,
+    output: Output | None = None,
+) -> int:
+    """Copy a static asset, return the number of bytes written."""
+    output = output or DirectoryOutput(dest.parent)
+    output.copy(src, dest)
+    written = src.stat().st_size
+    if precompress and src.suffix in PRECOMPRESS_SUFFIXES:
+        compressed = gzip_bytes(src.read_bytes(), cache)
+        output.write(dest.with_name(dest.name + ".gz"), compressed)
+        written += len(compressed)
+    return written
+
+
+def copy_static(
+    static_dir: Path,
+    dest_dir: Path,
+    precompress: bool = False,
+    cache: BuildCache | None = None,
+    output: Output | None = None,
+) -> int:
+    """Copy the static assets, with a `.gz` sibling for text assets if asked to."""
+    output = output or DirectoryOutput(dest_dir)
+    written = 0
+    for dirpath, dirnames, filenames in os.walk(static_dir):
+        dirnames.sort()  # for archives to list the assets in a stable order
+        for filename in sorted(filenames):
+            src = Path(dirpath) / filename
+            dest = dest_dir / src.relative_to(static_dir)
+            written += copy_asset(src, dest, precompress, cache, output)
+    return written
+
+
+def copy_changed_static(
+    changes: ChangeSet,
+    static_dir: Path,
+    dest_dir: Path,
+    precompress: bool = False,
+    cache: BuildCache | None = None,
+    output: Output | None = None,
+) -> int:
+    output = output or DirectoryOutput(dest_dir)
+    written = 0
+    for path in sorted(changes.deleted):
+        dest = dest_dir / path.relative_to(static_dir)
+        output.remove(dest)
+        output.remove(dest.with_name(dest.name + ".gz"))
+    for path in sorted(changes.changed):
+        if path.is_file():
+            dest = dest_dir / path.relative_to(static_dir)
+            written += copy_asset(path, dest, precompress, cache, output)
+    return written
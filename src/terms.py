@@ -0,0 +1,72 @@
+import json
+import re
+from collections import Counter
+
+from cache import BuildCache
+from markdown import (
+    RE_HEADING_PATTERN,
+    BlockType,
+    block_to_block_type,
+    markdown_to_blocks,
+    page_title,
+    text_to_spans,
+)
+from textnode import TextType
+
+# bump when the text or the terms of a page change, as they are cached
+TERMS_VERSION = "1"
+
+WORD = re.compile(r"[^\W_]{2,}")
+# the spans whose text is read: not code, nor the alt text of images
+TEXT_TYPES = {TextType.TEXT, TextType.BOLD, TextType.ITALIC, TextType.LINK}
+
+
+def block_text(block: str) -> str:
+    """The inline markdown of a block, without the markup of the block itself."""
+    match block_to_block_type(block):
+        case BlockType.CODE:
+            return ""
+        case BlockType.HEADING:
+            match = re.match(RE_HEADING_PATTERN, block)
+            return match.group(2) if match else block
+        case BlockType.QUOTE:
+            return " ".join(line.lstrip(">").strip() for line in block.splitlines())
+        case BlockType.UNORDERED_LIST:
+            return " ".join(line[2:] for line in block.splitlines())
+        case BlockType.ORDERED_LIST:
+            return " ".join(line[3:] for line in block.splitlines())
+        case BlockType.PARAGRAPH:
+            return block.replace("\n", " ")
+
+
+def page_text(markdown: str) -> str:
+    """The plain text of a page, as parsed for rendering."""
+    text: list[str] = []
+    for block in markdown_to_blocks(markdown):
+        for span in text_to_spans(block_text(block)):
+            if span.text_type in TEXT_TYPES:
+                text.append(span.text)
+    return " ".join(text)
+
+
+def tokenize(text: str) -> list[str]:
+    """The lowercase words of `text`, in order."""
+    return WORD.findall(text.lower())
+
+
+def page_terms(
+    markdown: str, cache: BuildCache | None = None
+) -> tuple[str, Counter[str]]:
+    """The title and the term counts of a page, cached by its markdown."""
+    key = ""
+    if cache is not None:
+        key = cache.key("terms", markdown, TERMS_VERSION)
+        cached = cache.get("terms", key)
+        if cached is not None:
+            title, counts = json.loads(cached)  # pyright: ignore[reportAny]
+            return title, Counter(counts)  # pyright: ignore[reportAny]
+    title = page_title(markdown)
+    counts = Counter(tokenize(page_text(markdown)))
+    if cache is not None:
+        cache.put("terms", key, json.dumps([title, counts]).encode())
+    return title, counts
@@ -0,0 +1,113 @@
+# pyright: reportUninitializedInstanceVariable=false
+import tempfile
+import unittest
+from pathlib import Path
+
+from assets import (
+    AssetManifest,
+    fingerprint_name,
+    fingerprint_static,
+    headers,
+    rewrite_template,
+    rewrite_urls,
+)
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+URLS = {"/index.css": "/index.0123abcd.css", "/images/tom.png": "/images/tom.ab.png"}
+
+
+class TestAssets(unittest.TestCase):
+    def test_fingerprint_name(self):
+        self.assertEqual(
+            fingerprint_name("index.css", "3f9a1c8e77"), "index.3f9a1c8e.css"
+        )
+        self.assertEqual(
+            fingerprint_name("images/tom.png", "0123456789"), "images/tom.01234567.png"
+        )
+
+    def test_manifest_round_trip(self):
+        manifest = AssetManifest({"index.css": ("index.0123abcd.css", 10, 20)})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "asset-manifest.json"
+            _ = path.write_bytes(manifest.to_json())
+            self.assertEqual(AssetManifest.load(path).entries, manifest.entries)
+            self.assertEqual(AssetManifest.load(path.with_name("missing")).entries, {})
+        self.assertEqual(manifest.urls(), {"/index.css": "/index.0123abcd.css"})
+
+    def test_headers(self):
+        manifest = AssetManifest({"index.css": ("index.0123abcd.css", 10, 20)})
+        self.assertEqual(
+            headers(manifest),
+            b"/index.0123abcd.css\n"
+            + b"  Cache-Control: public, max-age=31536000, immutable\n",
+        )
+
+    def test_rewrite_urls(self):
+        node = ParentNode(
+            "p",
+            [
+                LeafNode("img", "Tom", {"src": "/images/tom.png"}),
+                LeafNode("a", "elsewhere", {"href": "/images/other.png"}),
+            ],
+        )
+        rewrite_urls(node, URLS)
+        self.assertEqual(
+            node.to_html(),
+            '<p><img alt="Tom" src="/images/tom.ab.png" />'
+            + '<a href="/images/other.png">elsewhere</a></p>',
+        )
+
+    def test_rewrite_template(self):
+        template = '<link href="/index.css" rel="stylesheet" /><a href="/">home</a>'
+        self.assertEqual(
+            rewrite_template(template, URLS),
+            '<link href="/index.0123abcd.css" rel="stylesheet" /><a href="/">home</a>',
+        )
+
+
+class TestFingerprintStatic(unittest.TestCase):
+    tmpdir: tempfile.TemporaryDirectory[str]
+    static: Path
+    dest: Path
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.static = Path(self.tmpdir.name) / "static"
+        self.dest = Path(self.tmpdir.name) / "public"
+        (self.static / "images").mkdir(parents=True)
+        _ = (self.static / "index.css").write_text("body {}")
+        _ = (self.static / "images" / "tom.png").write_bytes(b"png")
+        _ = (self.static / "robots.txt").write_text("")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_fingerprint(self):
+        manifest, _ = fingerprint_static(self.static, self.dest, AssetManifest())
+        self.assertEqual(sorted(manifest.entries), ["images/tom.png", "index.css"])
+        css = manifest.entries["index.css"][0]
+        self.assertRegex(css, r"^index\.[0-9a-f]{8}\.css$")
+        self.assertEqual((self.dest / css).read_text(), "body {}")
+        self.assertIn(f"/{css}\n", (self.dest / "_headers").read_text())
+        self.assertEqual(
+            AssetManifest.load(self.dest / "asset-manifest.json").entries,
+            manifest.entries,
+        )
+
+    def test_only_changed_assets(self):
+        previous, _ = fingerprint_static(self.static, self.dest, AssetManifest())
+        _, written = fingerprint_static(self.static, self.dest, previous)
+        self.assertEqual(written, 0)
+
+        _ = (self.static / "index.css").write_text("body { margin: 0 }")
+        manifest, written = fingerprint_static(self.static, self.dest, previous)
+        self.assertEqual(written, len("body { margin: 0 }"))
+        self.assertFalse((self.dest / previous.entries["index.css"][0]).exists())
+        self.assertEqual(
+            manifest.entries["images/tom.png"], previous.entries["images/tom.png"]
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
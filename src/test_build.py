@@ -0,0 +1,128 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from build import build
+from config import BuildConfig
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestBuild(unittest.TestCase):
+    def test_in_memory(self):
+        result = build(
+            BuildConfig(
+                {"index.md": "# Home\n\nSome **text**", "blog/tom.md": "# Tom"},
+                TEMPLATE,
+                basepath="/site/",
+            )
+        )
+        self.assertEqual(
+            result.files["index.html"],
+            b"<title>Home</title><div><h1>Home</h1><p>Some <b>text</b></p></div>",
+        )
+        self.assertEqual(result.written, ["blog/tom.html", "index.html"])
+        self.assertEqual(result.errors, {})
+        self.assertEqual(len(result.pages), 2)
+        self.assertTrue(all(page.seconds > 0 for page in result.pages))
+
+    def test_errors_are_reported(self):
+        result = build(
+            BuildConfig({"index.md": "# Home", "bad.md": "**bold"}, TEMPLATE)
+        )
+        self.assertEqual(list(result.errors), ["content/bad.md"])
+        self.assertIn("Invalid Markdown syntax", result.errors["content/bad.md"])
+        self.assertEqual(result.written, ["index.html"])
+
+    def test_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            content = root / "content"
+            (content / "blog").mkdir(parents=True)
+            _ = (content / "index.md").write_text("# Home")
+            _ = (content / "blog" / "tom.md").write_text("# Tom")
+            template = root / "template.html"
+            _ = template.write_text(TEMPLATE)
+            config = BuildConfig(
+                content, template, root / "public", versions=root / "versions.json"
+            )
+
+            result = build(config)
+            self.assertEqual(result.written, ["blog/tom.html", "index.html"])
+            self.assertEqual(result.files, {})
+            self.assertEqual(
+                result.messages,
+                [f"No versions in {root / 'versions.json'}: full build"],
+            )
+
+            _ = (content / "index.md").write_text("# Welcome")
+            (content / "blog" / "tom.md").unlink()
+            result = build(config)
+            self.assertEqual(result.written, ["index.html"])
+            self.assertEqual(result.removed, ["blog/tom.html"])
+            self.assertEqual(result.messages, [])
+            self.assertIn(
+                "<title>Welcome</title>", (root / "public" / "index.html").read_text()
+            )
+
+    def test_unknown_files_are_reported(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = Path(tmp) / "content"
+            (content / "blog").mkdir(parents=True)
+            _ = (content / "index.md").write_text("# Home")
+            _ = (content / "blog" / "notes.txt").write_text("notes")
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                result = build(BuildConfig(content, TEMPLATE))
+            self.assertEqual(result.written, ["index.html"])
+            self.assertEqual(result.messages, ["blog/notes.txt: unknown type of file"])
+            self.assertEqual(stdout.getvalue(), "")
+
+    def test_listing_titles_are_escaped_once(self):
+        result = build(BuildConfig({"tom&jerry/a.md": "# A"}, TEMPLATE, listings=5))
+        self.assertTrue(
+            result.files["tom&jerry/page/1/index.html"].startswith(
+                b"<title>tom&amp;jerry</title><h1>tom&amp;jerry</h1>"
+            )
+        )
+
+    def test_search_script_only_with_search(self):
+        content, template = {"index.md": "# Home"}, "{{ Search }}{{ Content }}"
+        html = build(BuildConfig(content, template, search=True)).files["index.html"]
+        self.assertTrue(html.startswith(b'<script src="/search.js" data-root="/"'))
+        html = build(BuildConfig(content, template)).files["index.html"]
+        self.assertEqual(html, b"<div><h1>Home</h1></div>")
+
+    def test_inline_images(self):
+        for jobs in (1, 2):  # workers get the data URIs as they start
+            with self.subTest(jobs=jobs), tempfile.TemporaryDirectory() as tmp:
+                static = Path(tmp)
+                _ = (static / "dot.svg").write_bytes(b"<svg/>")
+                large = b"<svg>" + bytes(100) + b"</svg>"
+                _ = (static / "large.svg").write_bytes(large)
+                result = build(
+                    BuildConfig(
+                        {
+                            "index.md": "# Home\n\n![dot](/dot.svg) ![large](/large.svg)",
+                            "plain.md": "# Plain",
+                        },
+                        TEMPLATE,
+                        static=static,
+                        jobs=jobs,
+                        inline_images=100,
+                    )
+                )
+                uri = "data:image/svg+xml;base64,PHN2Zy8+"
+                index = result.files["index.html"]
+                self.assertIn(f'src="{uri}"'.encode(), index)
+                self.assertIn(b'src="/large.svg"', index)
+                inlined = {page.source: page.inlined_bytes for page in result.pages}
+                self.assertEqual(
+                    inlined, {"content/index.md": len(uri), "content/plain.md": 0}
+                )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,83 @@
+# pyright: reportUninitializedInstanceVariable=false
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from cache import BuildCache, parse_size
+
+
+class TestParseSize(unittest.TestCase):
+    def test_bytes(self):
+        self.assertEqual(parse_size("4096"), 4096)
+
+    def test_units(self):
+        self.assertEqual(parse_size("500K"), 500 * 1024)
+        self.assertEqual(parse_size("200m"), 200 * 1024**2)
+        self.assertEqual(parse_size("2GB"), 2 * 1024**3)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            _ = parse_size("lots")
+
+
+class TestBuildCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = BuildCache(Path(self.tmpdir.name))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_depends_on_kind_and_parts(self):
+        key = self.cache.key("page", "ab", "c")
+        self.assertEqual(key, self.cache.key("page", "ab", "c"))
+        self.assertNotEqual(key, self.cache.key("page", "a", "bc"))
+        self.assertNotEqual(key, self.cache.key("block", "ab", "c"))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get("page", self.cache.key("page", "x")))
+        self.assertEqual(self.cache.misses["page"], 1)
+
+    def test_put_then_get(self):
+        key = self.cache.key("page", "x")
+        self.cache.put("page", key, b"<p>x</p>")
+        self.assertEqual(self.cache.get("page", key), b"<p>x</p>")
+        self.assertEqual(self.cache.hits["page"], 1)
+
+    def test_shared_between_instances(self):
+        key = self.cache.key("block", "x")
+        self.cache.put("block", key, b"<p>x</p>")
+        other = BuildCache(Path(self.tmpdir.name))
+        self.assertEqual(other.get("block", key), b"<p>x</p>")
+
+    def test_no_temporary_files_left(self):
+        self.cache.put("page", self.cache.key("page", "x"), b"x")
+        for _, _, filenames in os.walk(self.tmpdir.name):
+            for filename in filenames:
+                self.assertFalse(filename.startswith(".tmp-"))
+
+    def test_gc_evicts_least_recently_used(self):
+        keys = [self.cache.key("page", str(i)) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put("page", key, b"x" * 100)
+            os.utime(self.cache.path("page", key), (i, i))
+        _ = self.cache.get("page", keys[0])  # most recently used now
+
+        entries, size = self.cache.gc(max_size=200)
+        self.assertEqual((entries, size), (1, 100))
+        self.assertIsNotNone(self.cache.get("page", keys[0]))
+        self.assertIsNone(self.cache.get("page", keys[1]))
+        self.assertIsNotNone(self.cache.get("page", keys[2]))
+        self.assertEqual(self.cache.size(), 200)
+
+    def test_gc_removes_orphan_temporary_files(self):
+        orphan = Path(self.tmpdir.name) / "page" / ".tmp-orphan"
+        orphan.parent.mkdir(parents=True)
+        _ = orphan.write_bytes(b"partial")
+        _ = self.cache.gc(max_size=1024)
+        self.assertFalse(orphan.exists())
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
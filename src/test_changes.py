@@ -0,0 +1,110 @@
+# pyright: reportUninitializedInstanceVariable=false
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from changes import ChangeSet, added_dates, changes_since, parse_name_status
+
+
+class TestParseNameStatus(unittest.TestCase):
+    def test_empty(self):
+        changes = parse_name_status("")
+        self.assertEqual(changes.changed, set())
+        self.assertEqual(changes.deleted, set())
+
+    def test_added_modified_deleted(self):
+        output = "A\0content/new.md\0M\0content/index.md\0D\0content/old.md\0"
+        changes = parse_name_status(output)
+        self.assertEqual(
+            changes.changed, {Path("content/new.md"), Path("content/index.md")}
+        )
+        self.assertEqual(changes.deleted, {Path("content/old.md")})
+
+    def test_renamed(self):
+        changes = parse_name_status("R087\0content/a.md\0content/b.md\0")
+        self.assertEqual(changes.changed, {Path("content/b.md")})
+        self.assertEqual(changes.deleted, {Path("content/a.md")})
+
+    def test_under(self):
+        changes = ChangeSet(
+            {Path("content/a.md"), Path("static/index.css")},
+            {Path("content/b.md")},
+        )
+        content = changes.under(Path("content"))
+        self.assertEqual(content.changed, {Path("content/a.md")})
+        self.assertEqual(content.deleted, {Path("content/b.md")})
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed")
+class TestChangesSince(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+        self.git("init", "--quiet")
+        os.mkdir("content")
+        _ = Path("content/a.md").write_text("# A")
+        _ = Path("content/b.md").write_text("# B")
+        _ = Path("template.html").write_text("{{ Content }}")
+        self.git("add", ".")
+        self.git("commit", "--quiet", "-m", "initial")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    def git(self, *args: str):
+        _ = subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+            check=True,
+        )
+
+    def test_working_tree_changes(self):
+        _ = Path("content/a.md").write_text("# A changed")
+        Path("content/b.md").unlink()
+        _ = Path("content/c.md").write_text("# C")
+
+        changes = changes_since("HEAD", [Path("content"), Path("template.html")])
+        self.assertEqual(changes.changed, {Path("content/a.md"), Path("content/c.md")})
+        self.assertEqual(changes.deleted, {Path("content/b.md")})
+        self.assertFalse(changes.touches(Path("template.html")))
+
+    def test_committed_rename(self):
+        self.git("mv", "content/a.md", "content/renamed.md")
+        self.git("commit", "--quiet", "-m", "rename")
+
+        changes = changes_since("HEAD~1", [Path("content")])
+        self.assertEqual(changes.changed, {Path("content/renamed.md")})
+        self.assertEqual(changes.deleted, {Path("content/a.md")})
+
+    def test_template_changed(self):
+        _ = Path("template.html").write_text("<main>{{ Content }}</main>")
+        changes = changes_since("HEAD", [Path("content"), Path("template.html")])
+        self.assertTrue(changes.touches(Path("template.html")))
+
+    def test_added_dates(self):
+        _ = Path("content/a.md").write_text("# A changed")
+        _ = Path("content/c.md").write_text("# C")
+        self.git("add", ".")
+        os.environ["GIT_AUTHOR_DATE"] = "2030-01-02T03:04:05+01:00"
+        try:
+            self.git("commit", "--quiet", "-m", "later")
+        finally:
+            del os.environ["GIT_AUTHOR_DATE"]
+
+        dates = added_dates(Path("content"))
+        self.assertEqual(sorted(dates), ["a.md", "b.md", "c.md"])
+        self.assertEqual(dates["a.md"], dates["b.md"])  # the initial commit
+        self.assertEqual(dates["c.md"], "2030-01-02T02:04:05Z")
+        self.assertEqual(added_dates(Path(self.tmpdir.name) / "missing"), {})
+
+    def test_unknown_revision(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            _ = changes_since("no-such-rev", [Path("content")])
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from pathlib import Path
+
+from check import check_page, find_references, is_in_index, resolve, site_index
+from textnode import TextType
+
+MARKDOWN = """\
+# Title
+
+[home](/) and ![tom](/images/tom.png)
+
+```
+[not a link](/nowhere)
+```
+
+- one
+- [two](../two.md)
+"""
+
+INDEX = {"/index.html", "/blog/one/index.html", "/blog/two.html", "/images/tom.png"}
+
+
+class TestFindReferences(unittest.TestCase):
+    def test_find_references(self):
+        self.assertEqual(
+            find_references(MARKDOWN),
+            (
+                [
+                    (3, TextType.LINK, "/"),
+                    (3, TextType.IMAGE, "/images/tom.png"),
+                    (10, TextType.LINK, "../two.md"),
+                ],
+                [],
+            ),
+        )
+
+    def test_invalid_markdown(self):
+        markdown = "# Title\n\nsee my_var and [home](/)\n\n[two](/two.html)"
+        self.assertEqual(
+            find_references(markdown), ([(5, TextType.LINK, "/two.html")], [3])
+        )
+
+
+class TestResolve(unittest.TestCase):
+    def test_absolute(self):
+        self.assertEqual(resolve("/blog/one", "/index.html"), "/blog/one")
+        self.assertEqual(resolve("/blog/one/#top", "/index.html"), "/blog/one/")
+
+    def test_relative(self):
+        self.assertEqual(resolve("../two.md", "/blog/one/index.html"), "/blog/two.html")
+        self.assertEqual(resolve("tom%20b.png", "/blog/a.html"), "/blog/tom b.png")
+
+    def test_external(self):
+        self.assertIsNone(resolve("https://boot.dev", "/index.html"))
+        self.assertIsNone(resolve("//cdn.example.com/x.js", "/index.html"))
+        self.assertIsNone(resolve("mailto:me@example.com", "/index.html"))
+        self.assertIsNone(resolve("#top", "/index.html"))
+
+    def test_is_in_index(self):
+        self.assertTrue(is_in_index("/", INDEX))
+        self.assertTrue(is_in_index("/blog/one", INDEX))
+        self.assertTrue(is_in_index("/blog/one/", INDEX))
+        self.assertFalse(is_in_index("/blog/three", INDEX))
+
+
+class TestCheckPage(unittest.TestCase):
+    def test_site_index(self):
+        pages = {Path("content/index.md"): Path("public/index.html")}
+        self.assertEqual(site_index(pages, Path("public"), None), {"/index.html"})
+
+    def test_check_page(self):
+        markdown = "[ok](/blog/one)\n[broken](/blog/three)\n\n![gone](gone.png)"
+        self.assertEqual(
+            check_page(Path("content/blog/a.md"), markdown, "/blog/a.html", INDEX),
+            [
+                "content/blog/a.md:2: broken link /blog/three",
+                "content/blog/a.md:4: broken image gone.png",
+            ],
+        )
+
+    def test_check_page_invalid_markdown(self):
+        markdown = "[broken](/blog/three)\n\nsee my_var in [one](/blog/one)"
+        self.assertEqual(
+            check_page(Path("content/blog/a.md"), markdown, "/blog/a.html", INDEX),
+            [
+                "content/blog/a.md:1: broken link /blog/three",
+                "content/blog/a.md:3: invalid markdown",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
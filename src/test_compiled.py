@@ -0,0 +1,25 @@
+import unittest
+
+import markdown
+from compiled import COMPILED_MODULES, is_compiled, pure_modules, stale_extensions
+
+
+class TestCompiled(unittest.TestCase):
+    def test_pure_modules(self):
+        modules = pure_modules()
+        self.assertEqual(list(modules), list(COMPILED_MODULES))
+        self.assertFalse(any(is_compiled(module) for module in modules.values()))
+        self.assertIsNot(modules["markdown"], markdown)
+        # the copies import each other, not the modules imported elsewhere
+        self.assertIs(modules["markdown"].TextNode, modules["textnode"].TextNode)
+
+    def test_extensions_are_up_to_date(self):
+        self.assertEqual(
+            stale_extensions(),
+            [],
+            "rebuild them with `SSG_MYPYC=1 python setup.py build_ext --inplace`",
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from cache import BuildCache
+from differential import (
+    check,
+    diverge,
+    first_difference,
+    inputs,
+    minimize,
+    render_paths,
+    render_reference,
+)
+from main import render_markdown
+
+
+class TestDifferential(unittest.TestCase):
+    def test_optimized_paths_render_as_the_reference(self):
+        with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(2) as executor:
+            paths = render_paths(BuildCache(Path(tmp)), executor)
+            divergences = check(paths, inputs(pages=40))
+        self.assertEqual([str(divergence) for divergence in divergences], [])
+
+    def test_first_difference(self):
+        self.assertIsNone(first_difference(b"abc", b"abc"))
+        self.assertEqual(first_difference(b"abc", b"abd"), 2)
+        self.assertEqual(first_difference(b"abc", b"ab"), 2)
+
+    def test_minimize(self):
+        text = "# Title\n\nsome **bold** text\nand a [link](/x)\n\n- item"
+        self.assertEqual(minimize(text, lambda text: "[" in text), "[")
+
+    def test_divergence_is_minimized(self):
+        def broken(text: str) -> str:
+            return render_markdown(text).replace("<b>", "<strong>")
+
+        text = "# Title\n\nsome **bold** text\nand a [link](/x)\n\n- item"
+        divergence = diverge("broken", broken, render_reference, text)
+        assert divergence is not None
+        self.assertRegex(divergence.markdown, r"^\*\*.\*\*$")  # one bold letter
+        self.assertEqual(divergence.offset, len("<div><p><"))
+        self.assertIn("broken: first difference at byte 9", str(divergence))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,164 @@
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import feeds
+from feeds import (
+    ATOM_NS,
+    SITEMAP_NS,
+    PageMetadata,
+    SiteMetadata,
+    XmlWriter,
+    write_sitemap_and_feeds,
+)
+from output import MemoryOutput
+
+SITE = "https://example.com"
+
+
+def page(section: str, title: str, hash: str) -> PageMetadata:
+    return PageMetadata(section, title, hash, "")
+
+
+def site() -> SiteMetadata:
+    metadata = SiteMetadata(SITE)
+    _ = metadata.update(
+        {
+            "index.html": page("", "Home", "a"),
+            "blog/tom/index.html": page("blog", "Tom", "b"),
+            "blog/elves.html": page("blog", "Elves & Men", "c"),
+            "contact/index.html": page("contact", "Contact", "d"),
+        },
+        {"index.html", "blog/tom/index.html", "blog/elves.html", "contact/index.html"},
+        "2024-01-01T00:00:00Z",
+    )
+    return metadata
+
+
+class TestXmlWriter(unittest.TestCase):
+    def test_escapes(self):
+        writer = XmlWriter()
+        writer.start("a", {"href": 'x"&y'})
+        writer.element("b", "<tom> & co")
+        writer.element("c")
+        writer.end()
+        self.assertEqual(
+            writer.getvalue().decode().splitlines()[1],
+            '<a href="x&quot;&amp;y"><b>&lt;tom&gt; &amp; co</b><c/></a>',
+        )
+
+
+class TestSiteMetadata(unittest.TestCase):
+    def test_changed_sections(self):
+        metadata = site()
+        names = set(metadata.pages)
+        unchanged = {"blog/elves.html": page("blog", "Elves & Men", "c")}
+        self.assertEqual(metadata.update(unchanged, names, "later"), set())
+        edited = {"blog/elves.html": page("blog", "Elves & Men", "e")}
+        self.assertEqual(metadata.update(edited, names, "later"), {"blog"})
+        self.assertEqual(metadata.pages["blog/elves.html"].updated, "later")
+        self.assertEqual(
+            metadata.pages["blog/elves.html"].published, "2024-01-01T00:00:00Z"
+        )
+        names.discard("contact/index.html")
+        self.assertEqual(metadata.update({}, names, "later"), {"contact"})
+
+    def test_renamed_title_keeps_date(self):
+        metadata = site()
+        renamed = {"index.html": page("", "Welcome", "a")}
+        self.assertEqual(metadata.update(renamed, set(metadata.pages), "later"), {""})
+        self.assertEqual(metadata.pages["index.html"].updated, "2024-01-01T00:00:00Z")
+
+    def test_round_trip(self):
+        metadata = site()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "pages.json"
+            _ = path.write_bytes(metadata.to_json())
+            self.assertEqual(SiteMetadata.load(path).to_json(), metadata.to_json())
+            self.assertEqual(SiteMetadata.load(Path(tmp) / "none").pages, {})
+
+    def test_published_from_source(self):
+        metadata = site()
+        added = {"blog/new.html": PageMetadata("blog", "New", "e", "", "2020-05-01")}
+        _ = metadata.update(added, {*metadata.pages, "blog/new.html"}, "later")
+        self.assertEqual(metadata.pages["blog/new.html"].published, "2020-05-01")
+        self.assertEqual(metadata.pages["blog/new.html"].updated, "later")
+
+    def test_load_without_published(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "pages.json"
+            data = '{"site_url": "", "sitemaps": 0, "pages": {"a.html": '
+            _ = path.write_text(data + '["", "A", "h", "2023-01-01T00:00:00Z"]}}')
+            page = SiteMetadata.load(path).pages["a.html"]
+        self.assertEqual(page.published, "2023-01-01T00:00:00Z")
+
+
+class TestSitemapAndFeeds(unittest.TestCase):
+    def test_sitemap_and_feeds(self):
+        output = MemoryOutput(Path("public"))
+        written = write_sitemap_and_feeds(site(), {"", "blog", "contact"}, "/", output)
+        self.assertEqual(
+            sorted(output.files),
+            ["blog/feed.xml", "contact/feed.xml", "feed.xml", "sitemap.xml"],
+        )
+        self.assertEqual(written, sum(map(len, output.files.values())))
+        urlset = ET.fromstring(output.files["sitemap.xml"])
+        self.assertEqual(
+            [loc.text for loc in urlset.iter(f"{{{SITEMAP_NS}}}loc")],
+            [
+                "https://example.com/blog/elves.html",
+                "https://example.com/blog/tom/",
+                "https://example.com/contact/",
+                "https://example.com/",
+            ],
+        )
+        feed = ET.fromstring(output.files["blog/feed.xml"])
+        self.assertEqual(feed.findtext(f"{{{ATOM_NS}}}id"), "https://example.com/blog/")
+        titles = [title.text for title in feed.iter(f"{{{ATOM_NS}}}title")]
+        self.assertEqual(titles, ["blog", "Elves & Men", "Tom"])
+        author = feed.find(f"{{{ATOM_NS}}}author/{{{ATOM_NS}}}name")
+        self.assertEqual(author.text if author is not None else None, "example.com")
+
+    def test_only_changed_sections(self):
+        output = MemoryOutput(Path("public"))
+        _ = write_sitemap_and_feeds(site(), {"blog"}, "/blog-site/", output)
+        self.assertEqual(sorted(output.files), ["blog/feed.xml", "sitemap.xml"])
+        self.assertIn(
+            b"https://example.com/blog-site/blog/", output.files["sitemap.xml"]
+        )
+        output = MemoryOutput(Path("public"))
+        self.assertEqual(write_sitemap_and_feeds(site(), set(), "/", output), 0)
+        self.assertEqual(output.files, {})
+
+    def test_sitemap_index(self):
+        saved = feeds.SITEMAP_URLS
+        feeds.SITEMAP_URLS = 3
+        try:
+            metadata = site()
+            output = MemoryOutput(Path("public"))
+            _ = write_sitemap_and_feeds(metadata, {"blog"}, "/", output)
+            self.assertEqual(metadata.sitemaps, 2)
+            index = ET.fromstring(output.files["sitemap.xml"])
+            self.assertEqual(
+                [loc.text for loc in index.iter(f"{{{SITEMAP_NS}}}loc")],
+                [
+                    "https://example.com/sitemap-1.xml",
+                    "https://example.com/sitemap-2.xml",
+                ],
+            )
+            part = ET.fromstring(output.files["sitemap-2.xml"])
+            self.assertEqual(len(list(part.iter(f"{{{SITEMAP_NS}}}url"))), 1)
+
+            # back under a single sitemap: the parts are removed
+            _ = metadata.update({}, {"index.html"}, "later")
+            _ = write_sitemap_and_feeds(metadata, {"blog"}, "/", output)
+            self.assertEqual(metadata.sitemaps, 0)
+            self.assertNotIn("sitemap-1.xml", output.files)
+            self.assertNotIn("blog/feed.xml", output.files)
+        finally:
+            feeds.SITEMAP_URLS = saved
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
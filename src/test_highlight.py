@@ -0,0 +1,99 @@
+import unittest
+
+from highlight import (
+    LEXERS,
+    Lexer,
+    Token,
+    get_lexer,
+    highlight,
+    lexers_version,
+    register_lexer,
+)
+
+
+class UpperLexer(Lexer):
+    calls: int
+
+    def __init__(self, version: str = "1"):
+        super().__init__("upper", aliases=("up",), version=version)
+        self.calls = 0
+
+    def tokenize(self, code: str) -> list[Token]:
+        self.calls += 1
+        return [("keyword", code.upper())]
+
+
+class TestHighlight(unittest.TestCase):
+    def tearDown(self):
+        for name in ("upper", "up"):
+            _ = LEXERS.pop(name, None)
+
+    def test_python(self):
+        code = 'def f():\n    return "x"  # done\n'
+        self.assertEqual(
+            highlight(code, "python"),
+            [
+                ("keyword", "def"),
+                (None, " f():\n    "),
+                ("keyword", "return"),
+                (None, " "),
+                ("string", '"x"'),
+                (None, "  "),
+                ("comment", "# done"),
+                (None, "\n"),
+            ],
+        )
+
+    def test_tokens_cover_the_code(self):
+        code = "const x = `a ${b}` // c\nlet y = 0x1f;\n"
+        self.assertEqual("".join(text for _, text in highlight(code, "js")), code)
+
+    def test_keyword_inside_string(self):
+        self.assertEqual(highlight("'if'", "sh"), [("string", "'if'")])
+
+    def test_unterminated_strings_end_with_the_line(self):
+        self.assertEqual(
+            highlight('x = "a\\"\ny', "python"),
+            [(None, "x = "), ("string", '"a\\"'), (None, "\ny")],
+        )
+        self.assertEqual(highlight("/* a\nb", "js"), [("comment", "/* a\nb")])
+        self.assertEqual(
+            highlight("${${a}", "sh"), [(None, "${"), ("variable", "${a}")]
+        )
+
+    def test_unknown_language(self):
+        self.assertEqual(highlight("fn main() {}", "rust"), [(None, "fn main() {}")])
+
+    def test_aliases_are_case_insensitive(self):
+        self.assertIs(get_lexer("Bash"), get_lexer("shell"))
+        self.assertIs(get_lexer("PY"), get_lexer("python"))
+
+    def test_register_lexer(self):
+        lexer = UpperLexer()
+        register_lexer(lexer)
+        self.assertEqual(highlight("abc", "up"), [("keyword", "ABC")])
+
+    def test_tokens_are_cached(self):
+        lexer = UpperLexer()
+        register_lexer(lexer)
+        _ = highlight("cached", "upper")
+        _ = highlight("cached", "up")
+        self.assertEqual(lexer.calls, 1)
+
+    def test_new_lexer_version_is_not_cached(self):
+        register_lexer(UpperLexer())
+        _ = highlight("versioned", "upper")
+        lexer = UpperLexer(version="2")
+        register_lexer(lexer)
+        _ = highlight("versioned", "upper")
+        self.assertEqual(lexer.calls, 1)
+
+    def test_lexers_version(self):
+        before = lexers_version()
+        register_lexer(UpperLexer(version="3"))
+        self.assertNotEqual(lexers_version(), before)
+        self.assertIn("up=upper:3", lexers_version())
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_attribute, escape_text
 from leafnode import LeafNode
 from parentnode import ParentNode
 
@@ -193,6 +193,33 @@ class TestHTMLNode(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             _ = node.to_html()
 
+    def test_props_to_html_escapes_values(self):
+        node = HTMLNode(props={"href": 'https://example.com/?a=1&b="2"'})
+        self.assertEqual(
+            node.props_to_html(), 'href="https://example.com/?a=1&amp;b=&quot;2&quot;"'
+        )
+
+
+class TestEscape(unittest.TestCase):
+    def test_escape_text_nothing_to_escape(self):
+        text = 'He said "hello"'
+        self.assertIs(escape_text(text), text)
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text("a < b && c > d"), "a &lt; b &amp;&amp; c &gt; d")
+
+    def test_escape_text_no_double_escape_of_replacements(self):
+        self.assertEqual(escape_text("<&>"), "&lt;&amp;&gt;")
+
+    def test_escape_attribute(self):
+        self.assertEqual(
+            escape_attribute('say "<hi>" & bye'), "say &quot;&lt;hi&gt;&quot; &amp; bye"
+        )
+
+    def test_escape_attribute_nothing_to_escape(self):
+        value = "https://boot.dev"
+        self.assertIs(escape_attribute(value), value)
+
 
 if __name__ == "__main__":
     _ = unittest.main()
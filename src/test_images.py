@@ -0,0 +1,153 @@
+# pyright: reportUninitializedInstanceVariable=false
+import io
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+from cache import BuildCache
+from images import (
+    annotate_images,
+    data_uri,
+    image_size,
+    inline_images,
+    inlined_bytes,
+    static_data_uris,
+    static_image_sizes,
+)
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+PNG = b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", 640, 480) + bytes(64)
+GIF = b"GIF89a" + struct.pack("<HH", 32, 16) + bytes(64)
+WEBP_LOSSY = b"RIFF\0\0\0\0WEBPVP8 \0\0\0\0\0\0\0\x9d\x01\x2a" + struct.pack(
+    "<HH", 300, 200
+)
+WEBP_LOSSLESS = (
+    b"RIFF\0\0\0\0WEBPVP8L\0\0\0\0\x2f"
+    + ((300 - 1) | (200 - 1) << 14).to_bytes(4, "little")
+    + bytes(8)
+)
+WEBP_EXTENDED = (
+    b"RIFF\0\0\0\0WEBPVP8X\0\0\0\0\0\0\0\0"
+    + (300 - 1).to_bytes(3, "little")
+    + (200 - 1).to_bytes(3, "little")
+)
+
+
+def jpeg(padding: int) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", padding + 2) + bytes(padding)
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, 480, 640, 1) + bytes(3)
+    return b"\xff\xd8" + app0 + sof + b"\xff\xd9"
+
+
+class TestImageSize(unittest.TestCase):
+    def test_png(self):
+        self.assertEqual(image_size(io.BytesIO(PNG)), (640, 480))
+
+    def test_gif(self):
+        self.assertEqual(image_size(io.BytesIO(GIF)), (32, 16))
+
+    def test_webp(self):
+        for data in (WEBP_LOSSY, WEBP_LOSSLESS, WEBP_EXTENDED):
+            self.assertEqual(image_size(io.BytesIO(data)), (300, 200))
+
+    def test_jpeg(self):
+        self.assertEqual(image_size(io.BytesIO(jpeg(16))), (640, 480))
+
+    def test_jpeg_seeks_over_segments(self):
+        file = io.BytesIO(jpeg(60000) + bytes(1_000_000))
+        self.assertEqual(image_size(file), (640, 480))
+        self.assertLess(file.tell(), 60100)
+
+    def test_truncated_or_unknown(self):
+        self.assertIsNone(image_size(io.BytesIO(PNG[:20])))
+        self.assertIsNone(image_size(io.BytesIO(jpeg(16)[:30])))
+        self.assertIsNone(image_size(io.BytesIO(b"<svg></svg>")))
+
+
+class TestAnnotateImages(unittest.TestCase):
+    def test_annotate(self):
+        node = ParentNode(
+            "p",
+            [
+                LeafNode("img", "known", {"src": "/a.png"}),
+                LeafNode("img", "unknown", {"src": "/b.png"}),
+            ],
+        )
+        annotate_images(node, {"/a.png": (640, 480)})
+        self.assertEqual(
+            node.to_html(),
+            '<p><img alt="known" src="/a.png" width="640" height="480" '
+            + 'loading="lazy" decoding="async" />'
+            + '<img alt="unknown" src="/b.png" loading="lazy" decoding="async" /></p>',
+        )
+
+
+class TestInlineImages(unittest.TestCase):
+    def test_data_uri(self):
+        self.assertEqual(
+            data_uri(b"<svg/>", "dot.svg"), "data:image/svg+xml;base64,PHN2Zy8+"
+        )
+        self.assertEqual(
+            data_uri(b"?", "dot"), "data:application/octet-stream;base64,Pw=="
+        )
+
+    def test_inline(self):
+        uris = {"/dot.svg": "data:image/svg+xml;base64,PHN2Zy8+"}
+        node = ParentNode(
+            "p",
+            [
+                LeafNode("img", "dot", {"src": "/dot.svg"}),
+                LeafNode("img", "large", {"src": "/large.png"}),
+            ],
+        )
+        inline_images(node, uris)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<p><img alt="dot" src="data:image/svg+xml;base64,PHN2Zy8+" />'
+            + '<img alt="large" src="/large.png" /></p>',
+        )
+        self.assertEqual(inlined_bytes(html * 2, uris), 2 * len(uris["/dot.svg"]))
+        self.assertEqual(inlined_bytes(html, {}), 0)
+
+
+class TestStaticImages(unittest.TestCase):
+    tmpdir: tempfile.TemporaryDirectory[str]
+    static: Path
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.static = Path(self.tmpdir.name) / "static"
+        (self.static / "images").mkdir(parents=True)
+        _ = (self.static / "images" / "tom.png").write_bytes(b"png")
+        _ = (self.static / "robots.txt").write_text("")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_static_image_sizes(self):
+        png = b"\x89PNG\r\n\x1a\n\0\0\0\x0dIHDR\0\0\0\x02\0\0\0\x03"
+        _ = (self.static / "images" / "tom.png").write_bytes(png)
+        cache = BuildCache(Path(self.tmpdir.name) / "cache")
+        expected = {"/images/tom.png": (2, 3)}
+        self.assertEqual(static_image_sizes(self.static, cache), expected)
+        self.assertEqual(static_image_sizes(self.static, cache), expected)
+        self.assertEqual(cache.hits["image"], 1)
+
+    def test_static_data_uris(self):
+        _ = (self.static / "images" / "large.png").write_bytes(bytes(100))
+        cache = BuildCache(Path(self.tmpdir.name) / "cache")
+        expected = {"/images/tom.png": "data:image/png;base64,cG5n"}
+        self.assertEqual(static_data_uris(self.static, 99, cache), expected)
+        # a copy is encoded once
+        _ = (self.static / "copy.png").write_bytes(b"png")
+        uris = static_data_uris(self.static, 99, cache)
+        self.assertEqual(uris["/copy.png"], expected["/images/tom.png"])
+        self.assertEqual(cache.hits["inline"], 2)
+        self.assertEqual(cache.misses["inline"], 1)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
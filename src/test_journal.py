@@ -0,0 +1,114 @@
+# pyright: reportUninitializedInstanceVariable=false
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+import journal
+from journal import Journal, hash_file, input_hash, is_complete
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.path = self.root / "public.journal"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_record_and_resume(self):
+        with Journal(self.path) as journal:
+            journal.record("public/index.html", "in", "out")
+
+        with Journal(self.path, resume=True) as resumed:
+            self.assertEqual(resumed.entries, {"public/index.html": ("in", "out")})
+
+    def test_new_build_truncates(self):
+        with Journal(self.path) as journal:
+            journal.record("public/index.html", "in", "out")
+
+        with Journal(self.path):
+            pass
+        self.assertEqual(Journal.load(self.path), {})
+
+    def test_checkpoint_flushes_to_disk(self):
+        with Journal(self.path) as journal:
+            journal.record("public/index.html", "in", "out")
+            journal.checkpoint()
+            self.assertIn("public/index.html", Journal.load(self.path))
+
+    def test_torn_last_line_is_ignored(self):
+        _ = self.path.write_text(
+            '{"dest": "a.html", "input": "in", "output": "out"}\n{"dest": "b.ht'
+        )
+        self.assertEqual(Journal.load(self.path), {"a.html": ("in", "out")})
+
+    def test_resume_after_torn_last_line(self):
+        _ = self.path.write_text(
+            '{"dest": "a.html", "input": "in", "output": "out"}\n{"dest": "b.ht'
+        )
+        with Journal(self.path, resume=True) as journal:
+            journal.record("c.html", "in", "out")
+        self.assertEqual(
+            Journal.load(self.path), {"a.html": ("in", "out"), "c.html": ("in", "out")}
+        )
+
+    def test_missing_journal(self):
+        self.assertEqual(Journal.load(self.path), {})
+
+
+class TestIsComplete(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dest = Path(self.tmpdir.name) / "index.html"
+        _ = self.dest.write_bytes(b"<p>done</p>")
+        self.output = hashlib.sha256(b"<p>done</p>").hexdigest()
+        self.input = input_hash("# done", "{{ Content }}", "/")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.dest), self.output)
+        self.assertIsNone(hash_file(self.dest.with_name("missing.html")))
+
+    def test_complete(self):
+        self.assertTrue(is_complete(self.dest, self.input, (self.input, self.output)))
+
+    def test_not_journaled(self):
+        self.assertFalse(is_complete(self.dest, self.input, None))
+
+    def test_inputs_changed(self):
+        changed = input_hash("# changed", "{{ Content }}", "/")
+        self.assertFalse(is_complete(self.dest, changed, (self.input, self.output)))
+
+    def test_generator_changed(self):
+        saved = journal.GENERATOR_VERSION
+        journal.GENERATOR_VERSION = "0"
+        try:
+            changed = input_hash("# done", "{{ Content }}", "/")
+        finally:
+            journal.GENERATOR_VERSION = saved
+        self.assertFalse(is_complete(self.dest, changed, (self.input, self.output)))
+
+    def test_lexers_changed(self):
+        saved = journal.lexers_version
+        journal.lexers_version = lambda: "python=Python:0"
+        try:
+            changed = input_hash("# done", "{{ Content }}", "/")
+        finally:
+            journal.lexers_version = saved
+        self.assertFalse(is_complete(self.dest, changed, (self.input, self.output)))
+
+    def test_output_incomplete(self):
+        _ = self.dest.write_bytes(b"<p>do")
+        self.assertFalse(is_complete(self.dest, self.input, (self.input, self.output)))
+
+    def test_output_missing(self):
+        self.dest.unlink()
+        self.assertFalse(is_complete(self.dest, self.input, (self.input, self.output)))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
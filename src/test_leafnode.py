@@ -90,6 +90,32 @@ class TestLeafNode(unittest.TestCase):
         expected = "<span>Inline text</span>"
         self.assertEqual(node.to_html(), expected)
 
+    def test_to_html_escapes_value(self):
+        node = LeafNode("p", "1 < 2 & 3 > 2")
+        self.assertEqual(node.to_html(), "<p>1 &lt; 2 &amp; 3 &gt; 2</p>")
+
+    def test_to_html_escapes_raw_text(self):
+        node = LeafNode(None, "<script>")
+        self.assertEqual(node.to_html(), "&lt;script&gt;")
+
+    def test_to_html_escapes_img_alt(self):
+        node = LeafNode("img", 'a "quoted" alt', {"src": "/tom.png"})
+        self.assertEqual(
+            node.to_html(), '<img alt="a &quot;quoted&quot; alt" src="/tom.png" />'
+        )
+
+    def test_to_html_minified(self):
+        node = LeafNode("a", "a  link\n", {"href": "/tom", "title": "Tom B"})
+        self.assertEqual(node.to_html(True), '<a href=/tom title="Tom B">a link </a>')
+
+    def test_to_html_minified_keeps_code(self):
+        node = LeafNode("code", "a  b")
+        self.assertEqual(node.to_html(True), "<code>a  b</code>")
+
+    def test_to_html_minified_img(self):
+        node = LeafNode("img", "Tom", {"src": "/tom.png"})
+        self.assertEqual(node.to_html(True), "<img alt=Tom src=/tom.png>")
+
 
 if __name__ == "__main__":
     _ = unittest.main()
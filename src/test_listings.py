@@ -0,0 +1,93 @@
+import unittest
+from pathlib import Path
+
+from feeds import PageMetadata, SiteMetadata
+from listings import listing_pages, listings, write_listings
+from output import MemoryOutput
+
+
+def site(posts: int) -> SiteMetadata:
+    metadata = SiteMetadata()
+    for i in range(posts):
+        metadata.pages[f"blog/{i}.html"] = PageMetadata(
+            "blog", f"Post <{i}>", str(i), f"{2023 + i // 3}-01-0{1 + i % 3}T00:00:00Z"
+        )
+    metadata.pages["index.html"] = PageMetadata("", "Home", "h", "2023-01-01T00:00:00Z")
+    return metadata
+
+
+def render(title: str, content: str) -> str:
+    return f"<title>{title}</title>{content}"
+
+
+class TestListings(unittest.TestCase):
+    def test_sections_and_years_oldest_first(self):
+        self.assertEqual(
+            listings(site(4)),
+            {
+                "archive/2023": [
+                    "blog/0.html",
+                    "index.html",
+                    "blog/1.html",
+                    "blog/2.html",
+                ],
+                "archive/2024": ["blog/3.html"],
+                "blog": ["blog/0.html", "blog/1.html", "blog/2.html", "blog/3.html"],
+            },
+        )
+
+    def test_pagination(self):
+        pages = {name: content for name, _, content in listing_pages(site(5), 2)}
+        self.assertEqual(
+            pages["blog/page/2/index.html"],
+            "<h1>blog (2)</h1><ul>"
+            '<li><a href="/blog/2.html">Post &lt;2&gt;</a></li>'
+            '<li><a href="/blog/3.html">Post &lt;3&gt;</a></li></ul>'
+            '<nav class="pagination"><a rel="prev" href="/blog/page/1/">Previous</a> '
+            '<a rel="next" href="/blog/page/3/">Next</a></nav>',
+        )
+        self.assertNotIn('rel="next"', pages["blog/page/3/index.html"])
+        self.assertNotIn("pagination", pages["archive/2024/page/1/index.html"])
+
+    def test_only_shifted_pages_are_written(self):
+        metadata = site(5)
+        output = MemoryOutput(Path("public"))
+        _ = write_listings(metadata, 2, render, output)
+        self.assertIn(
+            "<title>blog (2)</title>", output.files["blog/page/2/index.html"].decode()
+        )
+
+        metadata.pages["blog/9.html"] = PageMetadata("blog", "New", "9", "2024-02-01")
+        output = MemoryOutput(Path("public"))
+        _ = write_listings(metadata, 2, render, output)
+        self.assertEqual(
+            sorted(output.files),
+            [
+                "archive/2024/page/1/index.html",  # now links to the next page
+                "archive/2024/page/2/index.html",
+                "blog/page/3/index.html",
+            ],
+        )
+
+        del metadata.pages["blog/9.html"], metadata.pages["blog/4.html"]
+        output = MemoryOutput(Path("public"))
+        output.files["blog/page/3/index.html"] = b""
+        _ = write_listings(metadata, 2, render, output)
+        self.assertEqual(
+            sorted(output.files),
+            ["archive/2024/page/1/index.html", "blog/page/2/index.html"],
+        )
+
+    def test_edited_page_keeps_its_place(self):
+        metadata = site(4)
+        _ = metadata.update(
+            {"blog/0.html": PageMetadata("blog", "Post <0>", "edited", "")},
+            set(metadata.pages),
+            "2025-06-01T00:00:00Z",
+        )
+        self.assertEqual(metadata.pages["blog/0.html"].updated, "2025-06-01T00:00:00Z")
+        self.assertEqual(listings(metadata), listings(site(4)))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,257 @@
+# pyright: reportUninitializedInstanceVariable=false
+import tempfile
+import unittest
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from cache import BuildCache
+from config import BuildConfig
+from corpus import ADVERSARIAL
+from main import (
+    generate_pages,
+    render_markdown,
+    render_page,
+)
+from markdown import markdown_to_html_node
+from options import RenderOptions
+from output import MemoryOutput
+from report import BuildReport
+from sources import ZipSource
+
+MARKDOWN = """\
+# Title
+
+This is **bold** and _italic_ with `code` and a [link](https://boot.dev).
+
+```
+def hello():
+    print("hello")
+```
+
+> a quote
+
+- one
+- two
+
+1. first
+2. second
+
+![image](/images/tom.png)
+"""
+
+
+class TestRenderMarkdown(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.expected = markdown_to_html_node(MARKDOWN * 20).to_html()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sequential(self):
+        self.assertEqual(render_markdown(MARKDOWN * 20), self.expected)
+
+    def test_cached_blocks(self):
+        cache = BuildCache(Path(self.tmpdir.name))
+        self.assertEqual(render_markdown(MARKDOWN * 20, cache), self.expected)
+        misses = cache.misses["block"]
+        self.assertEqual(render_markdown(MARKDOWN * 20, cache), self.expected)
+        self.assertEqual(cache.misses["block"], misses)
+
+    def test_parallel_chunks_are_byte_identical(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            html = render_markdown(MARKDOWN * 20, executor=executor, chunks=8)
+        self.assertEqual(html, self.expected)
+
+    def test_parallel_chunks_with_cache(self):
+        cache = BuildCache(Path(self.tmpdir.name))
+        _ = render_markdown(MARKDOWN, cache)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            html = render_markdown(MARKDOWN * 20 + "last", cache, executor, 8)
+        self.assertEqual(html, markdown_to_html_node(MARKDOWN * 20 + "last").to_html())
+
+    def test_minified_blocks_omit_end_tags(self):
+        html = render_markdown("para one\n\npara two", options=RenderOptions(True))
+        self.assertEqual(html, "<div><p>para one<p>para two</div>")
+
+    def test_minified_cached_blocks(self):
+        cache = BuildCache(Path(self.tmpdir.name))
+        minify = RenderOptions(True)
+        expected = markdown_to_html_node(MARKDOWN * 20).to_html(True)
+        self.assertNotEqual(render_markdown(MARKDOWN * 20, cache), expected)
+        self.assertEqual(
+            render_markdown(MARKDOWN * 20, cache, options=minify), expected
+        )
+
+    def test_cached_blocks_keyed_on_referenced_assets(self):
+        cache = BuildCache(Path(self.tmpdir.name))
+        markdown = "![tom](/tom.png)\n\n[home](/)\n\nplain"
+        assets = {"/tom.png": "/tom.01.png"}
+        _ = render_markdown(markdown, cache, options=RenderOptions(assets=assets))
+
+        cache.misses.clear()
+        assets["/other.png"] = "/other.01.png"
+        _ = render_markdown(markdown, cache, options=RenderOptions(assets=assets))
+        self.assertEqual(cache.misses["block"], 0)
+
+        assets["/tom.png"] = "/tom.02.png"
+        html = render_markdown(markdown, cache, options=RenderOptions(assets=assets))
+        self.assertEqual(cache.misses["block"], 1)
+        self.assertIn('src="/tom.02.png"', html)
+
+    def test_cached_blocks_keyed_on_referenced_images(self):
+        cache = BuildCache(Path(self.tmpdir.name))
+        markdown = "![tom](/tom.png)\n\nplain"
+        images = {"/tom.png": (10, 20)}
+        _ = render_markdown(markdown, cache, options=RenderOptions(images=images))
+
+        cache.misses.clear()
+        images["/other.png"] = (30, 40)
+        _ = render_markdown(markdown, cache, options=RenderOptions(images=images))
+        self.assertEqual(cache.misses["block"], 0)
+
+        images["/tom.png"] = (20, 40)
+        html = render_markdown(markdown, cache, options=RenderOptions(images=images))
+        self.assertEqual(cache.misses["block"], 1)
+        self.assertIn('width="20" height="40"', html)
+
+    def test_cached_blocks_keyed_on_referenced_data_uris(self):
+        cache = BuildCache(Path(self.tmpdir.name))
+        markdown = "![dot](/dot.svg)\n\nplain"
+        inline = {"/dot.svg": "data:image/svg+xml;base64,PHN2Zy8+"}
+        _ = render_markdown(markdown, cache, options=RenderOptions(inline=inline))
+
+        cache.misses.clear()
+        inline["/other.svg"] = "data:image/svg+xml;base64,PHN2Zz4="
+        _ = render_markdown(markdown, cache, options=RenderOptions(inline=inline))
+        self.assertEqual(cache.misses["block"], 0)
+
+
+class TestRenderPage(unittest.TestCase):
+    template = """\
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>{{ Content }}</body>
+</html>
+"""
+
+    def test_render_page(self):
+        html = render_page("# Hi\n\n[home](/)", self.template, "/site/")
+        self.assertIn('<link href="/site/index.css"', html)
+        self.assertIn('<a href="/site/">home</a>', html)
+
+    def test_render_page_basepath(self):
+        template = '<script src="/search.js" data-root="{{ Basepath }}"></script>'
+        self.assertEqual(
+            render_page("# Hi", template, "/site/"),
+            '<script src="/site/search.js" data-root="/site/"></script>',
+        )
+
+    def test_render_page_search_script(self):
+        template = "<head>{{ Search }}</head>"
+        options = RenderOptions(assets={"/search.js": "/search.01.js"}, search=True)
+        self.assertEqual(
+            render_page("# Hi", template, "/site/", options=options),
+            '<head><script src="/site/search.01.js" data-root="/site/" defer>'
+            + "</script></head>",
+        )
+        self.assertEqual(render_page("# Hi", template, "/"), "<head></head>")
+
+    def test_render_page_escapes_title(self):
+        template = "<title>{{ Title }}</title>{{ Content }}"
+        self.assertEqual(
+            render_page("# Tom & <Jerry>", template, "/"),
+            "<title>Tom &amp; &lt;Jerry&gt;</title>"
+            + "<div><h1>Tom &amp; &lt;Jerry&gt;</h1></div>",
+        )
+
+    def test_render_page_minified(self):
+        html = render_page(
+            "# Hi\n\n[home](/)", self.template, "/site/", options=RenderOptions(True)
+        )
+        self.assertEqual(
+            html,
+            '<html><head><title>Hi</title><link href="/site/index.css" '
+            + 'rel="stylesheet" /></head><body><div><h1>Hi</h1><p>'
+            + "<a href=/site/>home</a></div></body></html>",
+        )
+
+    def test_render_page_fingerprinted_assets(self):
+        options = RenderOptions(
+            assets={"/index.css": "/index.01.css", "/tom.png": "/tom.02.png"}
+        )
+        html = render_page(
+            "# Hi\n\n![tom](/tom.png)", self.template, "/", options=options
+        )
+        self.assertIn('<link href="/index.01.css"', html)
+        self.assertIn('<img alt="tom" src="/tom.02.png" />', html)
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = Path(self.tmpdir.name)
+        self.template = root / "template.html"
+        _ = self.template.write_text("<title>{{ Title }}</title>{{ Content }}")
+        self.pages: dict[Path, Path] = {}
+        for name in ("c", "a", "b"):
+            source = root / f"{name}.md"
+            _ = source.write_text(f"# {name}")
+            self.pages[source] = Path("public") / f"{name}.html"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_memory_output(self):
+        for jobs in (1, 2):
+            output = MemoryOutput(Path("public"))
+            config = BuildConfig({}, self.template, jobs=jobs)
+            generate_pages(
+                config, self.pages, output=output, report=BuildReport(quiet=True)
+            )
+            self.assertEqual(list(output.files), ["a.html", "b.html", "c.html"])
+            self.assertEqual(
+                output.files["a.html"], b"<title>a</title><div><h1>a</h1></div>"
+            )
+
+    def test_archive_source(self):
+        archive = Path(self.tmpdir.name) / "content.zip"
+        with zipfile.ZipFile(archive, "w") as file:
+            file.writestr("a.md", "# a")
+            file.writestr("blog/b.md", "# b")
+        source = ZipSource(archive)
+        for jobs in (1, 2):  # workers get the pages read by the parent
+            output = MemoryOutput(Path("public"))
+            generate_pages(
+                BuildConfig(source, self.template, jobs=jobs),
+                source.pages(Path("public")),
+                output=output,
+                source=source,
+                report=BuildReport(quiet=True),
+            )
+            self.assertEqual(list(output.files), ["a.html", "blog/b.html"])
+            self.assertEqual(
+                output.files["blog/b.html"], b"<title>b</title><div><h1>b</h1></div>"
+            )
+
+    def test_page_budget(self):
+        slow = Path(self.tmpdir.name) / "slow.md"
+        _ = slow.write_text("# slow\n\n" + ADVERSARIAL["code spans"](20_000))
+        self.pages[slow] = Path("public") / "slow.html"
+        output = MemoryOutput(Path("public"))
+        report = BuildReport(quiet=True)
+        config = BuildConfig({}, self.template, page_budget=0.001)
+        generate_pages(config, self.pages, output=output, report=report)
+        self.assertEqual(list(output.files), ["a.html", "b.html", "c.html"])
+        self.assertEqual(
+            [page.error for page in report.errors],
+            ["rendering took longer than the 0.001s time budget"],
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
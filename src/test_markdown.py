@@ -1,5 +1,7 @@
 import unittest
 
+import textnode
+from compiled import is_compiled
 from leafnode import LeafNode
 from markdown import (
     BlockType,
@@ -17,8 +19,10 @@ from markdown import (
     markdown_to_html_node,
     split_nodes_delimiter,
     split_nodes_image,
+    split_blocks,
     split_nodes_link,
     textnode_to_htmlnode,
+    text_to_spans,
     text_to_textnodes,
 )
 from textnode import TextNode, TextType
@@ -65,6 +69,7 @@ class TestTextNodeToHtmlNode(unittest.TestCase):
         )
         self.assertEqual(tested, expected)
 
+    @unittest.skipIf(is_compiled(textnode), "compiled nodes check their types")
     def test_invalid_text_type(self):
         # Create a TextNode with an invalid TextType (not part of the enum)
         class InvalidTextType:
@@ -747,6 +752,10 @@ test2
         expected = BlockType.PARAGRAPH
         self.assertEqual(result, expected)
 
+    def test_code_block_with_info_string(self):
+        markdown = "```python\nprint(1)\n```"
+        self.assertEqual(block_to_block_type(markdown), BlockType.CODE)
+
     def test_partial_code_block(self):
         markdown = """\
 ```
@@ -822,6 +831,28 @@ def world():
         expected = '<pre><code>def hello():\n    print("hello")\n\ndef world():\n    print("world")\n</code></pre>'
         self.assertEqual(result.to_html(), expected)
 
+    def test_block_to_html_code_node_highlighted(self):
+        markdown = """\
+```python
+def hello():
+    return 1
+```
+"""
+        result = block_to_html_code_node(markdown)
+        expected = (
+            '<pre><code class="language-python">'
+            '<span class="tok-keyword">def</span> hello():\n    '
+            '<span class="tok-keyword">return</span> '
+            '<span class="tok-number">1</span>\n</code></pre>'
+        )
+        self.assertEqual(result.to_html(), expected)
+
+    def test_block_to_html_code_node_unknown_language(self):
+        markdown = "```brainfuck extra words\n+[<>]\n```"
+        result = block_to_html_code_node(markdown)
+        expected = '<pre><code class="language-brainfuck">+[&lt;&gt;]\n</code></pre>'
+        self.assertEqual(result.to_html(), expected)
+
     def test_block_to_html_code_node_dont_inline(self):
         markdown = """\
 ```
@@ -1119,5 +1150,107 @@ the **same** even with inline stuff
         )
 
 
+class TestEscaping(unittest.TestCase):
+    def test_code_block_is_escaped(self):
+        md = """
+```
+if a < b && b > c:
+    print("<p>")
+```
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><pre><code>if a &lt; b &amp;&amp; b &gt; c:\n    print("&lt;p&gt;")\n'
+            "</code></pre></div>",
+        )
+
+    def test_paragraph_is_escaped(self):
+        md = "[< Back Home](/) and `<b>` & **<i>**"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p><a href="/">&lt; Back Home</a> and <code>&lt;b&gt;</code> '
+            "&amp; <b>&lt;i&gt;</b></p></div>",
+        )
+
+    def test_url_with_quote_is_escaped(self):
+        md = '[link](https://example.com/"onclick=")'
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p><a href="https://example.com/&quot;onclick=&quot;">link</a>'
+            "</p></div>",
+        )
+
+
+class TestTextToSpans(unittest.TestCase):
+    def test_offsets_into_text(self):
+        text = "This is **text** with a [link](https://boot.dev)"
+        spans = text_to_spans(text)
+        self.assertTrue(all(span.source is text for span in spans))
+        self.assertEqual(
+            [span.to_textnode() for span in spans],
+            [
+                TextNode("This is ", TextType.TEXT),
+                TextNode("text", TextType.BOLD),
+                TextNode(" with a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://boot.dev"),
+            ],
+        )
+
+    def test_same_as_textnodes(self):
+        text = (
+            "**bold** _italic_ `code **not bold**` "
+            "![image](https://i.imgur.com/fJRm4Vk.jpeg) [link](https://boot.dev) end"
+        )
+        self.assertEqual(
+            [span.to_textnode() for span in text_to_spans(text)],
+            split_nodes_link(
+                split_nodes_image(
+                    split_nodes_delimiter(
+                        split_nodes_delimiter(
+                            split_nodes_delimiter(
+                                [TextNode(text, TextType.TEXT)], "`", TextType.CODE
+                            ),
+                            "**",
+                            TextType.BOLD,
+                        ),
+                        "_",
+                        TextType.ITALIC,
+                    )
+                )
+            ),
+        )
+
+    def test_invalid_markdown(self):
+        with self.assertRaises(Exception) as context:
+            _ = text_to_spans("some `code")
+        self.assertIn("Invalid Markdown syntax: some `code", str(context.exception))
+
+    def test_image_is_not_a_link(self):
+        [span] = text_to_spans("![alt](/tom.png)")
+        self.assertEqual(span.text_type, TextType.IMAGE)
+
+
+class TestSplitBlocks(unittest.TestCase):
+    def test_keeps_blocks_in_order(self):
+        blocks = [f"paragraph {i}" for i in range(10)]
+        groups = split_blocks(blocks, 3)
+        self.assertEqual([block for group in groups for block in group], blocks)
+        self.assertEqual(len(groups), 3)
+
+    def test_single_chunk(self):
+        blocks = ["a", "b", "c"]
+        self.assertEqual(split_blocks(blocks, 1), [blocks])
+
+    def test_empty(self):
+        self.assertEqual(split_blocks([], 4), [])
+
+    def test_never_splits_inside_a_fence(self):
+        # the blank line inside the fence makes it span two blocks
+        blocks = ["```\ndef f():", "    pass\n```", "text", "more text"]
+        groups = split_blocks(blocks, 4)
+        self.assertEqual(groups[0], ["```\ndef f():", "    pass\n```"])
+        self.assertEqual([block for group in groups for block in group], blocks)
+
+
 if __name__ == "__main__":
     _ = unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from minify import (
+    collapse_whitespace,
+    end_tag_optional,
+    join_children,
+    minify_template,
+    quote_attribute,
+    start_tag,
+)
+
+
+class TestMinify(unittest.TestCase):
+    def test_collapse_whitespace(self):
+        self.assertEqual(collapse_whitespace("a \n\t b"), "a b")
+        self.assertEqual(collapse_whitespace(" a "), " a ")
+        self.assertEqual(collapse_whitespace("a\xa0\xa0b"), "a\xa0\xa0b")
+
+    def test_quote_attribute(self):
+        self.assertEqual(quote_attribute("/images/tom.png"), "/images/tom.png")
+        self.assertEqual(quote_attribute("two words"), '"two words"')
+        self.assertEqual(quote_attribute("a=b"), '"a=b"')
+        self.assertEqual(quote_attribute(""), '""')
+
+    def test_start_tag(self):
+        self.assertEqual(start_tag("<h2>Title</h2>"), "h2")
+        self.assertEqual(start_tag('<UL class="x">'), "ul")
+        self.assertIsNone(start_tag("text"))
+
+    def test_end_tag_optional(self):
+        self.assertTrue(end_tag_optional("li", "li", "ul"))
+        self.assertTrue(end_tag_optional("li", None, "ol"))
+        self.assertTrue(end_tag_optional("p", "h1", "div"))
+        self.assertTrue(end_tag_optional("p", None, "div"))
+        self.assertFalse(end_tag_optional("p", None, "a"))
+        self.assertFalse(end_tag_optional("p", "span", "div"))
+        self.assertFalse(end_tag_optional("b", None, "p"))
+
+    def test_join_children(self):
+        children: list[tuple[str | None, str]] = [
+            ("p", "<p>a</p>"),
+            ("p", "<p>b</p>"),
+            (None, "c"),
+        ]
+        self.assertEqual(join_children("div", children), "<p>a<p>b</p>c")
+
+
+class TestMinifyTemplate(unittest.TestCase):
+    def test_strip_indentation(self):
+        template = "<html>\n  <body>\n    <p>a  b</p>\n  </body>\n</html>\n"
+        self.assertEqual(
+            minify_template(template), "<html><body><p>a b</p></body></html>"
+        )
+
+    def test_keep_inline_space(self):
+        template = "<p><b>a</b> <i>b</i></p>"
+        self.assertEqual(minify_template(template), template)
+
+    def test_keep_preserved_elements(self):
+        template = "<div>\n  <pre>\n  a\n  </pre>\n  <script>x  =  1</script>\n</div>"
+        self.assertEqual(
+            minify_template(template),
+            "<div><pre>\n  a\n  </pre><script>x  =  1</script></div>",
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
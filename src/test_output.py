@@ -0,0 +1,114 @@
+# pyright: reportUninitializedInstanceVariable=false
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from output import (
+    DirectoryOutput,
+    MemoryOutput,
+    OrderedWriter,
+    TarOutput,
+    ZipOutput,
+    open_output,
+    page_url,
+)
+
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.src = self.root / "index.css"
+        _ = self.src.write_text("body {}")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_directory(self):
+        output = DirectoryOutput(self.root / "public")
+        output.write(self.root / "public/blog/a/index.html", b"<p>a</p>")
+        output.copy(self.src, self.root / "public/index.css")
+        self.assertEqual(
+            (self.root / "public/blog/a/index.html").read_bytes(), b"<p>a</p>"
+        )
+        self.assertEqual((self.root / "public/index.css").read_text(), "body {}")
+
+        output.remove(self.root / "public/blog/a/index.html")
+        self.assertFalse((self.root / "public/blog").exists())
+
+    def test_memory(self):
+        output = MemoryOutput(Path("public"))
+        output.write(Path("public/index.html"), b"<p>a</p>")
+        output.copy(self.src, Path("public/index.css"))
+        self.assertEqual(
+            output.files, {"index.html": b"<p>a</p>", "index.css": b"body {}"}
+        )
+        output.remove(Path("public/index.html"))
+        self.assertEqual(list(output.files), ["index.css"])
+
+    def write_archive(self, output: TarOutput | ZipOutput):
+        output.write(output.path("index.html"), b"<p>a</p>")
+        output.copy(self.src, output.path("index.css"))
+        output.close()
+
+    def test_tar_is_reproducible(self):
+        for name in ("a.tar.gz", "b.tar.gz"):
+            self.write_archive(TarOutput(self.root / name, "gz"))
+        data = (self.root / "a.tar.gz").read_bytes()
+        self.assertEqual(data, (self.root / "b.tar.gz").read_bytes())
+
+        with tarfile.open(self.root / "a.tar.gz") as tar:
+            self.assertEqual(tar.getnames(), ["index.html", "index.css"])
+            member = tar.extractfile("index.css")
+            assert member is not None
+            self.assertEqual(member.read(), b"body {}")
+
+    def test_zip(self):
+        self.write_archive(ZipOutput(self.root / "site.zip"))
+        with zipfile.ZipFile(self.root / "site.zip") as archive:
+            self.assertEqual(archive.namelist(), ["index.html", "index.css"])
+            self.assertEqual(archive.read("index.html"), b"<p>a</p>")
+
+    def test_abort(self):
+        output = TarOutput(self.root / "site.tar")
+        output.write(output.path("index.html"), b"<p>a</p>")
+        output.abort()
+        self.assertEqual(
+            sorted(path.name for path in self.root.iterdir()), ["index.css"]
+        )
+
+    def test_open_output(self):
+        self.assertIsInstance(open_output(str(self.root / "public")), DirectoryOutput)
+        for name in ("site.zip", "site.tgz", "site.tar.xz"):
+            output = open_output(str(self.root / name))
+            self.assertIsInstance(
+                output, ZipOutput if name.endswith("zip") else TarOutput
+            )
+            output.abort()
+
+
+class TestPageUrl(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("blog/tom/index.html"), "/blog/tom/")
+        self.assertEqual(page_url("blog/tom.html"), "/blog/tom.html")
+
+
+class TestOrderedWriter(unittest.TestCase):
+    def test_write_in_path_order(self):
+        output = MemoryOutput(Path("public"))
+        paths = [Path("public/b.html"), Path("public/a.html"), Path("public/c.html")]
+        writer = OrderedWriter(output, paths)
+
+        writer.add(Path("public/b.html"), {"b.html": b"b"})
+        self.assertEqual(output.files, {})
+        writer.add(Path("public/a.html"), {"a.html": b"a"})
+        self.assertEqual(list(output.files), ["a.html", "b.html"])
+        writer.add(Path("public/c.html"), {})
+        self.assertEqual(list(output.files), ["a.html", "b.html"])
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -108,6 +108,31 @@ class TestParentNode(unittest.TestCase):
             _ = node.to_html()
         self.assertEqual(str(context.exception), "children is required!")
 
+    def test_to_html_minified_omits_optional_end_tags(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("ul", [LeafNode("li", "one"), LeafNode("li", "two")]),
+                ParentNode("p", [LeafNode(None, "a\n  paragraph")]),
+                ParentNode("p", [LeafNode(None, "last")]),
+            ],
+        )
+        self.assertEqual(
+            node.to_html(True),
+            "<div><ul><li>one<li>two</ul><p>a paragraph<p>last</div>",
+        )
+
+    def test_to_html_minified_keeps_end_tag_before_text(self):
+        node = ParentNode("a", [LeafNode("p", "text"), LeafNode(None, "more")])
+        self.assertEqual(node.to_html(True), "<a><p>text</p>more</a>")
+
+    def test_to_html_minified_keeps_pre(self):
+        code = ParentNode("code", [LeafNode("span", "if  x:\n"), LeafNode(None, "  y")])
+        node = ParentNode("pre", [code])
+        self.assertEqual(
+            node.to_html(True), "<pre><code><span>if  x:\n</span>  y</code></pre>"
+        )
+
 
 if __name__ == "__main__":
     _ = unittest.main()
@@ -0,0 +1,125 @@
+import random
+import unittest
+from collections import Counter
+from pathlib import Path
+
+import related
+from related import (
+    related_html,
+    related_links,
+    similar_pages,
+    similar_python,
+    tfidf_rows,
+)
+from sources import MemorySource
+
+POSTS = {
+    "index.md": "# Home\n\nWelcome to the elves and the hobbits.",
+    "blog/elves.md": "# Elves\n\nElves of Rivendell sing of Elbereth in Rivendell.",
+    "blog/rivendell.md": "# Rivendell\n\nThe elves of Rivendell, the house of Elrond.",
+    "blog/shire.md": "# The Shire\n\nHobbits of the Shire eat in Hobbiton.",
+    "blog/hobbits.md": "# Hobbits\n\nThe hobbits of Hobbiton and the Shire.",
+}
+
+
+def similar_numpy_paths(
+    rows: list[dict[int, float]], count: int
+) -> list[list[list[int]]]:
+    """`similar_numpy` multiplying the rows as a dense matrix, then as a sparse one."""
+    dense = related.similar_numpy(rows, count)
+    saved = related.DENSE_CELLS, related.BATCH_CELLS
+    related.DENSE_CELLS, related.BATCH_CELLS = 0, 100  # sparse, in batches
+    try:
+        return [dense, related.similar_numpy(rows, count)]
+    finally:
+        related.DENSE_CELLS, related.BATCH_CELLS = saved
+
+
+class TestSimilarPages(unittest.TestCase):
+    def test_most_similar_first(self):
+        terms: list[Counter[str]] = [
+            Counter(text.split())
+            for text in (
+                "elves rivendell elrond",
+                "elves rivendell song",
+                "hobbits shire pipe",
+                "hobbits shire elves",
+            )
+        ]
+        self.assertEqual(similar_pages(terms, 1), [[1], [0], [3], [2]])
+        self.assertEqual(similar_pages(terms, 5)[2], [3])
+
+    def test_nothing_in_common(self):
+        terms = [Counter(["elves"]), Counter(["hobbits"])]
+        self.assertEqual(similar_pages(terms, 3), [[], []])
+
+    def test_rows_are_normalized(self):
+        rows = tfidf_rows([Counter(["a", "b", "c"]), Counter(["a", "b"]), Counter()])
+        for row in rows[:2]:
+            self.assertAlmostEqual(sum(weight**2 for weight in row.values()), 1.0)
+        self.assertEqual(rows[2], {})
+
+    @unittest.skipIf(related.np is None, "NumPy is not installed")
+    def test_numpy_matches_python(self):
+        rng = random.Random(0)
+        terms = [
+            Counter({f"w{j}": rng.randint(1, 9) for j in rng.sample(range(30), 6)})
+            for _ in range(60)
+        ]
+        rows = tfidf_rows(terms)
+        expected = similar_python(rows, 3)
+        self.assertEqual(similar_numpy_paths(rows, 3), [expected, expected])
+
+    @unittest.skipIf(related.np is None, "NumPy is not installed")
+    def test_numpy_breaks_ties_like_python(self):
+        # copies of the same pages score the same: the lowest pages come first
+        texts = ("elves rivendell elrond", "hobbits shire pipe", "elves shire")
+        terms: list[Counter[str]] = [Counter(texts[i % 3].split()) for i in range(30)]
+        rows = tfidf_rows(terms)
+        expected = similar_python(rows, 4)
+        self.assertEqual(expected[0], [3, 6, 9, 12])
+        self.assertEqual(similar_numpy_paths(rows, 4), [expected, expected])
+
+    @unittest.skipIf(related.np is None, "NumPy is not installed")
+    def test_numpy_matches_python_on_random_ties(self):
+        # pages of the same words, each as frequent, have proportional vectors:
+        # their scores tie, up to the order the paths add the products in
+        rng = random.Random(1)
+        for trial in range(200):
+            words = [f"w{j}" for j in range(rng.randint(5, 20))]
+            terms = [
+                Counter(
+                    dict.fromkeys(
+                        rng.sample(words, rng.randint(1, 5)), rng.randint(1, 3)
+                    )
+                )
+                for _ in range(rng.randint(5, 60))
+            ]
+            rows = tfidf_rows(terms)
+            count = rng.randint(1, 5)
+            expected = similar_python(rows, count)
+            with self.subTest(trial=trial):
+                self.assertEqual(similar_numpy_paths(rows, count), [expected, expected])
+
+
+class TestRelatedLinks(unittest.TestCase):
+    def test_related_in_section(self):
+        source = MemorySource(Path("content"), POSTS)
+        links = related_links(source, source.pages(Path("public")), Path("public"), 1)
+        self.assertEqual(links["index.html"], [])  # alone in its section
+        self.assertEqual(
+            links["blog/elves.html"], [("/blog/rivendell.html", "Rivendell")]
+        )
+        self.assertEqual(links["blog/shire.html"], [("/blog/hobbits.html", "Hobbits")])
+
+    def test_related_html(self):
+        self.assertEqual(related_html([]), "")
+        self.assertEqual(
+            related_html([("/blog/tom/", "Tom & Goldberry")]),
+            '<nav class="related"><h2>Related</h2><ul><li>'
+            + '<a href="/blog/tom/">Tom &amp; Goldberry</a></li></ul></nav>',
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,95 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from cache import BuildCache
+from report import BuildReport, PageReport, compare_reports
+
+
+def make_report(total: float, phases: dict[str, float]) -> dict[str, object]:
+    return {"total_seconds": total, "phases": phases}
+
+
+class TestBuildReport(unittest.TestCase):
+    def test_add_page(self):
+        report = BuildReport()
+        page = PageReport("content/index.md", "public/index.html", 0.5, 10, 20)
+        page.add_time("render", 0.4)
+        report.add_page(page)
+        report.add_page(PageReport("content/a.md", "public/a.html", error="boom"))
+
+        self.assertEqual(report.bytes_read, 10)
+        self.assertEqual(report.bytes_written, 20)
+        self.assertEqual(report.phases, {"render": 0.4})
+        self.assertEqual([page.source for page in report.errors], ["content/a.md"])
+
+    def test_phase(self):
+        report = BuildReport()
+        with report.phase("static"):
+            pass
+        with report.phase("static"):
+            pass
+        self.assertIn("static", report.phases)
+
+    def test_to_json_slowest_pages(self):
+        report = BuildReport()
+        for i in range(5):
+            report.add_page(PageReport(f"{i}.md", f"{i}.html", seconds=i))
+
+        data = report.to_json(slowest=2)
+        self.assertEqual(
+            data["slowest_pages"],
+            [{"source": "4.md", "seconds": 4}, {"source": "3.md", "seconds": 3}],
+        )
+        self.assertEqual(data["pages"], {"total": 5, "failed": 0, "resumed": 0})
+        self.assertEqual(len(data["page_seconds"]), 5)  # pyright: ignore[reportAny]
+        self.assertGreater(data["peak_memory_bytes"], 0)
+
+    def test_cache_hit_rate(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = BuildCache(Path(tmpdir))
+            key = cache.key("page", "x")
+            _ = cache.get("page", key)
+            cache.put("page", key, b"x")
+            _ = cache.get("page", key)
+
+            data = BuildReport().to_json(cache)
+        self.assertEqual(
+            data["cache"], {"page": {"hits": 1, "misses": 1, "hit_rate": 0.5}}
+        )
+
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "build.json"
+            BuildReport().write(path)
+            with open(path) as file:
+                data = json.load(file)  # pyright: ignore[reportAny]
+        self.assertIn("total_seconds", data)
+
+
+class TestCompareReports(unittest.TestCase):
+    def test_no_regression(self):
+        old = make_report(1.0, {"render": 0.8})
+        new = make_report(1.05, {"render": 0.82})
+        self.assertEqual(compare_reports(old, new), [])
+
+    def test_phase_regression(self):
+        old = make_report(1.0, {"render": 0.5, "write": 0.5})
+        new = make_report(1.05, {"render": 0.8, "write": 0.25})
+        self.assertEqual(compare_reports(old, new), ["render: 0.500s -> 0.800s (+60%)"])
+
+    def test_total_regression(self):
+        old = make_report(1.0, {})
+        new = make_report(2.0, {})
+        self.assertEqual(compare_reports(old, new), ["total: 1.000s -> 2.000s (+100%)"])
+
+    def test_ignore_small_slowdowns(self):
+        old = make_report(0.001, {})
+        new = make_report(0.002, {})
+        self.assertEqual(compare_reports(old, new), [])
+        self.assertEqual(len(compare_reports(old, new, min_seconds=0)), 1)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
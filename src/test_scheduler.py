@@ -0,0 +1,55 @@
+# pyright: reportUninitializedInstanceVariable=false
+import tempfile
+import unittest
+from pathlib import Path
+
+from scheduler import expected_costs, longest_first
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.small = self.root / "small.md"
+        self.medium = self.root / "medium.md"
+        self.huge = self.root / "huge.md"
+        _ = self.small.write_text("x" * 10)
+        _ = self.medium.write_text("x" * 100)
+        _ = self.huge.write_text("x" * 1000)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_without_history_uses_size(self):
+        order = longest_first([self.small, self.huge, self.medium])
+        self.assertEqual(order, [self.huge, self.medium, self.small])
+
+    def test_history_wins_over_size(self):
+        history = {str(self.small): 5.0, str(self.huge): 0.1}
+        order = longest_first([self.small, self.huge, self.medium], history)
+        self.assertEqual(order[0], self.small)
+
+    def test_unknown_pages_scaled_from_history(self):
+        history = {str(self.medium): 1.0}  # 0.01s per byte
+        costs = expected_costs([self.small, self.medium, self.huge], history)
+        self.assertAlmostEqual(costs[self.small], 0.1)
+        self.assertAlmostEqual(costs[self.medium], 1.0)
+        self.assertAlmostEqual(costs[self.huge], 10.0)
+
+    def test_missing_file_costs_nothing(self):
+        missing = self.root / "missing.md"
+        self.assertEqual(longest_first([missing, self.small]), [self.small, missing])
+
+    def test_ties_are_deterministic(self):
+        other = self.root / "a.md"
+        _ = other.write_text("x" * 10)
+        self.assertEqual(longest_first([self.small, other]), [other, self.small])
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
+
+    def test_size_of_other_sources(self):
+        sizes = {Path("a.md"): 1, Path("b.md"): 3}
+        order = longest_first(list(sizes), size=sizes.__getitem__)
+        self.assertEqual(order, [Path("b.md"), Path("a.md")])
@@ -0,0 +1,100 @@
+# pyright: reportUninitializedInstanceVariable=false
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, override
+
+from output import DirectoryOutput
+from search import SEARCH_DIR, SEARCH_MANIFEST, SearchIndex
+from sources import MemorySource
+
+POSTS = {
+    "index.md": "# Home\n\nWelcome to the elves and the hobbits.",
+    "blog/elves.md": "# Elves\n\nElves of Rivendell sing of Elbereth in Rivendell.",
+    "blog/shire.md": "# The Shire\n\nHobbits of the Shire eat in Hobbiton.",
+}
+
+
+class RecordingOutput(DirectoryOutput):
+    written: list[str]
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.written = []
+
+    @override
+    def write(self, path: Path, data: bytes):
+        self.written.append(self.name(path))
+        super().write(path, data)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dest = Path(self.tmp.name) / "public"
+
+    def build(self, posts: dict[str, str]) -> RecordingOutput:
+        source = MemorySource(Path("content"), posts)
+        output = RecordingOutput(self.dest)
+        manifest = self.dest / SEARCH_DIR / SEARCH_MANIFEST
+        _ = SearchIndex.load(manifest).update(source, source.pages(self.dest), output)
+        return output
+
+    def load(self, name: str) -> dict[str, list[Any]]:
+        """A file of the index: `[url, title]` or `[[id, count], ...]` by key."""
+        with open(self.dest / SEARCH_DIR / name) as file:
+            return json.load(file)  # pyright: ignore[reportAny]
+
+    def urls(self, term: str) -> list[str]:
+        pages = self.load("pages/0.json")
+        shard = self.load(f"terms/{term[:2]}.json")
+        return [pages[str(id)][0] for id, _ in shard.get(term, [])]
+
+    def test_index(self):
+        _ = self.build(POSTS)
+        self.assertEqual(self.urls("rivendell"), ["/blog/elves.html"])
+        self.assertEqual(sorted(self.urls("elves")), ["/", "/blog/elves.html"])
+        self.assertEqual(self.load("terms/ri.json")["rivendell"][0][1], 2)
+        self.assertEqual(self.load("pages/0.json")["0"], ["/blog/elves.html", "Elves"])
+
+    def test_only_changed_shards_are_written(self):
+        _ = self.build(POSTS)
+        output = self.build(
+            {**POSTS, "blog/shire.md": "# The Shire\n\nHobbits of Bree."}
+        )
+        self.assertEqual(
+            sorted(output.written),
+            [
+                "search/manifest.json",
+                "search/pages/0.json",
+                "search/terms/br.json",
+                "search/terms/ho.json",
+                "search/terms/in.json",
+                "search/terms/of.json",
+                "search/terms/sh.json",
+                "search/terms/th.json",
+            ],
+        )
+        self.assertEqual(self.urls("bree"), ["/blog/shire.html"])
+        self.assertEqual(self.urls("hobbiton"), [])
+        self.assertFalse((self.dest / SEARCH_DIR / "terms/ea.json").exists())
+
+    def test_unchanged_pages_are_not_written(self):
+        _ = self.build(POSTS)
+        self.assertEqual(self.build(POSTS).written, ["search/manifest.json"])
+
+    def test_removed_page_ids_are_reused(self):
+        _ = self.build(POSTS)
+        posts = {name: text for name, text in POSTS.items() if name != "blog/elves.md"}
+        _ = self.build(posts)
+        self.assertFalse((self.dest / SEARCH_DIR / "terms/ri.json").exists())
+        self.assertEqual(self.urls("elves"), ["/"])
+        _ = self.build({**posts, "blog/bree.md": "# Bree\n\nThe Prancing Pony."})
+        self.assertEqual(self.urls("pony"), ["/blog/bree.html"])
+        self.assertEqual(self.load("terms/po.json")["pony"][0][0], 0)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
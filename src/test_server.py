@@ -0,0 +1,129 @@
+# pyright: reportUninitializedInstanceVariable=false
+import gzip
+import http.client
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from typing import override
+
+from server import PreviewServer, accepted_encodings
+
+
+class TestAcceptedEncodings(unittest.TestCase):
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            accepted_encodings("gzip, deflate;q=0.5, br;q=0"), {"gzip", "deflate"}
+        )
+        self.assertEqual(accepted_encodings(None), {""})
+
+
+class TestPreviewServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.write("index.html", b"<p>home</p>")
+        self.write("blog/index.html", b"<p>blog</p>")
+        self.write("index.css", b"body {}")
+        self.write("index.css.gz", gzip.compress(b"body {}"))
+        self.server = self.start_server()
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01,))
+        self.thread.start()
+        self.connection = http.client.HTTPConnection(
+            "127.0.0.1", self.server.server_address[1]
+        )
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.tmpdir.cleanup()
+
+    def write(self, name: str, data: bytes):
+        (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+        _ = (self.root / name).write_bytes(data)
+
+    def start_server(self) -> PreviewServer:
+        return PreviewServer(("127.0.0.1", 0), self.root, quiet=True)
+
+    def get(
+        self, path: str, headers: dict[str, str] | None = None
+    ) -> tuple[http.client.HTTPResponse, bytes]:
+        self.connection.request("GET", path, headers=headers or {})
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def test_serves_files_with_etag(self):
+        response, body = self.get("/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<p>home</p>")
+        self.assertEqual(response.getheader("Content-Type"), "text/html; charset=utf-8")
+        self.assertIsNotNone(response.getheader("ETag"))
+
+    def test_not_modified(self):
+        response, _ = self.get("/index.css")
+        etag = response.getheader("ETag") or ""
+        response, body = self.get("/index.css", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+
+    def test_changed_file_gets_new_etag(self):
+        response, _ = self.get("/index.html")
+        etag = response.getheader("ETag") or ""
+        self.write("index.html", b"<p>home, changed</p>")
+        response, body = self.get("/index.html", {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<p>home, changed</p>")
+
+    def test_precompressed_sibling(self):
+        response, body = self.get("/index.css", {"Accept-Encoding": "br, gzip"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(body), b"body {}")
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+
+        response, body = self.get("/index.css")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, b"body {}")
+
+    def test_keep_alive(self):
+        for _ in range(3):
+            response, _ = self.get("/index.css")
+            self.assertFalse(response.will_close)
+
+    def test_directory(self):
+        response, _ = self.get("/blog")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/blog/")
+        _, body = self.get("/blog/")
+        self.assertEqual(body, b"<p>blog</p>")
+
+    def test_not_found(self):
+        for path in ("/missing.html", "/../index.html", "/blog/%2e%2e/../etc"):
+            response, _ = self.get(path)
+            self.assertEqual(response.status, 404)
+
+
+class TestMemoryPreviewServer(TestPreviewServer):
+    """The same tests, serving the files of a `MemoryOutput`."""
+
+    files: dict[str, bytes]
+
+    @override
+    def setUp(self):
+        self.files = {}
+        super().setUp()
+
+    @override
+    def write(self, name: str, data: bytes):
+        self.files[name] = data
+
+    @override
+    def start_server(self) -> PreviewServer:
+        return PreviewServer(
+            ("127.0.0.1", 0), self.root / "public", quiet=True, files=self.files
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
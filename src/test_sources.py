@@ -0,0 +1,153 @@
+# pyright: reportUninitializedInstanceVariable=false
+import io
+import sqlite3
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from typing import Literal
+
+from sources import (
+    DirectorySource,
+    MemorySource,
+    SqliteSource,
+    TarSource,
+    ZipSource,
+    changes_between,
+    file_versions,
+    open_source,
+    page_section,
+)
+
+PAGES = {"index.md": "# Home", "blog/tom.md": "# Tom\n\nHi"}
+
+
+class TestSources(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_tar(
+        self, name: str, mode: Literal["w", "w:gz"], pages: dict[str, str] = PAGES
+    ) -> Path:
+        path = self.root / name
+        with tarfile.open(path, mode) as tar:
+            for page, markdown in pages.items():
+                data = markdown.encode()
+                info = tarfile.TarInfo(page)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+            info = tarfile.TarInfo("notes.txt")
+            tar.addfile(info, io.BytesIO())
+        return path
+
+    def assert_reads_pages(self, source_path: Path, source_type: type):
+        source = open_source(str(source_path))
+        self.assertIsInstance(source, source_type)
+        self.assertEqual(source.names(), ["blog/tom.md", "index.md"])
+        self.assertEqual(
+            source.pages(Path("public")),
+            {
+                source_path / "blog/tom.md": Path("public/blog/tom.html"),
+                source_path / "index.md": Path("public/index.html"),
+            },
+        )
+        self.assertEqual(source.read(source_path / "blog/tom.md"), "# Tom\n\nHi")
+        self.assertEqual(source.size(source_path / "index.md"), 6)
+        self.assertTrue(source.exists(source_path / "index.md"))
+        self.assertFalse(source.exists(source_path / "missing.md"))
+        with self.assertRaises(FileNotFoundError):
+            _ = source.read(source_path / "missing.md")
+        self.assertEqual(sorted(source.versions()), ["blog/tom.md", "index.md"])
+
+    def test_directory(self):
+        content = self.root / "content"
+        for page, markdown in PAGES.items():
+            (content / page).parent.mkdir(parents=True, exist_ok=True)
+            _ = (content / page).write_text(markdown)
+        self.assert_reads_pages(content, DirectorySource)
+
+    def test_tar(self):
+        self.assert_reads_pages(self.write_tar("content.tar", "w"), TarSource)
+
+    def test_compressed_tar(self):
+        self.assert_reads_pages(self.write_tar("content.tar.gz", "w:gz"), TarSource)
+
+    def test_zip(self):
+        path = self.root / "content.zip"
+        with zipfile.ZipFile(path, "w") as archive:
+            for page, markdown in PAGES.items():
+                archive.writestr(page, markdown)
+        self.assert_reads_pages(path, ZipSource)
+
+    def test_archive_members_outside_root(self):
+        pages = {**PAGES, "../evil.md": "# Evil", "/tmp/evil.md": "# Evil"}
+        tar_path = self.write_tar("content.tar", "w", pages)
+        zip_path = self.root / "content.zip"
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            for page, markdown in pages.items():
+                archive.writestr(zipfile.ZipInfo(page), markdown)
+        for path in (tar_path, zip_path):
+            source = open_source(str(path))
+            self.assertEqual(source.names(), ["blog/tom.md", "index.md"])
+            dest_dir = self.root / "public"
+            for dest in source.pages(dest_dir).values():
+                self.assertTrue(dest.resolve().is_relative_to(dest_dir.resolve()))
+            self.assertFalse(source.exists(path / "../evil.md"))
+
+    def test_memory_page_outside_root(self):
+        source = MemorySource(Path("content"), {"../evil.md": "# Evil"})
+        with self.assertRaises(ValueError):
+            _ = source.pages(Path("public"))
+
+    def test_sqlite(self):
+        path = self.root / "content.db"
+        connection = sqlite3.connect(path)
+        _ = connection.execute("CREATE TABLE pages (path TEXT, markdown TEXT)")
+        _ = connection.executemany("INSERT INTO pages VALUES (?, ?)", PAGES.items())
+        connection.commit()
+        connection.close()
+        self.assert_reads_pages(path, SqliteSource)
+
+    def test_memory(self):
+        source = MemorySource(Path("content"), dict(PAGES))
+        self.assertEqual(source.read(Path("content/index.md")), "# Home")
+        self.assertEqual(source.names(), ["blog/tom.md", "index.md"])
+
+    def test_versions_change_with_pages(self):
+        source = MemorySource(Path("content"), dict(PAGES))
+        previous = source.versions()
+        source.markdown["index.md"] = "# Home!"
+        self.assertNotEqual(source.versions()["index.md"], previous["index.md"])
+        self.assertEqual(source.versions()["blog/tom.md"], previous["blog/tom.md"])
+
+    def test_file_versions(self):
+        _ = (self.root / "style.css").write_text("body {}")
+        (self.root / "images").mkdir()
+        _ = (self.root / "images" / "tom.png").write_bytes(b"png")
+        self.assertEqual(
+            sorted(file_versions(self.root)), ["images/tom.png", "style.css"]
+        )
+
+
+class TestPageSection(unittest.TestCase):
+    def test_page_section(self):
+        self.assertEqual(page_section("blog/tom/index.md"), "blog")
+        self.assertEqual(page_section("contact.md"), "")
+
+
+class TestChangesBetween(unittest.TestCase):
+    def test_changed_added_and_deleted(self):
+        previous = {"a.md": "1", "b.md": "1", "c.md": "1"}
+        versions = {"a.md": "1", "b.md": "2", "d.md": "1"}
+        changes = changes_between(Path("content"), previous, versions)
+        self.assertEqual(changes.changed, {Path("content/b.md"), Path("content/d.md")})
+        self.assertEqual(changes.deleted, {Path("content/c.md")})
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from cache import BuildCache
+from terms import page_terms, page_text, tokenize
+
+ELVES = "# Elves\n\nElves of Rivendell sing of Elbereth in Rivendell."
+
+
+class TestTerms(unittest.TestCase):
+    def test_page_text(self):
+        markdown = """\
+# The **Title**
+
+A [link](/there) and ![an image](/tom.png), `code`.
+
+```python
+print("not text")
+```
+
+> quoted
+
+- one
+- two
+
+1. first"""
+        self.assertEqual(
+            page_text(markdown),
+            "The  Title A  link  and  ,  . quoted one two first",
+        )
+
+    def test_terms_are_cached(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = BuildCache(Path(tmpdir))
+            expected = page_terms(ELVES)
+            self.assertEqual(page_terms(ELVES, cache), expected)
+            self.assertEqual(page_terms(ELVES, cache), expected)
+            self.assertEqual(cache.hits["terms"], 1)
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("Tom's Café, in 2024 a_b!"), ["tom", "café", "in", "2024"]
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
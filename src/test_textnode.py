@@ -1,7 +1,7 @@
 import unittest
 
 from markdown import textnode_to_htmlnode
-from textnode import TextNode, TextType
+from textnode import TextNode, TextSpan, TextType
 
 
 class TestTextNode(unittest.TestCase):
@@ -39,5 +39,34 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.value, "This is a text node")
 
 
+class TestTextSpan(unittest.TestCase):
+    def test_text_is_sliced_from_source(self):
+        span = TextSpan("a **bold** word", 4, 8, TextType.BOLD)
+        self.assertEqual(span.text, "bold")
+        self.assertIsNone(span.url)
+
+    def test_url(self):
+        source = "[link](https://boot.dev)"
+        span = TextSpan(source, 1, 5, TextType.LINK, url_span=(7, 23))
+        self.assertEqual(span.url, "https://boot.dev")
+
+    def test_to_textnode(self):
+        source = "![alt](/images/tom.png)"
+        span = TextSpan(source, 2, 5, TextType.IMAGE, url_span=(7, 22))
+        self.assertEqual(
+            span.to_textnode(), TextNode("alt", TextType.IMAGE, "/images/tom.png")
+        )
+
+    def test_eq_compares_text_not_offsets(self):
+        span = TextSpan("xx bold", 3, 7, TextType.BOLD)
+        self.assertEqual(span, TextSpan("bold", 0, 4, TextType.BOLD))
+        self.assertNotEqual(span, TextSpan("bold", 0, 4, TextType.ITALIC))
+
+    def test_to_htmlnode(self):
+        span = TextSpan("a `code` span", 3, 7, TextType.CODE)
+        html_node = textnode_to_htmlnode(span)
+        self.assertEqual(html_node.to_html(), "<code>code</code>")
+
+
 if __name__ == "__main__":
     _ = unittest.main()
@@ -34,3 +34,60 @@ class TextNode:
     @override
     def __repr__(self):
         return f'TextNode("{self.text}", {self.text_type.value}, {self.url})'
+
+
+class TextSpan:
+    """
+    A TextNode stored as offsets into the string it was parsed from: its text
+    and url are only sliced out of `source` when they are read.
+    """
+
+    __slots__ = ("end", "source", "start", "text_type", "url_end", "url_start")
+
+    source: str
+    start: int
+    end: int
+    text_type: TextType
+    url_start: int
+    url_end: int
+
+    def __init__(
+        self,
+        source: str,
+        start: int,
+        end: int,
+        text_type: TextType,
+        url_span: tuple[int, int] | None = None,
+    ):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.text_type = text_type
+        self.url_start, self.url_end = url_span or (-1, -1)
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start : self.end]
+
+    @property
+    def url(self) -> str | None:
+        if self.url_start < 0:
+            return None
+        return self.source[self.url_start : self.url_end]
+
+    def to_textnode(self) -> TextNode:
+        return TextNode(self.text, self.text_type, self.url)
+
+    @override
+    def __eq__(self, span: object) -> bool:
+        if not isinstance(span, TextSpan):
+            return NotImplemented
+        return (
+            self.text == span.text
+            and self.text_type == span.text_type
+            and self.url == span.url
+        )
+
+    @override
+    def __repr__(self):
+        return f"TextSpan({self.start}, {self.end}, {self.text_type.value}, {self.url})"
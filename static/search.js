@@ -0,0 +1,79 @@
+// Searches the index written by `main.py --search`: fetches the term shards of
+// the query words, keeps the pages having all of them, and lists the best
+// ranked in #search-results as the #search input is typed in. The site root
+// is the `data-root` of the script tag (the basepath of the build), and
+// #search-box is shown once the index is found there.
+(() => {
+  const SITE = document.currentScript.dataset.root || "/";
+  const ROOT = SITE + "search/";
+  const PREFIX_LENGTH = 2;
+  const PAGES_PER_SHARD = 1000;
+  const RESULTS = 20;
+  const WORD = /[\p{L}\p{N}]{2,}/gu;
+  const shards = new Map();
+
+  const fetchJSON = (path) => {
+    if (!shards.has(path)) {
+      shards.set(
+        path,
+        fetch(ROOT + path).then((response) => (response.ok ? response.json() : {})),
+      );
+    }
+    return shards.get(path);
+  };
+
+  const search = async (query) => {
+    const terms = [...new Set(query.toLowerCase().match(WORD) || [])];
+    if (!terms.length) return [];
+    const postings = await Promise.all(
+      terms.map(async (term) => {
+        const shard = await fetchJSON(`terms/${term.slice(0, PREFIX_LENGTH)}.json`);
+        return shard[term] || [];
+      }),
+    );
+    let scores = null;
+    for (const pages of postings) {
+      const next = new Map();
+      const weight = 1 / Math.log(1 + pages.length);
+      for (const [id, count] of pages) {
+        if (scores === null || scores.has(id)) {
+          next.set(id, (scores ? scores.get(id) : 0) + (1 + Math.log(count)) * weight);
+        }
+      }
+      scores = next;
+    }
+    const best = [...scores].sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, RESULTS);
+    return Promise.all(
+      best.map(async ([id]) => {
+        const pages = await fetchJSON(`pages/${Math.floor(id / PAGES_PER_SHARD)}.json`);
+        return pages[id];
+      }),
+    );
+  };
+
+  const box = document.getElementById("search-box");
+  const input = document.getElementById("search");
+  const list = document.getElementById("search-results");
+  if (!input || !list) return;
+  if (box) {
+    fetch(ROOT + "manifest.json", { method: "HEAD" }).then((response) => {
+      box.hidden = !response.ok;
+    });
+  }
+  let latest = 0;
+  input.addEventListener("input", async () => {
+    const request = ++latest;
+    const results = await search(input.value);
+    if (request !== latest) return;
+    list.replaceChildren(
+      ...results.filter(Boolean).map(([url, title]) => {
+        const link = document.createElement("a");
+        link.href = SITE + url.slice(1); // root-relative to the site
+        link.textContent = title || url;
+        const item = document.createElement("li");
+        item.append(link);
+        return item;
+      }),
+    );
+  });
+})();